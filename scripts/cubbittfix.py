@@ -1,7 +1,10 @@
 #!/usr/bin/env python
 
 import argparse
+import gc
+import multiprocessing
 import sys
+from itertools import islice
 
 from fixer import Fixer, FixerConfigurator, FixerStatisticsMarks
 from tabulate import tabulate
@@ -10,38 +13,104 @@ parser = argparse.ArgumentParser()
 parser.add_argument("config", type=str, help="Path to the configuration file")
 parser.add_argument("--changes", default=False, action='store_true', help="Display only changed sentences")
 parser.add_argument("--flags", default=False, action='store_true', help="Display ids of the statistics marks. Used only when flag changes is present.")
+parser.add_argument("--workers", default=1, type=int, help="Number of processes fixing the sentences")
+parser.add_argument("--chunk-size", default=100, type=int, help="Number of lines sent to one process at once")
+parser.add_argument("--preload", default=False, action='store_true',
+                    help="Load models and other resources once in the main process and fork the workers, which share them (only where fork is available)")
 
+#: Fixer instance of the current (worker) process
+worker_fixer = None
+
+
+def init_worker(config_path: str):
+    """Prepare fixer in the (worker) process, it is done only once per process"""
+    global worker_fixer
 
-def main(args):
     configuration = FixerConfigurator()
-    configuration.load_from_file(args.config)
+    configuration.load_from_file(config_path)
 
-    fixer = Fixer(configuration)
-    statistics = {mark.value: 0 for mark in FixerStatisticsMarks}
+    worker_fixer = Fixer(configuration)
+
+
+def init_forked_workers(config_path: str):
+    """Prepare fixer with all resources in the main process, forked workers then share it
 
-    for line in sys.stdin:
-        line = line.strip()
+    Objects created so far are excluded from the garbage collection, so the collector
+    in the workers does not write to their memory pages and the pages stay shared.
+    """
+    init_worker(config_path)
+    worker_fixer.preload()
 
-        if not line and not args.changes:
-            print()
+    gc.collect()
+    gc.freeze()
+
+
+def fix_lines(lines: list) -> list:
+    """Fix chunk of input lines, for empty lines None is returned"""
+    sentences = [line.split('\t') for line in lines if line]
+    fixed_sentences = iter(worker_fixer.fix_batch(sentences))
+
+    results = []
+
+    for line in lines:
+        if not line:
+            results.append(None)
             continue
 
         source_sentence, translated_sentence = line.split('\t')
-        repaired_sentence, has_changed, marks = fixer.fix(source_sentence, translated_sentence)
+        repaired_sentence, has_changed, marks = next(fixed_sentences)
+        results.append((source_sentence, translated_sentence, repaired_sentence, has_changed, marks))
+
+    return results
+
+
+def read_chunks(chunk_size: int):
+    """Read stripped lines from standard input in chunks"""
+    lines = (line.strip() for line in sys.stdin)
+    return iter(lambda: list(islice(lines, chunk_size)), [])
+
+
+def main(args):
+    statistics = {mark.value: 0 for mark in FixerStatisticsMarks}
+
+    if args.workers > 1 and args.preload and 'fork' in multiprocessing.get_all_start_methods():
+        init_forked_workers(args.config)
+        pool = multiprocessing.get_context('fork').Pool(args.workers)
+        fixed_chunks = pool.imap(fix_lines, read_chunks(args.chunk_size))
+    elif args.workers > 1:
+        pool = multiprocessing.Pool(args.workers, initializer=init_worker, initargs=(args.config,))
+        fixed_chunks = pool.imap(fix_lines, read_chunks(args.chunk_size))
+    else:
+        pool = None
+        init_worker(args.config)
+        fixed_chunks = map(fix_lines, read_chunks(args.chunk_size))
+
+    for fixed_chunk in fixed_chunks:
+        for result in fixed_chunk:
+            if result is None:
+                if not args.changes:
+                    print()
+                continue
+
+            source_sentence, translated_sentence, repaired_sentence, has_changed, marks = result
+
+            for mark in marks:
+                statistics[mark.value] += 1
 
-        for mark in marks:
-            statistics[mark.value] += 1
+            if args.changes:
+                if has_changed:
+                    print(";" + ";".join([str(mark.value) for mark in marks]) + ";" if args.flags else "",
+                          source_sentence,
+                          translated_sentence.strip(),
+                          repaired_sentence.strip(), "",
+                          sep='\n', end='\n\n')
 
-        if args.changes:
-            if has_changed:
-                print(";" + ";".join([str(mark.value) for mark in marks]) + ";" if args.flags else "",
-                      source_sentence,
-                      translated_sentence.strip(),
-                      repaired_sentence.strip(), "",
-                      sep='\n', end='\n\n')
+            else:
+                print(source_sentence, repaired_sentence, sep='\t')
 
-        else:
-            print(source_sentence, repaired_sentence, sep='\t')
+    if pool:
+        pool.close()
+        pool.join()
 
     if args.flags:
         statistics_to_print = [(mark.value, mark.name, statistics[mark.value]) for mark in FixerStatisticsMarks]
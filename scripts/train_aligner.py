@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+
+import argparse
+import sys
+
+from fixer._aligner import IBMAligner
+from fixer._languages import Languages
+
+parser = argparse.ArgumentParser(description="Train the lexical table of the offline aligner (local_ibm) from parallel corpus read from standard input (source and translated sentence separated by tab)")
+parser.add_argument("source_lang", type=str, help="Language of the source sentences (cs or en)")
+parser.add_argument("--iterations", default=5, type=int, help="Number of EM iterations")
+parser.add_argument("--model", default=IBMAligner.MODEL_PATH, type=str, help="Path to save the trained table to")
+
+
+def main(args):
+    sentence_pairs = []
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        source_sentence, translated_sentence = line.split('\t')
+        sentence_pairs.append((source_sentence, translated_sentence))
+
+    IBMAligner.train(sentence_pairs, Languages.get_language(args.source_lang), args.iterations, args.model)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    main(args)
@@ -14,10 +14,11 @@ setuptools.setup(
     ],
     package_dir={"": "src"},
     packages=setuptools.find_packages(where="src"),
-    scripts=["scripts/cubbittfix.py"],
+    package_data={"fixer": ["data/*.tsv"]},
+    scripts=["scripts/cubbittfix.py", "scripts/train_aligner.py"],
     python_requires=">=3.8",
     install_requires=[
-        "conllu",
+        "numpy",
         "requests",
         "tabulate",
         "word2number",
@@ -1,5 +1,6 @@
-__all__ = ['Fixer', 'FixerConfigurator', 'FixerStatisticsMarks', 'SentencesSplitter']
+__all__ = ['Fixer', 'AsyncFixer', 'FixerConfigurator', 'FixerStatisticsMarks', 'SentencesSplitter']
 
+from .async_fixer import AsyncFixer
 from .fixer import Fixer
 from .fixer_configurator import FixerConfigurator
 from .fixer_statistics import FixerStatisticsMarks
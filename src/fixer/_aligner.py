@@ -1,10 +1,14 @@
 import json
+import os
 import re
 from abc import ABC, abstractmethod
-from typing import Tuple, List
+from collections import Counter
+from typing import Tuple, List, Optional, Dict
 
+import numpy as np
 import requests
 
+from ._http import http_session
 from ._languages import Language, Languages
 from ._units import units
 
@@ -27,16 +31,36 @@ class AlignerInterface(ABC):
         """Returns word alignment of the sentences based on given languages. Result as list of aligned words."""
         pass
 
+    def get_alignments(self, sentence_pairs: List[Tuple[str, str]], src_lang: Language, trg_lang: Language) -> List[List[Tuple[str, str]]]:
+        """Returns word alignment of each given sentence pair. Aligners supporting more pairs per call should override it."""
+        return [self.get_alignment(src_text, trg_text, src_lang, trg_lang) for src_text, trg_text in sentence_pairs]
+
 
 class FastAlignAligner(AlignerInterface):
     """Wrapper for communicating with external online aligner.
 
     It uses predefined alignment server running at UFAL, MFF. The server uses
     fast_align tool for word-alignment with CzEng2 as dataset.
+
+    More sentence pairs can be aligned with one request (`get_alignments`). When the server
+    does not accept the batch request, the pairs are aligned one by one.
     """
 
     _ALIGNER_URL = 'https://quest.ms.mff.cuni.cz/ptakopet-mt380/align/en-cs'
 
+    #: Maximal count of sentence pairs sent in one request
+    BATCH_SIZE = 100
+
+    #: Response statuses meaning that the server does not support batch requests at all
+    __BATCH_UNSUPPORTED_STATUSES = (400, 404, 415)
+
+    #: Count of batch requests failed one after another by a server error after which batches are not sent anymore
+    __BATCH_SERVER_ERRORS_LIMIT = 2
+
+    def __init__(self):
+        self.__batch_supported = True
+        self.__batch_server_errors = 0
+
     @staticmethod
     def get_alignment(src_text: str, trg_text: str, src_lang: Language, trg_lang: Language) -> List[Tuple[str, str]]:
         """Returns word alignment given by fast_align.
@@ -56,24 +80,95 @@ class FastAlignAligner(AlignerInterface):
             src_text = trg_text
             trg_text = temp
 
-        payload = json.dumps({
+        response = FastAlignAligner.__do_http_request({
             'src_text': src_text,
             'trg_text': trg_text})
-        headers = {'Content-type': 'application/json'}
-        response = requests.post(FastAlignAligner._ALIGNER_URL, headers=headers, data=payload)
 
         if response.status_code != 200:
             raise AlignerException('Aligner was not able to connect to the alignment server.')
         else:
+            return FastAlignAligner.__parse_alignment(json.loads(response.content))
+
+    def get_alignments(self, sentence_pairs: List[Tuple[str, str]], src_lang: Language, trg_lang: Language) -> List[List[Tuple[str, str]]]:
+        """Returns word alignment of each given sentence pair, up to `BATCH_SIZE` pairs are sent in one request.
+
+        The request contains list of pairs (in the same format as for one pair) and the server
+        responses with list of alignments. When the server does not support it, it is not tried
+        again and the pairs are aligned one by one. It is when the server refuses the request (see
+        `__BATCH_UNSUPPORTED_STATUSES`), answers with anything else than list of alignments of all
+        pairs or fails with a server error repeatedly. Other failures fall back only for the batch.
+
+        :raises AlignerException: Exception raises when it was not possible to connect to the server
+        """
+        alignments = []
+
+        for start in range(0, len(sentence_pairs), FastAlignAligner.BATCH_SIZE):
+            batch = sentence_pairs[start:start + FastAlignAligner.BATCH_SIZE]
+            batch_alignments = self.__get_batch_alignments(batch, src_lang) if self.__batch_supported else None
+
+            if batch_alignments is None:
+                batch_alignments = super().get_alignments(batch, src_lang, trg_lang)
+
+            alignments.extend(batch_alignments)
+
+        return alignments
+
+    def __get_batch_alignments(self, sentence_pairs: List[Tuple[str, str]], src_lang: Language) -> Optional[List[List[Tuple[str, str]]]]:
+        """Align all pairs with one request, returns None when it fails (batch requests are disabled when the server does not support them)"""
+        if src_lang == Languages.CS:  # source text should be in czech
+            sentence_pairs = [(trg_text, src_text) for src_text, trg_text in sentence_pairs]
+
+        response = FastAlignAligner.__do_http_request([{'src_text': src_text, 'trg_text': trg_text} for src_text, trg_text in sentence_pairs])
+
+        if response.status_code >= 500:
+            self.__batch_server_errors += 1
+            if self.__batch_server_errors >= FastAlignAligner.__BATCH_SERVER_ERRORS_LIMIT:
+                self.__batch_supported = False
+            return None
+
+        if response.status_code in FastAlignAligner.__BATCH_UNSUPPORTED_STATUSES:
+            self.__batch_supported = False
+
+        if response.status_code != 200:
+            return None
+
+        self.__batch_server_errors = 0
+
+        try:
             parsed_response = json.loads(response.content)
-            words = []
-            for pair in parsed_response['alignment'].split():
-                split_pair = pair.split('-')
-                left_idx = int(split_pair[0])
-                right_idx = int(split_pair[1])
-                words.append((parsed_response['src_tokens'][left_idx], parsed_response['trg_tokens'][right_idx]))
+        except ValueError:
+            parsed_response = None
 
-            return words
+        if not isinstance(parsed_response, list) or len(parsed_response) != len(sentence_pairs):
+            self.__batch_supported = False
+            return None
+
+        return [FastAlignAligner.__parse_alignment(parsed_alignment) for parsed_alignment in parsed_response]
+
+    @staticmethod
+    def __do_http_request(payload) -> requests.Response:
+        """Send the JSON payload to the alignment server
+
+        :raises AlignerException: Exception raises when it was not possible to connect to the server
+        """
+        headers = {'Content-type': 'application/json'}
+
+        try:
+            return http_session.post(FastAlignAligner._ALIGNER_URL, headers=headers, data=json.dumps(payload))
+        except requests.RequestException as error:
+            raise AlignerException('Aligner was not able to connect to the alignment server.') from error
+
+    @staticmethod
+    def __parse_alignment(parsed_response: dict) -> List[Tuple[str, str]]:
+        """Returns list of aligned words from the parsed response of the server"""
+        words = []
+        for pair in parsed_response['alignment'].split():
+            split_pair = pair.split('-')
+            left_idx = int(split_pair[0])
+            right_idx = int(split_pair[1])
+            words.append((parsed_response['src_tokens'][left_idx], parsed_response['trg_tokens'][right_idx]))
+
+        return words
 
 
 class OrderAligner(AlignerInterface):
@@ -155,7 +250,7 @@ class OrderAligner(AlignerInterface):
         units_tokens = []
         names_tokens = []
 
-        units_words = units.get_units_words_list(language)
+        units_words = units.get_units_words_set(language)
 
         for token in tokens:
             if token.lower() in units_words:  # unit
@@ -177,8 +272,204 @@ class OrderAligner(AlignerInterface):
         return clean_sentence.split()
 
 
+class IBMAligner(AlignerInterface):
+    """Offline statistical word-aligner based on the lexical translation table of IBM Model 1
+
+    The table contains probabilities of czech words being translation of english words
+    (including the empty word for czech words without a counterpart). It is trained by EM
+    algorithm from a parallel corpus (`train`) or estimated from alignments previously
+    returned by the alignment server (`train_from_alignments`) and saved as NumPy arrays
+    indexed by the identifiers of the words.
+
+    Each czech word is aligned to the english word with the highest translation probability
+    weighted by the distance of their relative positions in the sentences (diagonal prior
+    similar to IBM Model 2 as used by fast_align). The same words (eg. numbers or names)
+    are always considered as translations.
+
+    :param model_path: Path to the trained table (`MODEL_PATH` when not given)
+    :raises AlignerException: Exception raises when the model is not trained yet
+    """
+
+    #: Default path to the trained lexical table
+    MODEL_PATH = 'models/ibm-cs-en.npz'
+
+    #: Strength of preferring words at similar relative positions
+    DIAGONAL_TENSION = 4.0
+
+    #: Prior probability of aligning the word to the empty word
+    NULL_PROBABILITY = 0.08
+
+    #: Translation probability of words which were not seen together
+    __UNSEEN_PROBABILITY = 1e-7
+
+    #: Translation probabilities lower than this are not saved to the table
+    __PRUNING_THRESHOLD = 1e-4
+
+    #: Identifier of the empty word in the english vocabulary
+    __NULL = 0
+
+    def __init__(self, model_path: str = None):
+        model_path = model_path or IBMAligner.MODEL_PATH
+
+        if not os.path.isfile(model_path):
+            raise AlignerException(f"Model {model_path} of the offline aligner does not exist, it has to be trained first.")
+
+        with np.load(model_path, allow_pickle=False) as model:
+            self.__english_ids = {word: idx for idx, word in enumerate(model['english_vocabulary'].tolist())}
+            self.__czech_ids = {word: idx for idx, word in enumerate(model['czech_vocabulary'].tolist())}
+            self.__keys = model['keys']
+            self.__probabilities = model['probabilities']
+
+    def get_alignment(self, src_text: str, trg_text: str, src_lang: Language, trg_lang: Language) -> List[Tuple[str, str]]:
+        """Returns word alignment given by the trained lexical table.
+
+        :param src_text: Source sentence (cs or en)
+        :param trg_text: Translated sentence (cs or en)
+        :param src_lang: Language of the source sentence
+        :param trg_lang: Language of the translated sentence
+        :return: List of tuples of matching words, first word is in english, second in czech (empty for an empty table)
+        """
+        english_tokens, czech_tokens = IBMAligner.__tokenize_pair(src_text, trg_text, src_lang)
+
+        if not english_tokens or not czech_tokens or not len(self.__keys):
+            return []
+
+        english_words = [""] + [token.lower() for token in english_tokens]
+        czech_words = [token.lower() for token in czech_tokens]
+
+        english_ids = np.array([self.__english_ids.get(word, -1) for word in english_words], dtype=np.int64)
+        czech_ids = np.array([self.__czech_ids.get(word, -1) for word in czech_words], dtype=np.int64)
+
+        keys = english_ids[:, None] * len(self.__czech_ids) + czech_ids[None, :]
+        positions = np.minimum(np.searchsorted(self.__keys, keys), len(self.__keys) - 1)
+        known = (english_ids[:, None] >= 0) & (czech_ids[None, :] >= 0) & (self.__keys[positions] == keys)
+        probabilities = np.where(known, self.__probabilities[positions], IBMAligner.__UNSEEN_PROBABILITY)
+
+        identical = np.array(english_words, dtype=object)[:, None] == np.array(czech_words, dtype=object)[None, :]
+        identical[IBMAligner.__NULL, :] = False
+        probabilities[identical] = 1.0
+
+        english_positions = np.arange(1, len(english_words)) / (len(english_words) - 1)
+        czech_positions = (np.arange(len(czech_words)) + 1) / len(czech_words)
+        distortion = np.exp(-IBMAligner.DIAGONAL_TENSION * np.abs(english_positions[:, None] - czech_positions[None, :]))
+
+        probabilities[IBMAligner.__NULL, :] *= IBMAligner.NULL_PROBABILITY
+        probabilities[1:, :] *= (1 - IBMAligner.NULL_PROBABILITY) * distortion / distortion.sum(axis=0)
+
+        best_english = probabilities.argmax(axis=0)
+
+        return [(english_tokens[english_idx - 1], czech_tokens[czech_idx])
+                for english_idx, czech_idx in sorted(zip(best_english.tolist(), range(len(czech_tokens))))
+                if english_idx != IBMAligner.__NULL]
+
+    @staticmethod
+    def train(sentence_pairs: List[Tuple[str, str]], src_lang: Language, iterations: int = 5, model_path: str = None):
+        """Train the lexical table from parallel corpus by EM algorithm of IBM Model 1 and save it
+
+        All co-occurring words of the corpus are processed at once in memory.
+
+        :param sentence_pairs: Pairs of source and translated sentences
+        :param src_lang: Language of the source sentences
+        :param iterations: Count of EM iterations
+        :param model_path: Path to save the table to (`MODEL_PATH` when not given)
+        """
+        english_vocabulary = {"": IBMAligner.__NULL}
+        czech_vocabulary = {}
+        sentences = []
+
+        for src_text, trg_text in sentence_pairs:
+            english_tokens, czech_tokens = IBMAligner.__tokenize_pair(src_text, trg_text, src_lang)
+            if not czech_tokens:
+                continue
+
+            english_ids = [IBMAligner.__NULL] + [english_vocabulary.setdefault(token.lower(), len(english_vocabulary)) for token in english_tokens]
+            czech_ids = [czech_vocabulary.setdefault(token.lower(), len(czech_vocabulary)) for token in czech_tokens]
+            sentences.append((english_ids, czech_ids))
+
+        entries_keys = []
+        entries_czech_words = []
+        czech_words_count = 0
+
+        for english_ids, czech_ids in sentences:  # every czech word can be aligned to every english word of the sentence
+            english_ids = np.array(english_ids, dtype=np.int64)
+            czech_ids = np.array(czech_ids, dtype=np.int64)
+
+            entries_keys.append((english_ids[:, None] * len(czech_vocabulary) + czech_ids[None, :]).ravel())
+            entries_czech_words.append(np.tile(np.arange(czech_words_count, czech_words_count + len(czech_ids)), len(english_ids)))
+            czech_words_count += len(czech_ids)
+
+        if not entries_keys:
+            IBMAligner.__save_table(english_vocabulary, czech_vocabulary, np.array([], dtype=np.int64), np.array([]), model_path)
+            return
+
+        keys, entries_pairs = np.unique(np.concatenate(entries_keys), return_inverse=True)
+        entries_czech_words = np.concatenate(entries_czech_words)
+        pairs_english = keys // max(len(czech_vocabulary), 1)
+        probabilities = np.ones(len(keys))
+
+        for _ in range(iterations):
+            weights = probabilities[entries_pairs]
+            posteriors = weights / np.bincount(entries_czech_words, weights=weights)[entries_czech_words]
+            counts = np.bincount(entries_pairs, weights=posteriors, minlength=len(keys))
+            probabilities = counts / np.bincount(pairs_english, weights=counts)[pairs_english]
+
+        IBMAligner.__save_table(english_vocabulary, czech_vocabulary, keys, probabilities, model_path)
+
+    @staticmethod
+    def train_from_alignments(alignments: List[List[Tuple[str, str]]], model_path: str = None):
+        """Estimate the lexical table from alignments returned by other aligner (eg. `FastAlignAligner`) and save it
+
+        :param alignments: Lists of aligned words, first word is in english, second in czech
+        :param model_path: Path to save the table to (`MODEL_PATH` when not given)
+        """
+        english_vocabulary = {"": IBMAligner.__NULL}
+        czech_vocabulary = {}
+        counts = Counter()
+
+        for alignment in alignments:
+            for english_word, czech_word in alignment:
+                if english_word is None or czech_word is None:
+                    continue
+
+                english_id = english_vocabulary.setdefault(english_word.lower(), len(english_vocabulary))
+                czech_id = czech_vocabulary.setdefault(czech_word.lower(), len(czech_vocabulary))
+                counts[(english_id, czech_id)] += 1
+
+        keys = np.array(sorted(english_id * len(czech_vocabulary) + czech_id for english_id, czech_id in counts), dtype=np.int64)
+        pairs_counts = np.array([counts[divmod(key, len(czech_vocabulary))] for key in keys.tolist()], dtype=np.float64)
+        pairs_english = keys // max(len(czech_vocabulary), 1)
+        probabilities = pairs_counts / np.bincount(pairs_english, weights=pairs_counts)[pairs_english] if len(keys) else pairs_counts
+
+        IBMAligner.__save_table(english_vocabulary, czech_vocabulary, keys, probabilities, model_path)
+
+    @staticmethod
+    def __save_table(english_vocabulary: Dict[str, int], czech_vocabulary: Dict[str, int], keys: np.ndarray, probabilities: np.ndarray, model_path: Optional[str]):
+        """Save pruned table of probabilities with keys sorted for binary search"""
+        model_path = model_path or IBMAligner.MODEL_PATH
+
+        if os.path.dirname(model_path):
+            os.makedirs(os.path.dirname(model_path), exist_ok=True)
+
+        kept = probabilities >= IBMAligner.__PRUNING_THRESHOLD
+
+        np.savez_compressed(model_path,
+                            english_vocabulary=np.array(list(english_vocabulary), dtype=str),
+                            czech_vocabulary=np.array(list(czech_vocabulary), dtype=str),
+                            keys=keys[kept].astype(np.int64),
+                            probabilities=probabilities[kept].astype(np.float32))
+
+    @staticmethod
+    def __tokenize_pair(src_text: str, trg_text: str, src_lang: Language) -> Tuple[List[str], List[str]]:
+        """Returns tokens of the english and czech sentence (words and punctuation)"""
+        if src_lang == Languages.CS:
+            src_text, trg_text = trg_text, src_text
+
+        return re.findall(r"\w+|[^\w\s]", src_text), re.findall(r"\w+|[^\w\s]", trg_text)
+
+
 def get_aligners_list():
     return {
         'fast_align': FastAlignAligner,
         'order_based': OrderAligner,
+        'local_ibm': IBMAligner,
     }
@@ -27,6 +27,11 @@ class DecimalSeparatorFixer(FixerToolInterface):
 
         self.source_pattern = DecimalSeparatorFixer.__prepare_re_pattern_all_numbers(self.source_lang)
         self.target_pattern = DecimalSeparatorFixer.__prepare_re_pattern_all_numbers(self.target_lang)
+        self.source_separated_digits_pattern = DecimalSeparatorFixer.__prepare_re_pattern_separated_digits(self.source_lang)
+
+    def is_applicable(self, source_text: str, target_text: str) -> bool:
+        """Source sentence has to contain digits separated by any separator (or space)"""
+        return self.source_separated_digits_pattern.search(source_text) is not None
 
     def fix(self, sentence_pair: SentencePair) -> Tuple[str, List[StatisticsMarks]]:
         """It verifies whenever the sentence contains problem and tries to fix it
@@ -87,6 +92,14 @@ class DecimalSeparatorFixer(FixerToolInterface):
                           "(\.$|,? ?[^0-9]|$)"  # after number
                           )
 
+    @staticmethod
+    def __prepare_re_pattern_separated_digits(language: Language) -> re.Pattern:
+        """Compile regex pattern searching for digits separated by separator used in given language (or space)"""
+        thousands_sep = re.escape(language.thousands_separator)
+        decimal_sep = re.escape(language.decimal_separator)
+
+        return re.compile(rf"\d[ {thousands_sep}{decimal_sep}]\d")
+
     @staticmethod
     def __change_separators(number: str, language: Language) -> str:
         """Swap separators in number. For Czech space is used for thousands"""
@@ -1,23 +1,235 @@
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
 from abc import ABC, abstractmethod
-from datetime import date
-from typing import Dict
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
 
 import requests
 
+from ._http import http_session
+
 
 class CNBCommunicationException(Exception):
     """Exception indicating problem with loading the exchange rates."""
     pass
 
 
+def save_json_file(path: str, data):
+    """Save data to JSON file, the file is replaced at once so it can be shared by more processes
+
+    Nothing is saved when the file cannot be written.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    temporary_path = None
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, suffix='.tmp', delete=False) as json_file:
+            temporary_path = json_file.name
+            json.dump(data, json_file)
+
+        os.replace(temporary_path, path)
+    except OSError:
+        if temporary_path and os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
 class ExchangeRatesInterface(ABC):
     """Base interface for getting the exchange rate between two currencies."""
 
     @abstractmethod
-    def get_rate(self, original_currency: str, exchanged_currency: str, amount: float) -> float:
+    def get_rate(self, original_currency: str, exchanged_currency: str, amount: float, rates_date: Optional[date] = None) -> float:
+        pass
+
+    @abstractmethod
+    def get_rates(self, rates_date: Optional[date] = None) -> Dict[str, float]:
         pass
 
 
+class CNBExchangeRatesHistory:
+    """Local store of historical exchange rates of the Czech national bank
+
+    Rates are loaded in bulk from yearly history files of CNB (downloaded once per year
+    or loaded from local files) and saved to a snapshot file, so archived texts can be
+    processed with rates of their dates without any further requests.
+
+    Rates are indexed by every calendar day (days without published rates, eg. weekends,
+    have rates of the last published day as CNB uses), so the rates of a day are found in O(1).
+
+    :param snapshot_path: Path to the snapshot file with loaded history (None means the default file in temporary directory)
+    :param offline: Flag whenever only the snapshot file (and loaded files) should be used
+    """
+
+    _CNB_API_YEAR_RATES = "https://www.cnb.cz/cs/financni-trhy/devizovy-trh/kurzy-devizoveho-trhu/kurzy-devizoveho-trhu/rok.txt"
+
+    #: Default path of the snapshot file
+    DEFAULT_SNAPSHOT_PATH = os.path.join(tempfile.gettempdir(), 'cubbitt-fixer-cnb-history.json')
+
+    def __init__(self, snapshot_path: Optional[str] = None, offline: bool = False):
+        self.snapshot_path = snapshot_path or CNBExchangeRatesHistory.DEFAULT_SNAPSHOT_PATH
+        self.offline = offline
+
+        self.__lock = threading.Lock()
+        self.__published = {}
+        self.__years = {}
+        self.__days = {}
+        self.__snapshot_loaded = False
+
+    def get_rate(self, currency: str, rates_date: date) -> float:
+        """Returns rate of the currency to czech crown valid on given day"""
+        return self.get_rates(rates_date)[currency]
+
+    def get_rates(self, rates_date: date) -> Dict[str, float]:
+        """Returns rates of currencies to czech crown valid on given day, missing years are loaded when necessary
+
+        :raises CNBCommunicationException: when rates of the day are not available
+        """
+        rates = self.__days.get(rates_date)
+        if rates is not None:
+            return rates
+
+        with self.__lock:
+            if not self.__snapshot_loaded:
+                self.__snapshot_loaded = True
+                self.load_snapshot(self.snapshot_path, lock=False)
+
+            # rates of first days of the year can be published in the previous year
+            for year in (rates_date.year, rates_date.year - 1):
+                if rates_date in self.__days or self.offline:
+                    break
+
+                if year not in self.__years or (year == rates_date.year and self.__years[year] < rates_date <= date.today()):
+                    self.__add_history(CNBExchangeRatesHistory.download_year(year), year)
+                    self.save_snapshot(self.snapshot_path, lock=False)
+
+        if rates_date not in self.__days:
+            raise CNBCommunicationException(f'Exchange rates for {rates_date.isoformat()} are not available.')
+
+        return self.__days[rates_date]
+
+    def load_history(self, text: str, year: Optional[int] = None):
+        """Add rates from text of yearly history file of CNB (see `parse_history`)
+
+        :param text: Content of the history file
+        :param year: Year of the file, the whole year is then considered as loaded
+        """
+        with self.__lock:
+            self.__add_history(CNBExchangeRatesHistory.parse_history(text), year)
+
+    def load_snapshot(self, path: str, lock: bool = True) -> bool:
+        """Add rates from the snapshot file, returns flag whenever the file was loaded"""
+        try:
+            with open(path, 'r', encoding='utf-8') as snapshot_file:
+                snapshot = json.load(snapshot_file)
+
+            published = {date.fromisoformat(day): {abbr: float(rate) for abbr, rate in rates.items()} for day, rates in snapshot['rates'].items()}
+            years = {int(year): date.fromisoformat(covered) for year, covered in snapshot['years'].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return False
+
+        with self.__lock if lock else contextlib.nullcontext():
+            self.__published.update(published)
+            for year, covered in years.items():
+                self.__years[year] = max(covered, self.__years.get(year, covered))
+            self.__build_days()
+
+        return True
+
+    def save_snapshot(self, path: str, lock: bool = True):
+        """Save all loaded rates to the snapshot file (it is replaced at once), rates are just not saved when the file cannot be written"""
+        with self.__lock if lock else contextlib.nullcontext():
+            snapshot = {
+                'years': {str(year): covered.isoformat() for year, covered in self.__years.items()},
+                'rates': {day.isoformat(): rates for day, rates in sorted(self.__published.items())},
+            }
+
+        save_json_file(path, snapshot)
+
+    @staticmethod
+    def download_year(year: int) -> Dict[date, Dict[str, float]]:
+        """Download yearly history file from CNB
+
+        :raises CNBCommunicationException: when the file cannot be downloaded
+        """
+        try:
+            response = http_session.get(CNBExchangeRatesHistory._CNB_API_YEAR_RATES, params={'rok': year})
+        except requests.RequestException as error:
+            raise CNBCommunicationException('It was not possible to connect to the CNB official website.') from error
+
+        if response.status_code != 200:
+            raise CNBCommunicationException('It was not possible to connect to the CNB official website.')
+
+        return CNBExchangeRatesHistory.parse_history(response.text)
+
+    @staticmethod
+    def parse_history(text: str) -> Dict[date, Dict[str, float]]:
+        """Parse yearly history file of CNB
+
+        The file has following format (the header line is repeated when the list of currencies changes):
+        `Datum|1 AUD|...|1 EUR|...|100 JPY|...` followed by lines `02.01.2023|15,394|...|24,115|...|17,185|...`
+
+        :return: Dictionary with days as keys and dictionaries of rates to czech crown as values
+        """
+        published = {}
+        columns = []
+
+        for line in text.splitlines():
+            cells = line.strip().split('|')
+            if len(cells) < 2:
+                continue
+
+            if cells[0] == 'Datum':
+                columns = [tuple(cell.split()) for cell in cells[1:]]
+                continue
+
+            day = datetime.strptime(cells[0], "%d.%m.%Y").date()
+            rates = {}
+
+            for (amount, abbr), rate in zip(columns, cells[1:]):
+                if abbr in CNBExchangeRates._UNITS_CURRENCIES and rate:
+                    rates[abbr] = float(rate.replace(',', '.')) / int(amount)
+
+            published[day] = rates
+
+        return published
+
+    def __add_history(self, published: Dict[date, Dict[str, float]], year: Optional[int]):
+        """Add parsed rates and index them by days"""
+        self.__published.update(published)
+
+        if year is not None:
+            self.__years[year] = min(date(year, 12, 31), max(date.today(), self.__years.get(year, date.min)))
+
+        self.__build_days()
+
+    def __build_days(self):
+        """Index rates by all days, days without rates get rates of the last published day
+
+        Days are filled only within loaded years (and the first days of year after the loaded one).
+        """
+        days = {}
+        published_days = sorted(self.__published)
+
+        for idx, day in enumerate(published_days):
+            last_day = self.__years.get(day.year, day)
+            if idx + 1 < len(published_days):
+                next_day = published_days[idx + 1]
+                if next_day.year == day.year or (next_day.year == day.year + 1 and next_day.year in self.__years):
+                    last_day = next_day - timedelta(days=1)
+
+            rates = self.__published[day]
+            while day <= last_day:
+                days[day] = rates
+                day += timedelta(days=1)
+
+        self.__days = days
+
+
 class CNBExchangeRates(ExchangeRatesInterface):
     """Wrapper for communicating with Czech national bank for getting the exchange rates
 
@@ -26,23 +238,131 @@ class CNBExchangeRates(ExchangeRatesInterface):
 
     All rates are saved with respect to czech crown.
 
+    Rates are loaded on the first use (not when the instance is created) and only when some
+    rate is not hard-coded. Loaded rates are saved to a snapshot file, which is used instead of
+    the national bank until it is older than the TTL. In offline mode only the snapshot file is used
+    (regardless its age).
+
+    Rates of other days than today are taken from the history store (see `CNBExchangeRatesHistory`).
+
     :param predefined_rates: Dictionary of exchange rates given by configuration
+    :param snapshot_path: Path to the snapshot file with rates (None means the default file in temporary directory)
+    :param ttl: Maximal age of the snapshot file in seconds
+    :param offline: Flag whenever only the snapshot files should be used
+    :param history_path: Path to the snapshot file with history of rates (None means the default file in temporary directory)
+    :ivar history: Store of historical rates
     """
 
     _CNB_API_RATES = "https://www.cnb.cz/cs/financni-trhy/devizovy-trh/kurzy-devizoveho-trhu/kurzy-devizoveho-trhu/denni_kurz.txt"
     _UNITS_CURRENCIES = ['CZK', 'GBP', 'EUR', 'USD']
 
-    def __init__(self, predefined_rates: Dict[str, float] = None):
-        self.rates = CNBExchangeRates.load_rates()
+    #: Default path of the snapshot file
+    DEFAULT_SNAPSHOT_PATH = os.path.join(tempfile.gettempdir(), 'cubbitt-fixer-cnb-rates.json')
+
+    #: Default maximal age of the snapshot file in seconds
+    DEFAULT_TTL = 12 * 60 * 60
+
+    def __init__(self, predefined_rates: Dict[str, float] = None, *, snapshot_path: Optional[str] = None, ttl: float = DEFAULT_TTL, offline: bool = False,
+                 history_path: Optional[str] = None):
+        self.snapshot_path = snapshot_path or CNBExchangeRates.DEFAULT_SNAPSHOT_PATH
+        self.ttl = ttl
+        self.offline = offline
+        self.history = CNBExchangeRatesHistory(history_path, offline)
+
+        self.__lock = threading.Lock()
+        self.__rates = None
+        self.__static_rates = {}
 
         if predefined_rates:
             self.load_static_rates(predefined_rates)
 
-    def load_static_rates(self, predefined_rates: Dict[str, float]):
+    @property
+    def rates(self) -> Dict[str, float]:
+        """Rates of currencies to czech crown, they are loaded on the first use"""
+        if self.__rates is None:
+            with self.__lock:
+                if self.__rates is None:
+                    rates = {}
+                    if any(currency not in self.__static_rates for currency in CNBExchangeRates._UNITS_CURRENCIES if currency != 'CZK'):
+                        rates = self.__load_rates_with_snapshot()
+
+                    rates.update(self.__static_rates)
+                    self.__rates = rates
+
+        return self.__rates
+
+    def configure(self, snapshot_path: Optional[str] = None, ttl: Optional[float] = None, offline: Optional[bool] = None, history_path: Optional[str] = None):
+        """Change the snapshot files, TTL or offline mode, not given values are kept
+
+        Already loaded rates are forgotten, so they are loaded again with the new settings.
+        """
+        with self.__lock:
+            if snapshot_path is not None:
+                self.snapshot_path = snapshot_path
+            if ttl is not None:
+                self.ttl = ttl
+            if offline is not None:
+                self.offline = offline
+
+            self.__rates = None
+            self.history = CNBExchangeRatesHistory(history_path or self.history.snapshot_path, self.offline)
+
+    def get_rates(self, rates_date: Optional[date] = None) -> Dict[str, float]:
+        """Returns rates of currencies to czech crown valid on given day (actual rates when no day is given)"""
+        if rates_date is None:
+            return self.rates
+
+        return {**self.history.get_rates(rates_date), **self.__static_rates}
+
+    def load_static_rates(self, predefined_rates: Dict[str, float]) -> 'CNBExchangeRates':
         """Override rates loaded from CNB for hard-coded rates given by configuration"""
-        for abbr, rate in predefined_rates.items():
-            if abbr in self.rates:
-                self.rates[abbr] = rate
+        with self.__lock:
+            for abbr, rate in predefined_rates.items():
+                if abbr in CNBExchangeRates._UNITS_CURRENCIES and abbr != 'CZK':
+                    self.__static_rates[abbr] = rate
+                    if self.__rates is not None:
+                        self.__rates[abbr] = rate
+
+        return self
+
+    def __load_rates_with_snapshot(self) -> Dict[str, float]:
+        """Load rates from the snapshot file when it is fresh enough, otherwise from CNB (and save them to the snapshot)"""
+        rates = CNBExchangeRates.load_snapshot(self.snapshot_path, None if self.offline else self.ttl)
+
+        if rates is not None:
+            return rates
+
+        if self.offline:
+            raise CNBCommunicationException(f'Exchange rates snapshot {self.snapshot_path} cannot be loaded in offline mode.')
+
+        rates = CNBExchangeRates.load_rates()
+        CNBExchangeRates.save_snapshot(self.snapshot_path, rates)
+
+        return rates
+
+    @staticmethod
+    def load_snapshot(path: str, ttl: Optional[float] = None) -> Optional[Dict[str, float]]:
+        """Load rates from the snapshot file
+
+        :param path: Path to the snapshot file
+        :param ttl: Maximal age of the file in seconds (None means any age)
+        :return: Rates or None when the file does not exist, is too old or broken
+        """
+        try:
+            if ttl is not None and time.time() - os.path.getmtime(path) > ttl:
+                return None
+
+            with open(path, 'r', encoding='utf-8') as snapshot_file:
+                snapshot = json.load(snapshot_file)
+
+            return {abbr: float(rate) for abbr, rate in snapshot['rates'].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    @staticmethod
+    def save_snapshot(path: str, rates: Dict[str, float]):
+        """Save rates to the snapshot file, rates are just not saved when the file cannot be written"""
+        save_json_file(path, {'date': date.today().isoformat(), 'rates': rates})
 
     @staticmethod
     def load_rates():
@@ -61,7 +381,10 @@ class CNBExchangeRates(ExchangeRatesInterface):
         :return: Dictionary with currencies codes as keys and rates to czech crown as value
         """
         complete_url = "{}?date={}".format(CNBExchangeRates._CNB_API_RATES, date.today().strftime("%d.%m.%Y"))
-        response = requests.get(complete_url)
+        try:
+            response = http_session.get(complete_url)
+        except requests.RequestException as error:
+            raise CNBCommunicationException('It was not possible to connect to the CNB official website.') from error
 
         if response.status_code != 200:
             raise CNBCommunicationException('It was not possible to connect to the CNB official website.')
@@ -79,7 +402,7 @@ class CNBExchangeRates(ExchangeRatesInterface):
 
         return rates
 
-    def get_rate(self, original_currency: str, exchanged_currency: str, amount: float) -> float:
+    def get_rate(self, original_currency: str, exchanged_currency: str, amount: float, rates_date: Optional[date] = None) -> float:
         """Returns recalculated amount of money from original currency to target one
 
         Recalculating is provided by currencies given from user or the CNB.
@@ -90,19 +413,30 @@ class CNBExchangeRates(ExchangeRatesInterface):
         :param original_currency: Code of currency of param amount
         :param exchanged_currency: Code of currency to be converted to
         :param amount: Amount of money to be converted
+        :param rates_date: Day of the used rates (actual rates are used when it is not given)
         :return: Converted amount of money to target currency
         """
         if original_currency == exchanged_currency:
             return amount
 
         if original_currency != 'CZK':
-            amount *= self.rates[original_currency]
+            amount *= self.__get_currency_rate(original_currency, rates_date)
 
         if exchanged_currency != 'CZK':
-            amount /= self.rates[exchanged_currency]
+            amount /= self.__get_currency_rate(exchanged_currency, rates_date)
 
         return amount
 
+    def __get_currency_rate(self, currency: str, rates_date: Optional[date]) -> float:
+        """Returns rate of the currency to czech crown, hard-coded rates are used for all days"""
+        if rates_date is None:
+            return self.rates[currency]
+
+        if currency in self.__static_rates:
+            return self.__static_rates[currency]
+
+        return self.history.get_rate(currency, rates_date)
+
 
 exchange_rates_convertor = CNBExchangeRates()
 
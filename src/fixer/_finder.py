@@ -52,6 +52,14 @@ def prepare_find_numbers_pattern() -> Dict[Language, re.Pattern]:
     }
 
 
+def prepare_find_units_pattern() -> Dict[Language, re.Pattern]:
+    """Prepares regex patterns for searching words of units (with word boundaries) for the finder"""
+    return {
+        Languages.CS: re.compile(rf"\b({units.get_regex_units_for_language(Languages.CS)})\b"),
+        Languages.EN: re.compile(rf"\b({units.get_regex_units_for_language(Languages.EN)})\b"),
+    }
+
+
 def prepare_find_numbers_pattern_one_language(language: Language) -> re.Pattern:
     """Prepare regex patter based on given language"""
     units_before = units.get_regex_units_for_language_before_numbers(language)
@@ -78,6 +86,10 @@ class Finder:
 
     __FIND_NUMBERS_PATTERN = prepare_find_numbers_pattern()  #: :meta hide-value:
 
+    __FIND_UNITS_PATTERN = prepare_find_units_pattern()  #: :meta hide-value:
+
+    __DIGIT_PATTERN = re.compile(r"\d")
+
     @staticmethod
     def find_number_unit_pairs(sentence: str, language: Language) -> List[NumberUnitFinderResult]:
         """Search in sentence for number (and units) parts
@@ -86,13 +98,18 @@ class Finder:
         searched within the input sentence. Also the approximately
         phrases are searched.
 
-        Non-parsable numbers are skipped.
+        Non-parsable numbers are skipped. Sentences without any digit are not searched at all
+        (all parts of the regular expression need a digit).
 
         :param sentence: Sentence to search in
         :param language: Language of the sentence
         :return: List of found numbers
         """
         pairs = []
+
+        if not Finder.__DIGIT_PATTERN.search(sentence):
+            return pairs
+
         for part in re.finditer(Finder.__FIND_NUMBERS_PATTERN[language], sentence):
             whole_match = part.group(0).strip(" .,-")
 
@@ -165,6 +182,9 @@ class Finder:
         values = Finder.__split_siblings_numbers(values, language)
         found_number_units = []
 
+        # units are searched only once for all phrases
+        units_in_sentence = list(Finder.__FIND_UNITS_PATTERN[language].finditer(sentence)) if values else []
+
         for phrase in values:
             # skip phrases containing only punctuation, digits and non number words
             if all(word['upostag'] == 'PUNCT' or word['word'][0].isdigit() or word['word'] == "and" or word['word'] == "a" for word in phrase):
@@ -183,8 +203,8 @@ class Finder:
             end = phrase[-1]['rangeEnd']
             matched_unit = None
             whole_match = sentence[start:end]
-            for unit in re.finditer(rf"\b({units.get_regex_units_for_language(language)})\b", sentence):
-                if unit.group(0).strip() in units.get_units_for_language_before_numbers_list(language) and 0 <= (start - unit.end()) <= 2:
+            for unit in units_in_sentence:
+                if unit.group(0).strip() in units.get_units_for_language_before_numbers_set(language) and 0 <= (start - unit.end()) <= 2:
                     matched_unit = unit.group(0)
                     whole_match = sentence[unit.start():end]
                     break
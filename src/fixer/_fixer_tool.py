@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import List, Tuple, FrozenSet
 
+from ._lemmatization import AnnotationLayers
 from ._sentence_pair import SentencePair
 from .fixer_statistics import FixerStatisticsMarks as StatisticsMarks
 
@@ -11,3 +12,28 @@ class FixerToolInterface(ABC):
     @abstractmethod
     def fix(self, sentence_pair: SentencePair) -> Tuple[str, List[StatisticsMarks]]:
         pass
+
+    def is_applicable(self, source_text: str, target_text: str) -> bool:
+        """Cheap check whenever the tool can change anything in the given sentences.
+
+        When it returns False, the tool is not run for the sentences at all (so
+        no external tools are called). The check should be conservative - it should
+        skip only sentences the tool would leave untouched.
+        """
+        return True
+
+    def get_annotation_layers(self) -> FrozenSet[AnnotationLayers]:
+        """Layers of the sentence analysis (lemmas of `SentencePair`) read by the tool.
+
+        Only the layers needed by some of the tools are requested from the lemmatizator.
+        Tools not using the analysis do not need to override it.
+        """
+        return frozenset()
+
+    def prefetch(self, sentence_pairs: List[SentencePair]):
+        """Load outputs of external tools needed by `fix` for all given pairs at once.
+
+        It is called before fixing a batch of sentences. Tools not using
+        any external tool do not need to override it.
+        """
+        pass
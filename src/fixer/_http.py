@@ -0,0 +1,85 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpSession:
+    """Shared HTTP session used by all external tools (UDPipe, NameTag, aligner, CNB)
+
+    Connections are kept alive and reused between requests (so the TCP and TLS
+    handshakes are done only once per host), each host has its own pool of connections.
+    All requests have connect and read timeouts, so a stalled service cannot block the fixer forever.
+
+    The session can be shared by more threads. Each process (eg. after fork) creates its own session.
+
+    :param connect_timeout: Timeout for connecting to the server (in seconds)
+    :param read_timeout: Timeout for reading the response (in seconds)
+    :param pool_size: Maximal count of kept connections to one host
+    """
+
+    #: Count of hosts with kept connections
+    __POOL_HOSTS = 10
+
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 60.0, pool_size: int = 10):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_size = pool_size
+
+        self.__lock = threading.Lock()
+        self.__session = None
+        self.__session_pid = None
+
+    def configure(self, connect_timeout: float = None, read_timeout: float = None, pool_size: int = None):
+        """Change the timeouts or size of the pools, not given values are kept"""
+        with self.__lock:
+            if connect_timeout is not None:
+                self.connect_timeout = connect_timeout
+            if read_timeout is not None:
+                self.read_timeout = read_timeout
+            if pool_size is not None and pool_size != self.pool_size:
+                self.pool_size = pool_size
+                self.__close_session()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Provide a HTTP GET request, arguments are the same as for `requests.get`"""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Provide a HTTP POST request, arguments are the same as for `requests.post`"""
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Provide a HTTP request with the shared session, default timeouts are used when not given"""
+        kwargs.setdefault('timeout', (self.connect_timeout, self.read_timeout))
+        return self.__get_session().request(method, url, **kwargs)
+
+    def close(self):
+        """Close all kept connections"""
+        with self.__lock:
+            self.__close_session()
+
+    def __get_session(self) -> requests.Session:
+        """Returns session of the current process, it is created when necessary"""
+        with self.__lock:
+            if self.__session is None or self.__session_pid != os.getpid():
+                adapter = HTTPAdapter(pool_connections=HttpSession.__POOL_HOSTS, pool_maxsize=self.pool_size)
+
+                self.__session = requests.Session()
+                self.__session.mount('http://', adapter)
+                self.__session.mount('https://', adapter)
+                self.__session_pid = os.getpid()
+
+            return self.__session
+
+    def __close_session(self):
+        """Close the session of the current process, the next request creates the new one"""
+        if self.__session is not None and self.__session_pid == os.getpid():
+            self.__session.close()
+
+        self.__session = None
+        self.__session_pid = None
+
+
+http_session = HttpSession()
@@ -1,5 +1,7 @@
 import re
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+
+from ._numbers_validity import NumbersValidity
 
 
 class WrongLanguage(ValueError):
@@ -35,6 +37,19 @@ class Language:
 
         self.big_numbers_scale_keys = "|".join([re.escape(i) for i in self.big_numbers_scale.keys()])
 
+        # validity rules are compiled once, words which cannot be used for replacing are left out
+        self.__scaling_words = {}
+        for word, (scaling, validity) in self.big_numbers_scale.items():
+            if validity is not None:
+                self.__scaling_words.setdefault(scaling, []).append((word, NumbersValidity.compile(validity) if validity else None))
+
+    def get_scaling_words(self, scaling: int) -> List[Tuple[str, Optional[NumbersValidity]]]:
+        """Get scaling words with given value usable for replacing and their compiled validity rules
+
+        Validity is None for words which can be used with all numbers.
+        """
+        return self.__scaling_words.get(scaling, [])
+
 
 class Languages:
     """Wrapper of languages supported by the package."""
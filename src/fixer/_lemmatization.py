@@ -1,12 +1,17 @@
 import json
 import os
+import threading
+from bisect import bisect_right
 from abc import ABC, abstractmethod
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum, auto
+from itertools import chain
+from typing import List, Tuple, Dict, Iterable, Optional, FrozenSet
 
 import requests
-from conllu import parse
 from ufal.udpipe import Model, Pipeline, ProcessingError
 
+from ._http import http_session
 from ._languages import Language, Languages
 
 
@@ -15,16 +20,29 @@ class LemmatizationException(Exception):
     pass
 
 
+class AnnotationLayers(Enum):
+    """Layers of sentence analysis which can be requested from the lemmatization tools"""
+    TOKENS = auto()  #: Words with their ranges in the text
+    UPOS = auto()  #: Universal part-of-speech tags
+    LEMMA = auto()  #: Lemmas of the words
+    DEPENDENCY = auto()  #: Dependency relations (head and relation type)
+
+
+#: All layers of the analysis
+ALL_ANNOTATION_LAYERS = frozenset(AnnotationLayers)
+
+
 class LemmatizationInterface(ABC):
     """Interface for working with lemmatization tools.
 
     Implementations of this interface should provide a lemmatization of
-    a given sentence / text.
+    a given sentence / text. Only the requested layers of the analysis have to be
+    filled, so tools can skip the expensive parts (eg. dependency parsing).
     """
 
     @staticmethod
     @abstractmethod
-    def get_lemmatization(src_text: str, language: Language) -> List[dict]:
+    def get_lemmatization(src_text: str, language: Language, layers: FrozenSet[AnnotationLayers] = ALL_ANNOTATION_LAYERS) -> List[dict]:
         """Main alignment method returning the word-alignment."""
         pass
 
@@ -33,52 +51,205 @@ class LemmatizationInterface(ABC):
     def get_sentences_split(src_text: str, language: Language) -> List[List[str]]:
         pass
 
+    def get_lemmatizations(self, texts: List[str], language: Language, layers: FrozenSet[AnnotationLayers] = ALL_ANNOTATION_LAYERS) -> List[List[dict]]:
+        """Returns analysis of each given sentence. Tools supporting more sentences per call should override it."""
+        return [self.get_lemmatization(text, language, layers) for text in texts]
+
+    def get_sentences_analysis(self, src_text: str, language: Language, layers: FrozenSet[AnnotationLayers] = ALL_ANNOTATION_LAYERS) -> List[Tuple[str, List[dict]]]:
+        """Returns sentences of the text (regardless the paragraphs) with their analysis, ranges are relative to the sentence.
+
+        Tools able to split and analyse the text at once should override it.
+        """
+        sentences = [sentence for paragraph in self.get_sentences_split(src_text, language) for sentence in paragraph]
+        return list(zip(sentences, self.get_lemmatizations(sentences, language, layers)))
+
 
 class UDPipeProcessor:
 
+    #: Separator of texts processed together, empty line always ends the sentence
+    TEXTS_SEPARATOR = "\n\n"
+
+    #: Layers which need the tagger of UDPipe (the parser uses the tags as well)
+    __TAGGER_LAYERS = frozenset({AnnotationLayers.UPOS, AnnotationLayers.LEMMA, AnnotationLayers.DEPENDENCY})
+
+    @staticmethod
+    def get_tools(layers: FrozenSet[AnnotationLayers]) -> Tuple[bool, bool]:
+        """Returns flags whenever the tagger and the parser of UDPipe have to run for given layers (the tokenizer runs always)"""
+        return bool(layers & UDPipeProcessor.__TAGGER_LAYERS), AnnotationLayers.DEPENDENCY in layers
+
     @staticmethod
-    def process_udpipe_output(conllu_string: str) -> List[dict]:
-        """Parse output of the UDPipe in Conllu format."""
+    def join_texts(texts: List[str]) -> Tuple[str, List[int]]:
+        """Join more texts into one so they can be processed by one UDPipe call.
+
+        :return: Joined texts and offsets where each text starts
+        """
+        offsets = []
+        position = 0
+
+        for text in texts:
+            offsets.append(position)
+            position += len(text) + len(UDPipeProcessor.TEXTS_SEPARATOR)
+
+        return UDPipeProcessor.TEXTS_SEPARATOR.join(texts), offsets
+
+    @staticmethod
+    def split_by_texts(lemmas: List[dict], offsets: List[int]) -> List[List[dict]]:
+        """Divide analysis of joined texts (see `join_texts`) back to the texts, ranges are moved to be relative to the text"""
+        texts_lemmas = [[] for _ in offsets]
+
+        for lemma in lemmas:
+            text_idx = bisect_right(offsets, lemma['rangeStart']) - 1
+            lemma['rangeStart'] -= offsets[text_idx]
+            lemma['rangeEnd'] -= offsets[text_idx]
+            texts_lemmas[text_idx].append(lemma)
+
+        return texts_lemmas
+
+    @staticmethod
+    def process_udpipe_output(conllu_string: str, dependencies: bool = False) -> List[dict]:
+        """Parse output of the UDPipe in Conllu format.
+
+        Only the columns used by the fixer (form, lemma, universal POS tag and the token range
+        from the misc column) are read in one pass over the lines. Tokens without the range
+        (words of multi-word tokens) are skipped.
+
+        :param conllu_string: Output of the UDPipe
+        :param dependencies: Flag whenever the head and the dependency relation should be read as well
+        """
         lemmas = []
 
-        for sentence in parse(conllu_string):
-            for token in sentence:
-                if not token['misc']:
-                    continue
-                token_start, token_end = token['misc']['TokenRange'].split(':')
-                lemmas.append({
-                    'upostag': token['upos'],
-                    'word': token['form'],
-                    'lemma': token['lemma'],
-                    'rangeStart': int(token_start),
-                    'rangeEnd': int(token_end)
-                })
+        for line in conllu_string.split('\n'):
+            if not line or line[0] == '#':
+                continue
+
+            lemma = UDPipeProcessor.__parse_token_line(line, dependencies)
+            if lemma is not None:
+                lemmas.append(lemma)
 
         return lemmas
 
+    @staticmethod
+    def split_by_sentences(conllu_string: str, dependencies: bool = False) -> List[Tuple[str, List[dict]]]:
+        """Split output of the UDPipe into sentences (`# text = ...` comments) with their analysis
+
+        Texts of the sentences can differ from the processed text in whitespaces, so the ranges
+        are moved by searching the words one by one in the sentence text.
+
+        :param conllu_string: Output of the UDPipe
+        :param dependencies: Flag whenever the head and the dependency relation should be read as well
+        """
+        sentences = []
+        text = None
+        lemmas = []
+
+        # the empty line added at the end closes the last sentence
+        for line in chain(conllu_string.split('\n'), ('',)):
+            if line.startswith('#'):
+                key, _, value = line[1:].partition('=')
+                if key.strip() == 'text':
+                    text = value.strip()
+
+            elif line.strip():
+                lemma = UDPipeProcessor.__parse_token_line(line, dependencies)
+                if lemma is not None:
+                    lemmas.append(lemma)
+
+            elif text is not None:
+                position = 0
+                for lemma in lemmas:
+                    length = lemma['rangeEnd'] - lemma['rangeStart']
+                    found = text.find(lemma['word'], position)
+                    lemma['rangeStart'] = found if found >= 0 else position
+                    lemma['rangeEnd'] = position = lemma['rangeStart'] + length
+
+                sentences.append((text, lemmas))
+                text = None
+                lemmas = []
+
+        return sentences
+
+    @staticmethod
+    def __parse_token_line(line: str, dependencies: bool) -> Optional[dict]:
+        """Returns analysis of the token from the line of the Conllu format, None for lines without the token range"""
+        columns = line.split('\t')
+        if len(columns) < 10:
+            return None
+
+        token_range = UDPipeProcessor.__get_misc_value(columns[9].strip(), 'TokenRange')
+        if token_range is None:
+            return None
+
+        token_start, token_end = token_range.split(':')
+        lemma = {
+            'upostag': columns[3],
+            'word': columns[1],
+            'lemma': columns[2],
+            'rangeStart': int(token_start),
+            'rangeEnd': int(token_end)
+        }
+
+        if dependencies:
+            lemma['head'] = columns[6]
+            lemma['deprel'] = columns[7]
+
+        return lemma
+
     @staticmethod
     def split_by_paragraphs_sentences(conllu_string: str) -> List[List[str]]:
-        """Split given text into paragraphs and sentences based on conllu UDPipe response."""
+        """Split given text into paragraphs and sentences based on conllu UDPipe response.
+
+        Only comments of the sentences (`# newpar` and `# text = ...`) are read.
+        """
         paragraphs = []
         actual_paragraph = []
 
-        for sentence in parse(conllu_string):
-            metadata = sentence.metadata
-            if 'newpar' in metadata and actual_paragraph:
-                paragraphs.append(actual_paragraph)
-                actual_paragraph = []
+        new_paragraph = False
+        text = None
 
-            actual_paragraph.append(metadata['text'])
+        # the empty line added at the end closes the last sentence
+        for line in chain(conllu_string.split('\n'), ('',)):
+            line = line.strip()
+
+            if line.startswith('#'):
+                key, _, value = line[1:].partition('=')
+                key = key.strip()
+
+                if key == 'newpar':
+                    new_paragraph = True
+                elif key == 'text':
+                    text = value.strip()
+
+            elif not line and text is not None:
+                if new_paragraph and actual_paragraph:
+                    paragraphs.append(actual_paragraph)
+                    actual_paragraph = []
+
+                actual_paragraph.append(text)
+                new_paragraph = False
+                text = None
 
         paragraphs.append(actual_paragraph)
 
         return paragraphs
 
+    @staticmethod
+    def __get_misc_value(misc: str, key: str) -> Optional[str]:
+        """Returns value of the key from the misc column (items are separated by `|`), None when it is missing"""
+        if misc == '_':
+            return None
+
+        for item in misc.split('|'):
+            item_key, separator, value = item.partition('=')
+            if separator and item_key == key:
+                return value
+
+        return None
+
 
 class UDPipeOnline(LemmatizationInterface):
     """Class for communicating with external web service UDPipe.
 
-    UDPipe was developed at UFAL MFF CUNI. Based on GET request it returns
+    UDPipe was developed at UFAL MFF CUNI. Based on HTTP request it returns
     lemmatization among others. The response is in CoNLL-U format.
     """
 
@@ -86,17 +257,24 @@ class UDPipeOnline(LemmatizationInterface):
     __UDPIPE_URL = "http://lindat.mff.cuni.cz/services/udpipe/api/process"
 
     @staticmethod
-    def __do_http_request(src_text: str, language: Language, operations: str) -> dict:
-        """Provide a HTTP GET request to online UDPipe API, parse JSON response
+    def __do_http_request(src_text: str, language: Language, operations: Dict[str, str]) -> dict:
+        """Provide a HTTP POST request to online UDPipe API, parse JSON response
+
+        POST is used so the text can be long (more sentences processed at once).
 
         :param src_text: Source text to be send to UDPipe
         :param language: Language of the source text
         :param operations: List of tools to be run by UDPipe (tokenizer, tagger, parser, etc.)
         :return: Parsed JSON object
         """
-        model = "&model=en" if language is not Languages.CS else ""
-        complete_url = "{}?{}{}&data={}".format(UDPipeOnline.__UDPIPE_URL, operations, model, src_text)
-        response = requests.get(complete_url)
+        payload = dict(operations, data=src_text)
+        if language is not Languages.CS:
+            payload['model'] = 'en'
+
+        try:
+            response = http_session.post(UDPipeOnline.__UDPIPE_URL, data=payload)
+        except requests.RequestException as error:
+            raise LemmatizationException('UDPIPE was not able to connect to the UDPipe web service.') from error
 
         if response.status_code != 200:
             raise LemmatizationException('UDPIPE was not able to connect to the UDPipe web service.')
@@ -104,19 +282,49 @@ class UDPipeOnline(LemmatizationInterface):
         return json.loads(response.content)
 
     @staticmethod
-    def get_lemmatization(src_text: str, language: Language) -> List[dict]:
-        """Get sentence analysis of the given sentence from online UDPipe"""
+    def __get_operations(layers: FrozenSet[AnnotationLayers]) -> Dict[str, str]:
+        """Returns tools run by UDPipe for sentence analysis with given layers"""
+        tagger, parser = UDPipeProcessor.get_tools(layers)
+        operations = {'tokenizer': 'ranges'}
+
+        if tagger:
+            operations['tagger'] = ''
+        if parser:
+            operations['parser'] = ''
+
+        return operations
+
+    @staticmethod
+    def get_lemmatization(src_text: str, language: Language, layers: FrozenSet[AnnotationLayers] = ALL_ANNOTATION_LAYERS) -> List[dict]:
+        """Get sentence analysis of the given sentence from online UDPipe, only tools needed for the layers are run"""
+
+        response = UDPipeOnline.__do_http_request(src_text, language, UDPipeOnline.__get_operations(layers))
+        return UDPipeProcessor.process_udpipe_output(response['result'], AnnotationLayers.DEPENDENCY in layers)
+
+    @staticmethod
+    def get_lemmatizations(texts: List[str], language: Language, layers: FrozenSet[AnnotationLayers] = ALL_ANNOTATION_LAYERS) -> List[List[dict]]:
+        """Get analysis of all given sentences from online UDPipe with one request"""
+        if not texts:
+            return []
 
-        response = UDPipeOnline.__do_http_request(src_text, language, "tokenizer=ranges&tagger&parser")
-        return UDPipeProcessor.process_udpipe_output(response['result'])
+        joined_text, offsets = UDPipeProcessor.join_texts(texts)
+        response = UDPipeOnline.__do_http_request(joined_text, language, UDPipeOnline.__get_operations(layers))
+        return UDPipeProcessor.split_by_texts(UDPipeProcessor.process_udpipe_output(response['result'], AnnotationLayers.DEPENDENCY in layers), offsets)
 
     @staticmethod
     def get_sentences_split(src_text: str, language: Language) -> List[List[str]]:
         """Use online UDPipe to divide source text into paragraphs and sentences"""
 
-        response = UDPipeOnline.__do_http_request(src_text, language, "tokenizer=ranges")
+        response = UDPipeOnline.__do_http_request(src_text, language, {'tokenizer': 'ranges'})
         return UDPipeProcessor.split_by_paragraphs_sentences(response['result'])
 
+    @staticmethod
+    def get_sentences_analysis(src_text: str, language: Language, layers: FrozenSet[AnnotationLayers] = ALL_ANNOTATION_LAYERS) -> List[Tuple[str, List[dict]]]:
+        """Use online UDPipe to divide source text into sentences and analyse them with one request"""
+
+        response = UDPipeOnline.__do_http_request(src_text, language, UDPipeOnline.__get_operations(layers))
+        return UDPipeProcessor.split_by_sentences(response['result'], AnnotationLayers.DEPENDENCY in layers)
+
 
 class UDPipeOffline(LemmatizationInterface):
     """Class for communicating with locally installed UDPipe
@@ -125,6 +333,11 @@ class UDPipeOffline(LemmatizationInterface):
     a python package which is wrapper on origin C++ tool.
 
     It downloads models from internet if they are not downloaded yet.
+    Model of a language is loaded on its first use (or by `load_models`), models
+    of different languages can be loaded at the same time.
+
+    One instance can be used by more threads. UDPipe pipelines are not safe
+    for concurrent use, so each pipeline processes one text at a time.
     """
 
     #: Path to models
@@ -140,14 +353,57 @@ class UDPipeOffline(LemmatizationInterface):
     __LINDAT_BASE_URL = 'https://lindat.mff.cuni.cz/repository/xmlui/bitstream/handle/11234/1-3131/'
 
     def __init__(self):
-        self.__verify_download_file(UDPipeOffline.__CZECH_MODEL_NAME)
-        self.__verify_download_file(UDPipeOffline.__ENGLISH_MODEL_NAME)
+        self.__models = {}
+        self.__locks = {model_name: threading.Lock() for model_name in (UDPipeOffline.__CZECH_MODEL_NAME, UDPipeOffline.__ENGLISH_MODEL_NAME)}
+
+    def load_models(self, languages: Iterable[Language]) -> 'UDPipeOffline':
+        """Load models of given languages in advance, models are loaded in parallel
+
+        :raise LemmatizationException: Raised when some model cannot be prepared
+        """
+        models_names = {UDPipeOffline.__get_model_name(language) for language in languages}
+
+        with ThreadPoolExecutor(max_workers=max(len(models_names), 1)) as executor:
+            for loading in [executor.submit(self.__get_pipelines, model_name) for model_name in models_names]:
+                loading.result()
+
+        return self
+
+    def is_loaded(self, language: Language) -> bool:
+        """Checks whenever the model of the language is already loaded"""
+        return UDPipeOffline.__get_model_name(language) in self.__models
+
+    @staticmethod
+    def __get_model_name(language: Language) -> str:
+        """Returns name of the model used for the language"""
+        return UDPipeOffline.__ENGLISH_MODEL_NAME if language is not Languages.CS else UDPipeOffline.__CZECH_MODEL_NAME
+
+    def __get_pipelines(self, model_name: str) -> Dict[Tuple[bool, bool], Tuple[Pipeline, threading.Lock]]:
+        """Returns pipelines of the model (with their locks) by flags whenever they run the tagger and the parser, the model is loaded on the first call
 
-        self.__czech_model = Model.load(UDPipeOffline.__MODEL_PATH + UDPipeOffline.__CZECH_MODEL_NAME)
-        self.__english_model = Model.load(UDPipeOffline.__MODEL_PATH + UDPipeOffline.__ENGLISH_MODEL_NAME)
+        Pipeline without the tagger and the parser is used for splitting into sentences.
+        Only calls waiting for the same model are blocked while the model is loaded.
+        """
+        loaded = self.__models.get(model_name)
+        if loaded is not None:
+            return loaded[1]
+
+        with self.__locks[model_name]:
+            if model_name not in self.__models:
+                self.__verify_download_file(model_name)
+
+                model = Model.load(UDPipeOffline.__MODEL_PATH + model_name)
+                if model is None:
+                    raise LemmatizationException("Cannot load the model %s" % model_name)
+
+                # the model is kept with the pipelines, they use it without holding a reference
+                self.__models[model_name] = (model, {
+                    (tagger, parser): (Pipeline(model, 'tokenizer=ranges', Pipeline.DEFAULT if tagger else Pipeline.NONE,
+                                                Pipeline.DEFAULT if parser else Pipeline.NONE, "conllu"), threading.Lock())
+                    for tagger in (False, True) for parser in (False, True)
+                })
 
-        self.__czech_pipeline = Pipeline(self.__czech_model, 'tokenizer=ranges', Pipeline.DEFAULT, Pipeline.DEFAULT, "conllu")
-        self.__english_pipeline = Pipeline(self.__english_model, 'tokenizer=ranges', Pipeline.DEFAULT, Pipeline.DEFAULT, "conllu")
+        return self.__models[model_name][1]
 
     @staticmethod
     def __verify_download_file(model_name: str):
@@ -163,7 +419,10 @@ class UDPipeOffline(LemmatizationInterface):
                 raise LemmatizationException("Creation of the directory %s failed" % UDPipeOffline.__MODEL_PATH)
 
         if not os.path.isfile(UDPipeOffline.__MODEL_PATH + model_name):  # verifies existence (or download) models
-            r = requests.get(UDPipeOffline.__LINDAT_BASE_URL + model_name)
+            try:
+                r = http_session.get(UDPipeOffline.__LINDAT_BASE_URL + model_name)
+            except requests.RequestException as error:
+                raise LemmatizationException("Cannot download the offline model for the UDPipe") from error
             if r.status_code != 200:
                 raise LemmatizationException("Cannot download the offline model for the UDPipe")
 
@@ -172,38 +431,59 @@ class UDPipeOffline(LemmatizationInterface):
         if not os.path.isfile(UDPipeOffline.__MODEL_PATH + model_name):  # verifies existence models
             raise LemmatizationException("Cannot prepare the model")
 
-    def get_lemmatization(self, src_text: str, language: Language) -> List[dict]:
+    def __process(self, src_text: str, language: Language, tools: Tuple[bool, bool]) -> str:
+        """Run the pipeline of the language with given tools on the text, returns output in the CoNLL-U format
+
+        :raise LemmatizationException: Raised when external library cannot process the text
+        """
+        pipeline, lock = self.__get_pipelines(UDPipeOffline.__get_model_name(language))[tools]
+        error = ProcessingError()
+
+        with lock:
+            processed = pipeline.process(src_text, error)
+        if error.occurred():
+            raise LemmatizationException("Cannot get the lemmatization from the UDPipe service:" + error.message)
+
+        return processed
+
+    def get_lemmatization(self, src_text: str, language: Language, layers: FrozenSet[AnnotationLayers] = ALL_ANNOTATION_LAYERS) -> List[dict]:
         """Get sentence analysis of the given sentence from offline UDPipe
 
         :param src_text: Source text to be analysed
         :param language: Language of the source test
+        :param layers: Requested layers of the analysis, only the parts of the pipeline needed for them are run
         :return: List of tokens with analysis
         :raise LemmatizationException: Raised when external library cannot process the sentence
         """
-        pipeline = self.__english_pipeline if language is not Languages.CS else self.__czech_pipeline
+        processed = self.__process(src_text, language, UDPipeProcessor.get_tools(layers))
+        return UDPipeProcessor.process_udpipe_output(processed, AnnotationLayers.DEPENDENCY in layers)
 
-        error = ProcessingError()
+    def get_lemmatizations(self, texts: List[str], language: Language, layers: FrozenSet[AnnotationLayers] = ALL_ANNOTATION_LAYERS) -> List[List[dict]]:
+        """Get analysis of all given sentences from offline UDPipe with one run of the pipeline
 
-        processed = pipeline.process(src_text, error)
-        if error.occurred():
-            raise LemmatizationException("Cannot get the lemmatization from the UDPipe service:" + error.message)
+        :raise LemmatizationException: Raised when external library cannot process the sentences
+        """
+        if not texts:
+            return []
 
-        return UDPipeProcessor.process_udpipe_output(processed)
+        joined_text, offsets = UDPipeProcessor.join_texts(texts)
+        return UDPipeProcessor.split_by_texts(self.get_lemmatization(joined_text, language, layers), offsets)
 
     def get_sentences_split(self, src_text: str, language: Language) -> List[List[str]]:
         """Use offline UDPipe to divide source text into paragraphs and sentences
 
         :raise LemmatizationException: Raised when external library cannot process the sentence
         """
-        model = self.__english_model if language is not Languages.CS else self.__czech_model
-        pipeline = Pipeline(model, 'tokenizer=ranges', Pipeline.NONE, Pipeline.NONE, "conllu")
-        error = ProcessingError()
+        processed = self.__process(src_text, language, (False, False))
+        return UDPipeProcessor.split_by_paragraphs_sentences(processed)
 
-        processed = pipeline.process(src_text, error)
-        if error.occurred():
-            raise LemmatizationException("Cannot get the lemmatization from the UDPipe service:" + error.message)
+    def get_sentences_analysis(self, src_text: str, language: Language, layers: FrozenSet[AnnotationLayers] = ALL_ANNOTATION_LAYERS) -> List[Tuple[str, List[dict]]]:
+        """Use offline UDPipe to divide source text into sentences and analyse them with one run of the pipeline
 
-        return UDPipeProcessor.split_by_paragraphs_sentences(processed)
+        :raise LemmatizationException: Raised when external library cannot process the text
+        """
+        processed = self.__process(src_text, language, UDPipeProcessor.get_tools(layers))
+        return UDPipeProcessor.split_by_sentences(processed, AnnotationLayers.DEPENDENCY in layers)
 
 
 def get_lemmatizators_list():
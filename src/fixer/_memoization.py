@@ -0,0 +1,183 @@
+import inspect
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Tuple, Any
+
+
+class LRUCache:
+    """Thread-safe in-memory cache with least recently used eviction
+
+    The cache is bounded by count of entries and by approximate size of saved values.
+
+    :param max_entries: Maximal count of saved values
+    :param max_bytes: Maximal approximate size of saved values in bytes
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+
+    def get(self, key) -> Tuple[bool, Any]:
+        """Returns flag whenever the key is saved and the saved value"""
+        with self.__lock:
+            if key not in self.__entries:
+                self.misses += 1
+                return False, None
+
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            return True, self.__entries[key][0]
+
+    def put(self, key, value):
+        """Save the value, the least recently used values are removed when the cache is full"""
+        size = LRUCache.estimate_size(key) + LRUCache.estimate_size(value)
+
+        if size > self.max_bytes:
+            return
+
+        with self.__lock:
+            if key in self.__entries:
+                self.size -= self.__entries.pop(key)[1]
+
+            self.__entries[key] = (value, size)
+            self.size += size
+
+            while len(self.__entries) > self.max_entries or self.size > self.max_bytes:
+                _, (_, removed_size) = self.__entries.popitem(last=False)
+                self.size -= removed_size
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @staticmethod
+    def estimate_size(value) -> int:
+        """Returns approximate size of the value in bytes (strings and containers are counted recursively)"""
+        if isinstance(value, str):
+            return 49 + len(value)
+        if isinstance(value, (list, tuple, set)):
+            return 56 + 8 * len(value) + sum(LRUCache.estimate_size(item) for item in value)
+        if isinstance(value, (dict, MappingProxyType)):
+            return 232 + sum(LRUCache.estimate_size(key) + LRUCache.estimate_size(item) for key, item in value.items())
+        return 32
+
+
+class MemoizedTool:
+    """Proxy of an external tool (aligner, lemmatizator, names tagger) remembering its results
+
+    Results of one text (or sentence pair for the aligner) are remembered by the text and the other
+    arguments (omitted arguments are replaced by their default values, so they share the results with
+    explicitly given ones). Batch methods (eg. `get_lemmatizations`) share results with the methods
+    for one text and call the tool only for texts which are not remembered yet. Other methods are
+    passed to the tool.
+
+    Remembered results are shared by all callers, so they are returned as immutable copies
+    (lists as tuples, dicts as read-only mappings).
+
+    :param tool: Instance of the external tool
+    :param max_entries: Maximal count of remembered results
+    :param max_bytes: Maximal approximate size of remembered results in bytes
+    """
+
+    #: Memoized methods processing one text, values are names of their results in the cache
+    __SINGLE_METHODS = {
+        'get_alignment': 'get_alignment',
+        'get_lemmatization': 'get_lemmatization',
+        'get_names': 'get_names',
+        'get_sentences_split': 'get_sentences_split',
+    }
+
+    #: Memoized methods processing more texts, values are names of results of one text in the cache
+    __BATCH_METHODS = {
+        'get_alignments': 'get_alignment',
+        'get_lemmatizations': 'get_lemmatization',
+        'get_names_for_sentences': 'get_names',
+    }
+
+    def __init__(self, tool, max_entries: int, max_bytes: int):
+        self.tool = tool
+        self.cache = LRUCache(max_entries, max_bytes)
+        self.__signatures = {}
+
+    def get_statistics(self) -> dict:
+        """Returns counts of hits and misses, count of remembered results and their approximate size"""
+        return {'hits': self.cache.hits, 'misses': self.cache.misses, 'entries': len(self.cache), 'bytes': self.cache.size}
+
+    def __getattr__(self, attribute: str):
+        value = getattr(self.tool, attribute)
+
+        if attribute in MemoizedTool.__BATCH_METHODS:
+            return self.__memoize_batch(value, self.__get_signature(attribute, value), MemoizedTool.__BATCH_METHODS[attribute])
+
+        if attribute in MemoizedTool.__SINGLE_METHODS:
+            return self.__memoize(value, self.__get_signature(attribute, value), MemoizedTool.__SINGLE_METHODS[attribute])
+
+        return value
+
+    def __get_signature(self, attribute: str, method) -> inspect.Signature:
+        """Returns signature of the method of the tool, signatures are inspected only once"""
+        signature = self.__signatures.get(attribute)
+        if signature is None:
+            signature = self.__signatures[attribute] = inspect.signature(method)
+        return signature
+
+    @staticmethod
+    def __bind(signature: inspect.Signature, args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
+        """Returns positional and keyword arguments of the call with default values of omitted arguments"""
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return bound.args, bound.kwargs
+
+    @staticmethod
+    def __freeze(value):
+        """Returns immutable copy of the result"""
+        if isinstance(value, (list, tuple)):
+            return tuple(MemoizedTool.__freeze(item) for item in value)
+        if isinstance(value, dict):
+            return MappingProxyType({key: MemoizedTool.__freeze(item) for key, item in value.items()})
+        return value
+
+    def __memoize(self, method, signature: inspect.Signature, name: str):
+        """Wrap method processing one text"""
+        def memoized(*args, **kwargs):
+            args, kwargs = MemoizedTool.__bind(signature, args, kwargs)
+            key = (name,) + args + tuple(sorted(kwargs.items()))
+
+            found, result = self.cache.get(key)
+            if not found:
+                result = MemoizedTool.__freeze(method(*args, **kwargs))
+                self.cache.put(key, result)
+            return result
+
+        return memoized
+
+    def __memoize_batch(self, method, signature: inspect.Signature, name: str):
+        """Wrap method processing list of texts (or sentence pairs), the rest of arguments is same for all texts"""
+        def memoized(*args, **kwargs):
+            (items, *args), kwargs = MemoizedTool.__bind(signature, args, kwargs)
+            shared_key = tuple(args) + tuple(sorted(kwargs.items()))
+            keys = [(name,) + (tuple(item) if isinstance(item, (list, tuple)) else (item,)) + shared_key for item in items]
+            results = []
+            missing = []
+
+            for idx, key in enumerate(keys):
+                found, result = self.cache.get(key)
+                results.append(result)
+                if not found:
+                    missing.append(idx)
+
+            if missing:
+                for idx, result in zip(missing, method([items[idx] for idx in missing], *args, **kwargs)):
+                    results[idx] = MemoizedTool.__freeze(result)
+                    self.cache.put(keys[idx], results[idx])
+
+            return results
+
+        return memoized
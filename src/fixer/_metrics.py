@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class MetricsCollector:
+    """Collector of time measurements and counters of the fixer
+
+    For each measured stage (eg. fixing tool or external tool call) it counts
+    the calls, total time and keeps the latest durations for computing percentiles.
+    It can be shared by more threads.
+
+    :param samples_limit: Count of latest durations kept for each stage
+    """
+
+    #: Percentiles computed for each measured stage
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, samples_limit: int = 10000):
+        self.samples_limit = samples_limit
+
+        self.__lock = threading.Lock()
+        self.__calls = {}
+        self.__total_times = {}
+        self.__samples = {}
+        self.__counters = {}
+
+    @contextmanager
+    def measure(self, name: str):
+        """Context manager measuring wall-time of the block as one call of given stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, duration: float):
+        """Save one call of the stage with given duration (in seconds)"""
+        with self.__lock:
+            if name not in self.__calls:
+                self.__calls[name] = 0
+                self.__total_times[name] = 0.0
+                self.__samples[name] = deque(maxlen=self.samples_limit)
+
+            self.__calls[name] += 1
+            self.__total_times[name] += duration
+            self.__samples[name].append(duration)
+
+    def count(self, name: str, value: int = 1):
+        """Increase the counter (eg. cache hits)"""
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def get_metrics(self) -> dict:
+        """Returns collected metrics
+
+        :return: Dictionary with keys
+            - `timings` - for each stage count of calls, total and mean time and percentiles (p50, p95, p99) in seconds
+            - `counters` - values of all counters
+        """
+        with self.__lock:
+            timings = {}
+
+            for name, calls in self.__calls.items():
+                samples = sorted(self.__samples[name])
+                timings[name] = {
+                    'calls': calls,
+                    'total': self.__total_times[name],
+                    'mean': self.__total_times[name] / calls,
+                }
+                for percentile in MetricsCollector.PERCENTILES:
+                    timings[name][f'p{percentile}'] = samples[min(len(samples) - 1, len(samples) * percentile // 100)]
+
+            return {'timings': timings, 'counters': dict(self.__counters)}
+
+
+class InstrumentedTool:
+    """Proxy of an external tool (aligner, lemmatizator, ...) measuring all its public method calls
+
+    Calls are saved into the collector as stages named `<name>.<method>`.
+
+    :param tool: Instance of the external tool
+    :param name: Name of the tool used in the metrics
+    :param metrics: Collector to save measurements into
+    """
+
+    def __init__(self, tool, name: str, metrics: MetricsCollector):
+        self.__tool = tool
+        self.__name = name
+        self.__metrics = metrics
+
+    def __getattr__(self, attribute: str):
+        value = getattr(self.__tool, attribute)
+
+        if attribute.startswith('_') or not callable(value):
+            return value
+
+        stage = f"{self.__name}.{attribute}"
+
+        def measured(*args, **kwargs):
+            with self.__metrics.measure(stage):
+                return value(*args, **kwargs)
+
+        return measured
@@ -1,9 +1,11 @@
 import json
 from abc import ABC, abstractmethod
+from bisect import bisect_right
 from typing import List
 
 import requests
 
+from ._http import http_session
 from ._languages import Languages, Language
 
 
@@ -20,6 +22,10 @@ class NameRecognitionInterface(ABC):
     def get_names(sentence: str, language: Language) -> List[List[str]]:
         pass
 
+    def get_names_for_sentences(self, sentences: List[str], language: Language) -> List[List[List[str]]]:
+        """Returns names of each given sentence. Tools supporting more sentences per call should override it."""
+        return [self.get_names(sentence, language) for sentence in sentences]
+
 
 class CapitalLettersBasedNameRecognition(NameRecognitionInterface):
     """Naive implementation of NameRecognitionInterface based on capital letters."""
@@ -73,19 +79,73 @@ class NameTagApi(NameRecognitionInterface):
         :return: List of list with names next to each other
         :raise NameRecognitionException: Exception is thrown when external tool response cannot be downloaded
         """
-        model = "&model=english" if language is not Languages.CS else ""
-        complete_url = "{}?data={}&output=conll{}".format(NameTagApi.__NAMETAG_URL, sentence, model)
-        response = requests.get(complete_url)
+        return NameTagApi.__parse_names(NameTagApi.__do_http_request(sentence, language).split('\n'))
+
+    @staticmethod
+    def get_names_for_sentences(sentences: List[str], language: Language) -> List[List[List[str]]]:
+        """Get all proper names of person from all given sentences with one request.
+
+        Sentences are separated by empty line (so they are never joined by the NameTag tokenizer)
+        and the returned tokens are assigned back to the sentences by their position in the text.
+
+        :param sentences: Source sentences to search names in
+        :param language: Language of the source sentences
+        :return: For each sentence list of list with names next to each other
+        :raise NameRecognitionException: Exception is thrown when external tool response cannot be downloaded
+        """
+        if not sentences:
+            return []
+
+        offsets = []
+        position = 0
+        for sentence in sentences:
+            offsets.append(position)
+            position += len(sentence) + 2
+
+        joined_sentences = "\n\n".join(sentences)
+        sentences_lines = [[] for _ in sentences]
+        position = 0
+
+        for line in NameTagApi.__do_http_request(joined_sentences, language).split('\n'):
+            if line == "":
+                continue
+
+            word_position = joined_sentences.find(line.split('\t')[0], position)
+            if word_position == -1:  # the token cannot be found, use request for each sentence
+                return [NameTagApi.get_names(sentence, language) for sentence in sentences]
+
+            sentences_lines[bisect_right(offsets, word_position) - 1].append(line)
+            position = word_position + len(line.split('\t')[0])
+
+        return [NameTagApi.__parse_names(lines) for lines in sentences_lines]
+
+    @staticmethod
+    def __do_http_request(text: str, language: Language) -> str:
+        """Provide a HTTP POST request to NameTag API, returns recognised tokens in CoNLL format
+
+        :raise NameRecognitionException: Exception is thrown when external tool response cannot be downloaded
+        """
+        payload = {'data': text, 'output': 'conll'}
+        if language is not Languages.CS:
+            payload['model'] = 'english'
+
+        try:
+            response = http_session.post(NameTagApi.__NAMETAG_URL, data=payload)
+        except requests.RequestException as error:
+            raise NameRecognitionException('It was not possible to connect to the NameTag web service.') from error
 
         if response.status_code != 200:
             raise NameRecognitionException('It was not possible to connect to the NameTag web service.')
 
-        only_names = []
+        return json.loads(response.content)["result"]
 
-        parsed_response = json.loads(response.content)
+    @staticmethod
+    def __parse_names(lines: List[str]) -> List[List[str]]:
+        """Filter only names of person from the NameTag CoNLL lines, names next to each other are concatenated"""
+        only_names = []
 
         current_word = []
-        for line in parsed_response["result"].split('\n'):
+        for line in lines:
             if line == "":
                 continue
             word, type = line.split('\t')
@@ -105,7 +165,6 @@ class NameTagApi(NameRecognitionInterface):
 
         return only_names[1:]
 
-
 def get_names_tagger_list():
     return {
         'nametag': NameTagApi,
@@ -1,8 +1,9 @@
 from statistics import mode
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, FrozenSet
 
 from ._fixer_tool import FixerToolInterface
 from ._languages import Languages
+from ._lemmatization import AnnotationLayers
 from ._sentence_pair import SentencePair
 from .fixer_configurator import FixerConfigurator
 from .fixer_statistics import FixerStatisticsMarks as StatisticsMarks
@@ -27,6 +28,40 @@ class NamesFixer(FixerToolInterface):
         self.source_lang = configuration.source_lang
         self.target_lang = configuration.target_lang
 
+    def is_applicable(self, source_text: str, target_text: str) -> bool:
+        """Names are searched only when there can be any name in the sentences
+
+        It is when some word (except the first one) starts with capital letter in both sentences
+        or when the first words of both sentences starts with the same capital letter
+        (name at the beginning of the sentence translated into similar form). Names are fixed
+        only when they are found in both sentences.
+        """
+        source_words = source_text.split()
+        target_words = target_text.split()
+
+        if any(word[0].isupper() for word in source_words[1:]) and any(word[0].isupper() for word in target_words[1:]):
+            return True
+
+        return bool(source_words and target_words and source_words[0][0].isupper() and source_words[0][0] == target_words[0][0])
+
+    def get_annotation_layers(self) -> FrozenSet[AnnotationLayers]:
+        """Names are replaced by lemmas of words from the source sentence"""
+        return frozenset({AnnotationLayers.TOKENS, AnnotationLayers.LEMMA})
+
+    def prefetch(self, sentence_pairs: List[SentencePair]):
+        """Load names of all sentence pairs, lemmas and alignment are loaded only for pairs with names to fix
+
+        :param sentence_pairs: Internal classes with details about the sentences and translations
+        """
+        SentencePair.prefetch_names(sentence_pairs)
+
+        with_names = [pair for pair in sentence_pairs if pair.source_names and pair.target_names]
+        single_names = [pair for pair in with_names if len(pair.source_names) == 1 and len(pair.target_names) == 1]
+        multiple_names = [pair for pair in with_names if pair not in single_names]
+
+        SentencePair.prefetch_lemmas([pair for pair in single_names if pair.source_names != pair.target_names] + multiple_names, [])
+        SentencePair.prefetch_alignment(multiple_names)
+
     def fix(self, sentence_pair: SentencePair) -> Tuple[str, List[StatisticsMarks]]:
         """It verifies whenever the sentence contains problem and tries to fix it
 
@@ -1,10 +1,12 @@
 from collections import Counter
-from typing import List, Tuple, Dict, Set
+from datetime import date
+from typing import List, Tuple, Dict, Set, Optional, FrozenSet
 
 from fixer._words_to_numbers_converter import WordsNumbersConverter
 
 from ._finder import Finder, NumberUnitFinderResult
 from ._fixer_tool import FixerToolInterface
+from ._lemmatization import AnnotationLayers
 from ._replacer import Replacer
 from ._sentence_pair import SentencePair
 from ._units import units, UnitsSystem
@@ -72,6 +74,36 @@ class NumberFixer(FixerToolInterface):
         self.source_lang = configuration.source_lang
         self.target_lang = configuration.target_lang
 
+    def is_applicable(self, source_text: str, target_text: str) -> bool:
+        """Numbers are searched only when there is any digit or word representing number in the sentences"""
+        return any(char.isdigit() for char in source_text) or any(char.isdigit() for char in target_text) or \
+            WordsNumbersConverter.contains_text_numbers(source_text, self.source_lang) or \
+            WordsNumbersConverter.contains_text_numbers(target_text, self.target_lang)
+
+    def get_annotation_layers(self) -> FrozenSet[AnnotationLayers]:
+        """Numbers written as words are found by part-of-speech tags and lemmas of words"""
+        return frozenset({AnnotationLayers.TOKENS, AnnotationLayers.UPOS, AnnotationLayers.LEMMA})
+
+    def prefetch(self, sentence_pairs: List[SentencePair]):
+        """Load analysis of sentences which can contain numbers written as words
+
+        :param sentence_pairs: Information about source and translated sentences
+        """
+        source_pairs = []
+        target_pairs = []
+
+        for sentence_pair in sentence_pairs:
+            different_count = len(Finder.find_number_unit_pairs(sentence_pair.source_text, self.source_lang)) != \
+                              len(Finder.find_number_unit_pairs(sentence_pair.target_text, self.target_lang))
+
+            if different_count or WordsNumbersConverter.contains_text_numbers(sentence_pair.source_text, self.source_lang):
+                source_pairs.append(sentence_pair)
+
+            if different_count or WordsNumbersConverter.contains_text_numbers(sentence_pair.target_text, self.target_lang):
+                target_pairs.append(sentence_pair)
+
+        SentencePair.prefetch_lemmas(source_pairs, target_pairs)
+
     def fix(self, sentence_pair: SentencePair) -> Tuple[str, List[StatisticsMarks]]:
         """Fix numbers problems in given sentence based on original text and translated text.
 
@@ -130,16 +162,16 @@ class NumberFixer(FixerToolInterface):
         # process each level of relationships (top-bottom order)
         for idx, val in levels.items():
             binding = self.__process_src_trg_pairs_relationships(relationships, idx)
-            result_sentence, m = val(binding, src_lang_numbers_units, trg_lang_numbers_units, result_sentence)
+            result_sentence, m = val(binding, src_lang_numbers_units, trg_lang_numbers_units, result_sentence, sentence_pair.rates_date)
             marks += m
 
         return result_sentence, marks
 
-    def __process_only_numbers_same(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str):
+    def __process_only_numbers_same(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str, rates_date: Optional[date]):
         """Process matches of same numbers"""
         return sentence, len(bindings) * [StatisticsMarks.U_ONLY_NUMBER_SAME]
 
-    def __process_only_numbers_different(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str) -> Tuple[str, list]:
+    def __process_only_numbers_different(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str, rates_date: Optional[date]) -> Tuple[str, list]:
         """Process matches of different numbers without units. Numbers are replaced."""
         marks = len(bindings) * [StatisticsMarks.U_ONLY_NUMBER_DIFFERENT]
 
@@ -152,7 +184,7 @@ class NumberFixer(FixerToolInterface):
 
         return sentence, marks
 
-    def __process_sentence_half_unit_same_number(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str) -> Tuple[str, list]:
+    def __process_sentence_half_unit_same_number(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str, rates_date: Optional[date]) -> Tuple[str, list]:
         """Process matches of numbers with units (both same). When mode is recalculating, conversion is provided."""
         marks = []
 
@@ -176,7 +208,7 @@ class NumberFixer(FixerToolInterface):
 
                 if unit.category.system in self.configuration.target_units:
                     continue
-                converted_number, converted_unit = units.convert_number(self.target_lang, self.configuration.target_units, src_pair.number, unit, unit)
+                converted_number, converted_unit = units.convert_number(self.target_lang, self.configuration.target_units, src_pair.number, unit, unit, rates_date=rates_date)
                 if not converted_unit or not converted_unit:
                     marks.append(StatisticsMarks.U_UNABLE_TO_RECALCULATE)
                     continue
@@ -186,7 +218,7 @@ class NumberFixer(FixerToolInterface):
 
         return sentence, marks
 
-    def __process_sentence_same_number_same_unit(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str) -> Tuple[str, list]:
+    def __process_sentence_same_number_same_unit(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str, rates_date: Optional[date]) -> Tuple[str, list]:
         """Process matches of numbers with units (both same). When mode is recalculating, conversion is provided."""
         marks = [StatisticsMarks.U_CORRECT_NUMBER_UNIT] * len(bindings)
 
@@ -200,7 +232,7 @@ class NumberFixer(FixerToolInterface):
                 marks.append(StatisticsMarks.U_NUMBERS_MODIFIERS)
             if trg_pair.unit.category.system in self.configuration.target_units:
                 continue
-            converted_number, converted_unit = units.convert_number(self.target_lang, self.configuration.target_units, src_pair.number, src_pair.unit, trg_pair.unit)
+            converted_number, converted_unit = units.convert_number(self.target_lang, self.configuration.target_units, src_pair.number, src_pair.unit, trg_pair.unit, rates_date=rates_date)
             if not converted_unit or not converted_unit:
                 marks.append(StatisticsMarks.U_UNABLE_TO_RECALCULATE)
                 continue
@@ -210,7 +242,7 @@ class NumberFixer(FixerToolInterface):
 
         return sentence, marks
 
-    def __process_sentence_same_number_different_unit(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str) -> Tuple[str, list]:
+    def __process_sentence_same_number_different_unit(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str, rates_date: Optional[date]) -> Tuple[str, list]:
         """Process matches of numbers with different units. Unit is replaced. When mode is recalculating, conversion is provided."""
         marks = [StatisticsMarks.U_CORRECT_NUMBER_WRONG_UNIT] * len(bindings)
 
@@ -226,7 +258,7 @@ class NumberFixer(FixerToolInterface):
                 sentence = Replacer.replace_unit(sentence, src_pair, trg_pair, suitable_unit, self.target_lang)
                 marks.append(StatisticsMarks.U_FIXED)
             else:
-                converted_number, converted_unit = units.convert_number(self.target_lang, self.configuration.target_units, src_pair.number, src_pair.unit, trg_pair.unit)
+                converted_number, converted_unit = units.convert_number(self.target_lang, self.configuration.target_units, src_pair.number, src_pair.unit, trg_pair.unit, rates_date=rates_date)
                 if converted_unit and converted_unit:
                     sentence = Replacer.replace_unit_number(sentence, src_pair, trg_pair, converted_number, converted_unit, self.target_lang)
                     marks.append(StatisticsMarks.U_RECALCULATED)
@@ -235,7 +267,7 @@ class NumberFixer(FixerToolInterface):
 
         return sentence, marks
 
-    def __process_sentence_different_number_same_unit(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str) -> Tuple[str, list]:
+    def __process_sentence_different_number_same_unit(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str, rates_date: Optional[date]) -> Tuple[str, list]:
         """Process matches of different numbers with same units. Number is replaced. When mode is recalculating, conversion is provided.
 
         It checks whenever the only difference between numbers is not a separators.
@@ -250,7 +282,7 @@ class NumberFixer(FixerToolInterface):
                 marks.append(StatisticsMarks.U_NUMBERS_MODIFIERS)
 
             if self.configuration.mode == FixerModes.RECALCULATING:
-                converted_number, converted_unit = units.convert_number(self.target_lang, self.configuration.target_units, src_pair.number, src_pair.unit, trg_pair.unit)
+                converted_number, converted_unit = units.convert_number(self.target_lang, self.configuration.target_units, src_pair.number, src_pair.unit, trg_pair.unit, rates_date=rates_date)
                 if converted_unit and converted_unit:
                     sentence = Replacer.replace_unit_number(sentence, src_pair, trg_pair, converted_number, converted_unit, self.target_lang)
                     marks.append(StatisticsMarks.U_RECALCULATED)
@@ -258,7 +290,7 @@ class NumberFixer(FixerToolInterface):
                     marks.append(StatisticsMarks.U_UNABLE_TO_RECALCULATE)
             else:
 
-                if self.__consider_tolerance_rates(src_pair, trg_pair):
+                if self.__consider_tolerance_rates(src_pair, trg_pair, rates_date):
                     marks.append(StatisticsMarks.U_APPLIED_TOLERANCE_RATE)
                     continue
 
@@ -276,7 +308,7 @@ class NumberFixer(FixerToolInterface):
 
         return sentence, marks
 
-    def __process_sentence_different_number_different_unit(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str) -> Tuple[str, list]:
+    def __process_sentence_different_number_different_unit(self, bindings: List[Tuple[int, int]], src_lang_numbers_units: List[NumberUnitFinderResult], trg_lang_numbers_units: List[NumberUnitFinderResult], sentence: str, rates_date: Optional[date]) -> Tuple[str, list]:
         """Process matches of numbers with units (both different). Both is replaced. When mode is recalculating, conversion is provided."""
         marks = [StatisticsMarks.U_WRONG_NUMBER_UNIT] * len(bindings)
 
@@ -288,14 +320,14 @@ class NumberFixer(FixerToolInterface):
                 marks.append(StatisticsMarks.U_NUMBERS_MODIFIERS)
 
             if self.configuration.mode == FixerModes.RECALCULATING:
-                converted_number, converted_unit = units.convert_number(self.target_lang, self.configuration.target_units, src_pair.number, src_pair.unit, trg_pair.unit)
+                converted_number, converted_unit = units.convert_number(self.target_lang, self.configuration.target_units, src_pair.number, src_pair.unit, trg_pair.unit, rates_date=rates_date)
                 if converted_unit and converted_unit:
                     sentence = Replacer.replace_unit_number(sentence, src_pair, trg_pair, converted_number, converted_unit, self.target_lang)
                     marks.append(StatisticsMarks.U_RECALCULATED)
                 else:
                     marks.append(StatisticsMarks.U_UNABLE_TO_RECALCULATE)
             else:
-                if self.__consider_tolerance_rates(src_pair, trg_pair):
+                if self.__consider_tolerance_rates(src_pair, trg_pair, rates_date):
                     marks.append(StatisticsMarks.U_APPLIED_TOLERANCE_RATE)
                     continue
 
@@ -305,7 +337,7 @@ class NumberFixer(FixerToolInterface):
 
         return sentence, marks
 
-    def __consider_tolerance_rates(self, src_pair, trg_pair) -> bool:
+    def __consider_tolerance_rates(self, src_pair, trg_pair, rates_date: Optional[date] = None) -> bool:
         """It checks if the number from translated sentence is similar to number from source sentence
 
         Based on tolerance rate from configuration it is checks whenever the number is
@@ -313,10 +345,11 @@ class NumberFixer(FixerToolInterface):
 
         Approximately numbers are considered.
 
+        :param rates_date: Day of exchange rates used for currencies (actual rates when not given)
         :return: True if the number is in tolerance
         """
         base_src_number = units.convert_to_base_in_category(src_pair.unit, src_pair.number)
-        converted_trg_number = units.convert_to_base_in_another_system(trg_pair.unit, trg_pair.number, src_pair.unit.category)
+        converted_trg_number = units.convert_to_base_in_another_system(trg_pair.unit, trg_pair.number, src_pair.unit.category, rates_date=rates_date)
 
         if src_pair.approximately:
             tolerance = base_src_number * self.configuration.approximately_tolerance
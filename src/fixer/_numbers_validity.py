@@ -0,0 +1,78 @@
+from typing import FrozenSet, Sequence, Tuple, Union
+
+from ._custom_types import Number
+
+
+class NumbersValidity:
+    """Compiled validity rules of a word form (unit or scaling word) - numbers the form can be used with
+
+    Rules are given as a list of integers, open intervals `(left, right)` (where `None` means unbounded)
+    and the `float` type (meaning all decimal numbers), eg. `[(None, -1), (1, None), float]`.
+    The list is compiled only once into a set of integers and bounds, so checking a number does not
+    iterate over the rules. Instances are shared for same rules, use `NumbersValidity.compile`.
+
+    :param rules: List of validity rules
+    :ivar rules: Original rules
+    :ivar floats: Flag whenever all decimal numbers are valid
+    :ivar integers: Set of valid integers
+    :ivar below: All numbers lower than this bound are valid (or None)
+    :ivar above: All numbers greater than this bound are valid (or None)
+    :ivar intervals: Bounded open intervals of valid numbers
+    """
+
+    __slots__ = ('rules', 'floats', 'integers', 'below', 'above', 'intervals')
+
+    #: Already compiled rules
+    __compiled = {}
+
+    def __init__(self, rules: Sequence[Union[int, tuple, type]]):
+        self.rules = tuple(rules)
+        self.floats = float in self.rules
+        self.integers = frozenset(rule for rule in self.rules if isinstance(rule, int))
+
+        lower_bounds = [right for left, right in self.__get_intervals() if left is None and right is not None]
+        upper_bounds = [left for left, right in self.__get_intervals() if left is not None and right is None]
+
+        self.below = max(lower_bounds) if lower_bounds else None
+        self.above = min(upper_bounds) if upper_bounds else None
+        self.intervals = tuple(interval for interval in self.__get_intervals() if None not in interval)
+
+    @staticmethod
+    def compile(rules: Union[Sequence[Union[int, tuple, type]], 'NumbersValidity']) -> 'NumbersValidity':
+        """Returns compiled rules, same rules share one instance"""
+        if isinstance(rules, NumbersValidity):
+            return rules
+
+        rules = tuple(rules)
+        if rules not in NumbersValidity.__compiled:
+            NumbersValidity.__compiled[rules] = NumbersValidity(rules)
+
+        return NumbersValidity.__compiled[rules]
+
+    def matches(self, number: Number) -> bool:
+        """Checks whenever the number passes the rules (decimal numbers pass only when all of them are valid)"""
+        if isinstance(number, float):
+            return self.floats
+
+        if number in self.integers:
+            return True
+
+        if self.below is not None and number < self.below:
+            return True
+
+        if self.above is not None and number > self.above:
+            return True
+
+        for left, right in self.intervals:
+            if left < number < right:
+                return True
+
+        return False
+
+    def get_boundaries(self) -> FrozenSet[Number]:
+        """Returns integers and bounds of intervals used in the rules"""
+        return self.integers.union(border for interval in self.__get_intervals() for border in interval if border is not None)
+
+    def __get_intervals(self) -> Tuple[tuple, ...]:
+        """Returns intervals from the rules"""
+        return tuple(rule for rule in self.rules if isinstance(rule, tuple))
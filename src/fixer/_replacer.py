@@ -197,30 +197,10 @@ class Replacer:
     def __find_correct_scaling_word(scaling_number: int, number: Number, language: Language) -> Optional[str]:
         """Find best scaling word based on rules defined in scaling word list"""
 
-        for word, scaling_tuple in {k: v for k, v in language.big_numbers_scale.items() if v[0] == scaling_number}.items():
-            condition = scaling_tuple[1]
-
-            if condition == None:  # Word cannot be used for replacing
-                continue
-
-            if condition == []:  # Word can be used for all numbers
-                return word
-
-            if isinstance(number, float) and float in condition:  # Word can be used for all float numbers
+        for word, validity in language.get_scaling_words(scaling_number):
+            if validity is None or validity.matches(number):
                 return word
 
-            if number in condition:  # Number is specified concretely
-                return word
-
-            for interval in [interval for interval in condition if isinstance(interval, tuple)]:  # Number is within a range
-                left, right = interval
-                if left is None and right is not None and number < right:
-                    return word
-                elif left is not None and right is None and number > left:
-                    return word
-                elif left is not None and right is not None and left < number < right:
-                    return word
-
         return None
 
     @staticmethod
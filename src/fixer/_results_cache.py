@@ -0,0 +1,137 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Tuple, Optional
+
+from .fixer_statistics import FixerStatisticsMarks as StatisticsMarks
+
+
+class ResultsCache:
+    """Persistent cache of fixed sentences saved in SQLite database
+
+    Results are saved by the source sentence, translated sentence and fingerprint
+    of the configuration (so results of different configurations are not mixed).
+
+    The database file can be shared by more processes - each process uses its own
+    connection and the database runs in write-ahead log mode. Lookups only read the database,
+    times of use of the found results are written in batches together with the next saved results.
+    When there are more than `max_entries` results, the least recently used ones are removed.
+    The size is checked after each saved hundredth of `max_entries`, so each process can exceed
+    the limit only by about one percent.
+
+    :param path: Path to the database file (created when it does not exist)
+    :param max_entries: Maximal count of saved results
+    """
+
+    #: Maximal count of saved results after which the size of the cache is checked
+    __EVICTION_CHECK_INTERVAL = 1000
+
+    #: Maximal count of found results whose time of use is not written yet
+    __LAST_USED_FLUSH_SIZE = 1000
+
+    #: Maximal count of keys in one SQL query
+    __QUERY_CHUNK_SIZE = 500
+
+    def __init__(self, path: str, max_entries: int = 1000000):
+        self.path = path
+        self.max_entries = max_entries
+
+        self.__lock = threading.Lock()
+        self.__connection = None
+        self.__connection_pid = None
+        self.__saved_since_check = 0
+        self.__used = {}
+        self.__eviction_interval = max(1, min(ResultsCache.__EVICTION_CHECK_INTERVAL, max_entries // 100))
+
+    def get(self, configuration_fingerprint: str, sentences: List[Tuple[str, str]]) -> List[Optional[Tuple[str, bool, List[StatisticsMarks]]]]:
+        """Returns saved results of given sentences (None for sentences which are not saved)
+
+        :param configuration_fingerprint: Fingerprint of the configuration used for fixing
+        :param sentences: Pairs of text in source language and translated text
+        :return: Results in the same format as `Fixer.fix` returns
+        """
+        keys = [ResultsCache.__get_key(configuration_fingerprint, source, target) for source, target in sentences]
+        saved = {}
+
+        with self.__lock:
+            connection = self.__get_connection()
+
+            for start in range(0, len(keys), ResultsCache.__QUERY_CHUNK_SIZE):
+                chunk = keys[start:start + ResultsCache.__QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = connection.execute(f"SELECT key, text, changed, marks FROM results WHERE key IN ({placeholders})", chunk).fetchall()
+
+                for key, text, changed, marks in rows:
+                    saved[key] = (text, bool(changed), [StatisticsMarks(int(mark)) for mark in marks.split(',') if mark])
+
+            now = time.time()
+            self.__used.update((key, now) for key in saved)
+
+            if len(self.__used) >= ResultsCache.__LAST_USED_FLUSH_SIZE:
+                self.__write_last_used(connection)
+                connection.commit()
+
+        return [saved.get(key) for key in keys]
+
+    def save(self, configuration_fingerprint: str, sentences: List[Tuple[str, str]], results: List[Tuple[str, bool, List[StatisticsMarks]]]):
+        """Save results of fixed sentences
+
+        :param configuration_fingerprint: Fingerprint of the configuration used for fixing
+        :param sentences: Pairs of text in source language and translated text
+        :param results: Results of the sentences in the same format as `Fixer.fix` returns
+        """
+        now = time.time()
+        rows = [(ResultsCache.__get_key(configuration_fingerprint, source, target), text, int(changed), ",".join(str(mark.value) for mark in marks), now)
+                for (source, target), (text, changed, marks) in zip(sentences, results)]
+
+        if not rows:
+            return
+
+        with self.__lock:
+            connection = self.__get_connection()
+            self.__write_last_used(connection)
+            connection.executemany("INSERT OR REPLACE INTO results (key, text, changed, marks, last_used) VALUES (?, ?, ?, ?, ?)", rows)
+            connection.commit()
+
+            self.__saved_since_check += len(rows)
+            if self.__saved_since_check >= self.__eviction_interval:
+                self.__evict(connection)
+                self.__saved_since_check = 0
+
+    def __write_last_used(self, connection: sqlite3.Connection):
+        """Write times of use of the results found since the last write (without commit)"""
+        if self.__used:
+            connection.executemany("UPDATE results SET last_used = ? WHERE key = ?", [(used, key) for key, used in self.__used.items()])
+            self.__used = {}
+
+    def __evict(self, connection: sqlite3.Connection):
+        """Remove least recently used results above the limit"""
+        count = connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+        if count > self.max_entries:
+            connection.execute("DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used LIMIT ?)", (count - self.max_entries,))
+            connection.commit()
+
+    def __get_connection(self) -> sqlite3.Connection:
+        """Returns connection of the current process, it is created (with the database) when necessary"""
+        if self.__connection is not None and self.__connection_pid == os.getpid():
+            return self.__connection
+
+        self.__connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.__connection_pid = os.getpid()
+        self.__saved_since_check = 0
+        self.__used = {}
+
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, text TEXT, changed INTEGER, marks TEXT, last_used REAL)")
+        self.__connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self.__connection.commit()
+
+        return self.__connection
+
+    @staticmethod
+    def __get_key(configuration_fingerprint: str, source_text: str, target_text: str) -> str:
+        """Returns key of the result in the database"""
+        return hashlib.sha256("\t".join([configuration_fingerprint, source_text, target_text]).encode('utf-8')).hexdigest()
@@ -1,5 +1,7 @@
-from typing import List, Tuple
+from datetime import date
+from typing import List, Tuple, Optional, FrozenSet
 
+from ._lemmatization import AnnotationLayers, ALL_ANNOTATION_LAYERS
 from .fixer_configurator import FixerConfigurator
 
 
@@ -9,27 +11,43 @@ class SentencePair:
     Mainly the output of externals tools are saved into this class so they do not
     need to be called again.
 
+    Outputs of the external tools can be also loaded for more sentence pairs at once
+    (see prefetch methods) so the external tools are called only once for whole batch.
+
     :param source_text: Original text from the user
     :param target_text: Translated text from the translator
     :param configuration: Configuration of the tool
+    :param rates_date: Day of exchange rates used for recalculating currencies (actual rates when not given)
+    :param annotation_layers: Layers of the analysis requested from the lemmatizator (all layers when not given)
+    :param source_lemmas: Analysis of the original text when it is already known (eg. from splitting a document)
+    :param target_lemmas: Analysis of the translated text when it is already known
     """
 
-    def __init__(self, source_text: str, target_text: str, configuration: FixerConfigurator):
+    def __init__(self, source_text: str, target_text: str, configuration: FixerConfigurator, rates_date: Optional[date] = None,
+                 annotation_layers: FrozenSet[AnnotationLayers] = ALL_ANNOTATION_LAYERS,
+                 source_lemmas: Optional[List[dict]] = None, target_lemmas: Optional[List[dict]] = None):
         self.__source_text = source_text
         self.__target_text = self.__original_target_text = target_text
         self.__configuration = configuration
+        self.__rates_date = rates_date
+        self.__annotation_layers = annotation_layers
 
         self.__alignment = None
         self.__source_names = None
         self.__target_names = None
-        self.__source_lemmas = None
-        self.__target_lemmas = None
+        self.__source_lemmas = source_lemmas
+        self.__target_lemmas = target_lemmas
 
     @property
     def source_text(self) -> str:
         """Original text from the user"""
         return self.__source_text
 
+    @property
+    def rates_date(self) -> Optional[date]:
+        """Day of exchange rates used for recalculating currencies (None means actual rates)"""
+        return self.__rates_date
+
     @property
     def target_text_has_changed(self) -> bool:
         """Indicator whenever the translated text changed"""
@@ -42,13 +60,19 @@ class SentencePair:
 
     @target_text.setter
     def target_text(self, value: str):
-        """Change the target text"""
+        """Change the target text, outputs of external tools for the translated text are forgotten"""
+        if value == self.__target_text:
+            return
+
         self.__target_text = value
+        self.__alignment = None
+        self.__target_names = None
+        self.__target_lemmas = None
 
     @property
     def alignment(self) -> List[Tuple[str, str]]:
         """Word alignment of original to translated sentence"""
-        if not self.__alignment:
+        if self.__alignment is None:
             self.__alignment = self.__configuration.aligner.get_alignment(
                 self.__source_text, self.__target_text, self.__configuration.source_lang, self.__configuration.target_lang)
 
@@ -57,7 +81,7 @@ class SentencePair:
     @property
     def source_names(self) -> List[List[str]]:
         """List of names in original sentence"""
-        if not self.__source_names:
+        if self.__source_names is None:
             self.__source_names = self.__configuration.names_tagger.get_names(self.__source_text, self.__configuration.source_lang)
 
         return self.__source_names
@@ -65,7 +89,7 @@ class SentencePair:
     @property
     def target_names(self) -> List[List[str]]:
         """List of names in translated sentence"""
-        if not self.__target_names:
+        if self.__target_names is None:
             self.__target_names = self.__configuration.names_tagger.get_names(self.__target_text, self.__configuration.target_lang)
 
         return self.__target_names
@@ -73,15 +97,70 @@ class SentencePair:
     @property
     def source_lemmas(self) -> List[dict]:
         """Original sentence analysis"""
-        if not self.__source_lemmas:
-            self.__source_lemmas = self.__configuration.lemmatizator.get_lemmatization(self.__source_text, self.__configuration.source_lang)
+        if self.__source_lemmas is None:
+            self.__source_lemmas = self.__configuration.lemmatizator.get_lemmatization(self.__source_text, self.__configuration.source_lang, self.__annotation_layers)
 
         return self.__source_lemmas
 
     @property
     def target_lemmas(self) -> List[dict]:
         """Translated sentence analysis"""
-        if not self.__target_lemmas:
-            self.__target_lemmas = self.__configuration.lemmatizator.get_lemmatization(self.__target_text, self.__configuration.target_lang)
+        if self.__target_lemmas is None:
+            self.__target_lemmas = self.__configuration.lemmatizator.get_lemmatization(self.__target_text, self.__configuration.target_lang, self.__annotation_layers)
 
         return self.__target_lemmas
+
+    @staticmethod
+    def prefetch_alignment(sentence_pairs: List['SentencePair']):
+        """Load word alignment of all given sentence pairs with one call of the aligner"""
+        missing = [pair for pair in sentence_pairs if pair.__alignment is None]
+        if not missing:
+            return
+
+        configuration = missing[0].__configuration
+        alignments = configuration.aligner.get_alignments(
+            [(pair.__source_text, pair.__target_text) for pair in missing], configuration.source_lang, configuration.target_lang)
+
+        for pair, alignment in zip(missing, alignments):
+            pair.__alignment = alignment
+
+    @staticmethod
+    def prefetch_names(sentence_pairs: List['SentencePair']):
+        """Load names in original and translated sentences of all given pairs with one call of the tagger per language"""
+        missing_source = [pair for pair in sentence_pairs if pair.__source_names is None]
+        missing_target = [pair for pair in sentence_pairs if pair.__target_names is None]
+
+        if missing_source:
+            configuration = missing_source[0].__configuration
+            names = configuration.names_tagger.get_names_for_sentences([pair.__source_text for pair in missing_source], configuration.source_lang)
+            for pair, sentence_names in zip(missing_source, names):
+                pair.__source_names = sentence_names
+
+        if missing_target:
+            configuration = missing_target[0].__configuration
+            names = configuration.names_tagger.get_names_for_sentences([pair.__target_text for pair in missing_target], configuration.target_lang)
+            for pair, sentence_names in zip(missing_target, names):
+                pair.__target_names = sentence_names
+
+    @staticmethod
+    def prefetch_lemmas(source_pairs: List['SentencePair'], target_pairs: List['SentencePair']):
+        """Load analysis of original sentences of the first list and translated sentences of the second list
+
+        The lemmatizator is called once per language with layers requested by any of the pairs.
+        """
+        missing_source = [pair for pair in source_pairs if pair.__source_lemmas is None]
+        missing_target = [pair for pair in target_pairs if pair.__target_lemmas is None]
+
+        if missing_source:
+            configuration = missing_source[0].__configuration
+            lemmas = configuration.lemmatizator.get_lemmatizations([pair.__source_text for pair in missing_source], configuration.source_lang,
+                                                                   frozenset().union(*(pair.__annotation_layers for pair in missing_source)))
+            for pair, sentence_lemmas in zip(missing_source, lemmas):
+                pair.__source_lemmas = sentence_lemmas
+
+        if missing_target:
+            configuration = missing_target[0].__configuration
+            lemmas = configuration.lemmatizator.get_lemmatizations([pair.__target_text for pair in missing_target], configuration.target_lang,
+                                                                   frozenset().union(*(pair.__annotation_layers for pair in missing_target)))
+            for pair, sentence_lemmas in zip(missing_target, lemmas):
+                pair.__target_lemmas = sentence_lemmas
@@ -1,10 +1,18 @@
+import os
 import re
+import sys
+from bisect import bisect_left
+from datetime import date
 from enum import Enum, auto
-from typing import Union, Optional, List, Tuple, Callable, Dict
+from types import MappingProxyType
+from typing import Union, Optional, List, Tuple, Callable, Dict, FrozenSet, Mapping, Sequence, Iterable
+
+import numpy as np
 
 from ._custom_types import Number
-from ._exchange_rates import exchange_rates_convertor
+from ._exchange_rates import exchange_rates_convertor, CNBCommunicationException
 from ._languages import Language, Languages
+from ._numbers_validity import NumbersValidity
 
 
 class UnitsSystem(Enum):
@@ -25,6 +33,11 @@ class UnitDialect(Enum):
     AmE = 1  # American english
 
 
+class UnitsRegistryException(Exception):
+    """Exception indicating problem with definitions of units or changing the frozen registry"""
+    pass
+
+
 class UnitCategory:
     """Wrapper data class for single unit category
 
@@ -35,13 +48,23 @@ class UnitCategory:
     :type base: UnitCategory or None
     :param base_coefficient: Coefficient to convert from base category to this one
     :param conversion: Function to converts between different UnitSystems, only for base categories
+    :ivar name: Name of the category in UnitCategories (eg. 'KM')
+    :ivar id: Identifier of the category - its position in `UnitCategories.ALL`
     """
 
+    __slots__ = ('system', 'base', 'base_coefficient', 'conversion', 'name', 'id')
+
     def __init__(self, system: UnitsSystem, base, base_coefficient: Optional[float], *, conversion: Optional[Callable] = None):
         self.system = system
         self.base = base
         self.base_coefficient = base_coefficient
         self.conversion = conversion
+        self.name = None
+        self.id = None
+
+    def __set_name__(self, owner, name: str):
+        """Category is named by the attribute of UnitCategories it is assigned to"""
+        self.name = sys.intern(name)
 
 
 class UnitsConvertors:
@@ -68,16 +91,21 @@ class UnitsConvertors:
         if category == translated_unit.category:
             return number, translated_unit
 
-        for category in units_categories_groups[category]:
+        # the best category has the biggest coefficient giving number bigger than one, see `UnitsWrapper.get_categories_thresholds`
+        coefficients, categories, negative_category = units.get_categories_thresholds(category, language)
+
+        if number < 0:
+            best_category = negative_category
+        else:
+            position = bisect_left(coefficients, number)
+            while position > 0 and not 1 < number / coefficients[position - 1] < number:
+                position -= 1
 
-            # there is no unit for given category
-            if len(units.get_list_units_by_category_language()[language][category]) == 0:
-                continue
+            if position > 0:
+                best_category = categories[position - 1]
 
-            category_number = number / category.base_coefficient
-            if best_number < 0 or (1 < category_number < best_number):
-                best_number = category_number
-                best_category = category
+        if best_category is not category:
+            best_number = number / best_category.base_coefficient
 
         best_unit = units.get_correct_unit(language, best_number, original_unit, strict_category=best_category)
 
@@ -144,8 +172,8 @@ class UnitsConvertors:
         return target_number, target_category
 
     @staticmethod
-    def currency_convertor(original_number: Number, original_category: UnitCategory, target_system: List[UnitsSystem]) -> Tuple[Number, UnitCategory]:
-        """Convert currencies"""
+    def currency_convertor(original_number: Number, original_category: UnitCategory, target_system: List[UnitsSystem], rates_date: Optional[date] = None) -> Tuple[Number, UnitCategory]:
+        """Convert currencies, by exchange rates of given day (actual rates when not given)"""
 
         categories_strings = {
             UnitCategories.CZK: 'CZK',
@@ -171,7 +199,7 @@ class UnitsConvertors:
         if not target_category:
             return original_number, original_category
 
-        rate = exchange_rates_convertor.get_rate(categories_strings[original_category], categories_strings[target_category], original_number)
+        rate = exchange_rates_convertor.get_rate(categories_strings[original_category], categories_strings[target_category], original_number, rates_date)
         return rate, target_category
 
     @staticmethod
@@ -219,28 +247,34 @@ class UnitCategories:
     C = UnitCategory(UnitsSystem.C, None, None, conversion=UnitsConvertors.temperature_convertor)
     F = UnitCategory(UnitsSystem.F, None, None, conversion=UnitsConvertors.temperature_convertor)
 
+    #: All categories sorted by name, position in the tuple is the identifier of the category
+    ALL = (C, CM, CZK, DM, EUR, F, FT, FT2, FT3, G, GBP, IN, KG, KM, KM2, KMH, LB, M, M2, M3, MI, MI2, MM, MS, USD, YD)
+
     @staticmethod
-    def get_categories_by_groups() -> Dict[UnitCategory, List[UnitCategory]]:
-        """List of all unit categories divided into lists by base categories"""
-        categories_groups = {}
+    def get_category(name: str) -> UnitCategory:
+        """Get category by its name (eg. 'KM')"""
+        category = UnitCategories.__dict__.get(name)
 
-        all_categories = [a for a in dir(UnitCategories) if not a.startswith('__')]
-        for category in all_categories:
-            category_object = getattr(UnitCategories, category)
-            if callable(category_object):
-                continue
+        if not isinstance(category, UnitCategory):
+            raise UnitsRegistryException(f"Unit category {name} does not exist.")
 
-            if category_object.base is None and category_object not in categories_groups.keys():
-                categories_groups[category_object] = []
-            else:
-                if category_object.base not in categories_groups.keys():
-                    categories_groups[category_object.base] = []
+        return category
 
-                categories_groups[category_object.base].append(category_object)
+    @staticmethod
+    def get_categories_by_groups() -> Dict[UnitCategory, List[UnitCategory]]:
+        """List of all unit categories divided into lists by base categories"""
+        categories_groups = {category: [] for category in UnitCategories.ALL if category.base is None}
+
+        for category in UnitCategories.ALL:
+            if category.base is not None:
+                categories_groups[category.base].append(category)
 
         return categories_groups
 
 
+for category_id, category in enumerate(UnitCategories.ALL):
+    category.id = category_id
+
 units_categories_groups = UnitCategories.get_categories_by_groups()
 
 
@@ -250,57 +284,49 @@ class Unit:
     :ivar word: Text form of the unit
     :ivar category: Category of the unit
     :ivar language: Language of the unit
-    :ivar numbers_validity: Numbers for whose is this unit form valid (singular forms, etc.)
+    :ivar numbers_validity: Compiled rules of numbers for whose is this unit form valid (singular forms, etc.)
     :ivar abbreviation: Flag whenever the unit form is an abbreviation
     :ivar dialect: Dialect of the unit form (british or american english)
     :ivar before_number: Flag whenever the unit can be placed in front of the number
     :param word: Text form of the unit
     :param category: Category of the unit
     :param language: Language of the unit
-    :param numbers_validity: Numbers for whose is this unit form valid (singular forms, etc.)
+    :param numbers_validity: Numbers for whose is this unit form valid (singular forms, etc.), None means no rules
     :param abbreviation: Flag whenever the unit form is an abbreviation
     :param dialect: Dialect of the unit form (british or american english)
     :param before_number: Flag whenever the unit can be placed in front of the number
+
+    Instances are immutable.
     """
 
+    __slots__ = ('word', 'category', 'language', 'numbers_validity', 'abbreviation', 'dialect', 'before_number')
+
     def __init__(self,
                  word: str,
                  category: UnitCategory,
                  language: Language,
-                 numbers_validity: Optional[List[Union[int, tuple, object]]],
+                 numbers_validity: Optional[Union[Sequence[Union[int, tuple, object]], NumbersValidity]],
                  abbreviation: bool,
                  dialect: Optional[UnitDialect],
                  before_number: bool = False):
-        self.word = word
-        self.category = category
-        self.language = language
-        self.numbers_validity = numbers_validity
-        self.abbreviation = abbreviation
-        self.before_number = before_number
-        self.dialect = dialect
+        object.__setattr__(self, 'word', word)
+        object.__setattr__(self, 'category', category)
+        object.__setattr__(self, 'language', language)
+        object.__setattr__(self, 'numbers_validity', NumbersValidity.compile(numbers_validity) if numbers_validity is not None else None)
+        object.__setattr__(self, 'abbreviation', abbreviation)
+        object.__setattr__(self, 'before_number', before_number)
+        object.__setattr__(self, 'dialect', dialect)
 
-    @staticmethod
-    def number_pass_numbers_validity(validity: List, number: Number) -> bool:
-        """Checks whenever the unit validity rules matches the number"""
-        if isinstance(number, float):
-            return True if float in validity else False
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Unit '{self.word}' is immutable.")
 
-        if number in validity:
-            return True
+    def __delattr__(self, name):
+        raise AttributeError(f"Unit '{self.word}' is immutable.")
 
-        for interval in validity:
-            if not isinstance(interval, tuple):
-                continue
-
-            left, right = interval
-            if left is None and right is not None and number < right:
-                return True
-            elif left is not None and right is None and number > left:
-                return True
-            elif left is not None and right is not None and left < number < right:
-                return True
-
-        return False
+    @staticmethod
+    def number_pass_numbers_validity(validity: Union[Sequence, NumbersValidity], number: Number) -> bool:
+        """Checks whenever the unit validity rules matches the number"""
+        return NumbersValidity.compile(validity).matches(number)
 
 
 class UnitsWrapper:
@@ -314,16 +340,45 @@ class UnitsWrapper:
         self.__single_symbol = []
         self.__regex_unit_for_language = {}
         self.__regex_unit_before_for_language = {}
+        self.__words_indexes = {}
+        self.__correct_units_table = {}
+        self.__validity_boundaries = None
+        self.__conversion_table = None
+        self.__categories_thresholds = {}
+        self.__frozen = False
 
     def add_unit(self, unit: Unit):
         """Add new unit to the list and remove cached values"""
-        self.__units.append(unit)
+        self.add_units([unit])
+
+    def add_units(self, units_list: Iterable[Unit]):
+        """Add more units at once, cached values are removed only once
+
+        :raises UnitsRegistryException: when the registry is already frozen
+        """
+        if self.__frozen:
+            raise UnitsRegistryException("Units registry is frozen, no units can be added.")
+
+        self.__units.extend(units_list)
         self.__units_by_languages = {}
         self.__units_before_by_languages = {}
         self.__regex_unit_for_language = {}
         self.__regex_unit_before_for_language = {}
         self.__units_by_language_category = None
         self.__single_symbol = []
+        self.__words_indexes = {}
+        self.__correct_units_table = {}
+        self.__validity_boundaries = None
+        self.__categories_thresholds = {}
+
+    def freeze(self):
+        """Forbid adding more units, the registry is then only read (and can be shared by threads and forked processes)"""
+        self.__units = tuple(self.__units)
+        self.__frozen = True
+
+    def is_frozen(self) -> bool:
+        """Returns flag whenever the registry is frozen"""
+        return self.__frozen
 
     def get_correct_unit(self, language: Language, number: Union[float, int], original_unit: Unit, *, strict_category=None, modifier=False, abbreviation=None) -> Optional[Unit]:
         """Find best unit form to use for given number.
@@ -340,31 +395,36 @@ class UnitsWrapper:
         :return: Unit with best match
         """
         strict_category = original_unit.category if not strict_category else strict_category
+        abbreviation = original_unit.abbreviation if abbreviation is None else abbreviation
+
+        # the selection depends only on the class of the number, so it is remembered in the decision table
+        key = (language, strict_category, bool(abbreviation), bool(modifier), self.__get_validity_class(number))
+
+        if key not in self.__correct_units_table:
+            self.__correct_units_table[key] = self.__select_correct_unit(language, strict_category, bool(abbreviation), bool(modifier), number)
+
+        return self.__correct_units_table[key]
 
+    def __select_correct_unit(self, language: Language, category: UnitCategory, abbreviation: bool, modifier: bool, number: Number) -> Optional[Unit]:
+        """Score all units of the category and return the best one (see `get_correct_unit`)"""
         options_list = []
 
-        if strict_category not in self.get_list_units_by_category_language()[language]:
+        if category not in self.get_list_units_by_category_language()[language]:
             return None
 
-        for unit in self.get_list_units_by_category_language()[language][strict_category]:
+        for unit in self.get_list_units_by_category_language()[language][category]:
             score = 0
 
             if modifier and '-' in unit.word:
                 score += 1
 
-            if abbreviation is None and unit.abbreviation == original_unit.abbreviation:
-                score += 2
-
-            elif abbreviation is False and not unit.abbreviation:
-                score += 2
-
-            elif abbreviation is True and unit.abbreviation:
+            if unit.abbreviation == abbreviation:
                 score += 2
 
             if unit.numbers_validity is None:
                 score += 1
 
-            elif Unit.number_pass_numbers_validity(unit.numbers_validity, number):
+            elif unit.numbers_validity.matches(number):
                 score += 3
 
             options_list.append((score, unit))
@@ -372,7 +432,30 @@ class UnitsWrapper:
         options_list.sort(key=lambda tup: tup[0], reverse=True)
         return options_list[0][1]
 
-    def convert_number(self, target_language: Language, target_unit_system: List[UnitsSystem], actual_number: Number, original_unit: Unit, translated_unit: Unit) -> Tuple[Optional[Number], Optional[Unit]]:
+    def __get_validity_class(self, number: Number):
+        """Returns class of the number - all numbers in the class pass the same validity rules of all units
+
+        Floats are one class. Integers are divided by the values and interval borders used in the rules:
+        each of these values is one class and integers between two neighbouring values are another class.
+        """
+        if isinstance(number, float):
+            return float
+
+        if self.__validity_boundaries is None:
+            boundaries = set()
+            for unit in self.__units:
+                if unit.numbers_validity is not None:
+                    boundaries.update(unit.numbers_validity.get_boundaries())
+
+            self.__validity_boundaries = sorted(boundaries)
+
+        position = bisect_left(self.__validity_boundaries, number)
+        is_boundary = position < len(self.__validity_boundaries) and self.__validity_boundaries[position] == number
+
+        return position, is_boundary
+
+    def convert_number(self, target_language: Language, target_unit_system: List[UnitsSystem], actual_number: Number, original_unit: Unit, translated_unit: Unit, *,
+                       rates_date: Optional[date] = None) -> Tuple[Optional[Number], Optional[Unit]]:
         """Convert number with unit into different unit system
 
         Based on target unit system some unit category is selected, number converted and best fitting
@@ -383,6 +466,7 @@ class UnitsWrapper:
         :param actual_number: Number from translated sentence to be converted
         :param original_unit: Unit of the actual number
         :param translated_unit: Unit used in the translated sentence
+        :param rates_date: Day of exchange rates used for currencies (actual rates when not given)
         :return: Best fitting number and unit
         """
         actual_category = original_unit.category
@@ -393,11 +477,19 @@ class UnitsWrapper:
         if not actual_category.conversion:
             return None, None
 
-        converted_number, converted_category = actual_category.conversion(actual_number, actual_category, target_unit_system)
+        converted_number, converted_category = UnitsWrapper.convert_base(actual_category, actual_number, target_unit_system, rates_date)
         converted_number, converted_unit = UnitsConvertors.get_best_unit_for_converted_number(converted_number, converted_category, target_language, original_unit, translated_unit)
 
         return converted_number, converted_unit
 
+    @staticmethod
+    def convert_base(category: UnitCategory, number: Number, target_unit_system: List[UnitsSystem], rates_date: Optional[date] = None) -> Tuple[Number, UnitCategory]:
+        """Convert number of the base category by its conversion, only currencies depend on the day of exchange rates"""
+        if category.conversion is UnitsConvertors.currency_convertor:
+            return UnitsConvertors.currency_convertor(number, category, target_unit_system, rates_date)
+
+        return category.conversion(number, category, target_unit_system)
+
     def convert_to_base_in_category(self, unit: Unit, number: Number) -> Number:
         """Convert number to base unit in the category (eg. 1 km is converted to 1000 meters)"""
         if not unit.category.base:
@@ -405,7 +497,7 @@ class UnitsWrapper:
 
         return number * unit.category.base_coefficient
 
-    def convert_to_base_in_another_system(self, unit: Unit, number: Number, needed_category: UnitCategory) -> Optional[Number]:
+    def convert_to_base_in_another_system(self, unit: Unit, number: Number, needed_category: UnitCategory, *, rates_date: Optional[date] = None) -> Optional[Number]:
         """Convert number to base unit in the category and convert that to another unit system"""
         actual_category = unit.category
         if actual_category.base:
@@ -415,43 +507,232 @@ class UnitsWrapper:
         if needed_category.base:
             needed_category = needed_category.base
 
-        converted_number, converted_category = actual_category.conversion(number, actual_category, [needed_category.system])
+        converted_number, converted_category = UnitsWrapper.convert_base(actual_category, number, [needed_category.system], rates_date)
 
         if converted_category != needed_category:
             return None
 
         return converted_number
 
+    def get_categories_thresholds(self, category: UnitCategory, language: Language) -> Tuple[Tuple[float, ...], Tuple[UnitCategory, ...], UnitCategory]:
+        """Get thresholds for selecting the best category for number in given base category
+
+        Categories of the group (see `units_categories_groups`) having some units in the language
+        and coefficient bigger than one are sorted by the coefficients. The best category for positive
+        number is the one with the biggest coefficient lower than the number (so it is found by bisection),
+        base category is kept for lower numbers. Negative numbers always use the last category of the group.
+
+        :param category: Base category
+        :param language: Language of the units
+        :return: Sorted coefficients, their categories and the category for negative numbers
+        """
+        key = (category, language)
+
+        if key not in self.__categories_thresholds:
+            units_by_category = self.get_list_units_by_category_language()[language]
+            group = [group_category for group_category in units_categories_groups.get(category, []) if units_by_category.get(group_category)]
+            bigger = sorted((group_category for group_category in group if group_category.base_coefficient > 1), key=lambda group_category: group_category.base_coefficient)
+
+            self.__categories_thresholds[key] = (tuple(group_category.base_coefficient for group_category in bigger),
+                                                 tuple(bigger),
+                                                 group[-1] if group else category)
+
+        return self.__categories_thresholds[key]
+
+    def get_conversion_table(self, rates_date: Optional[date] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Get factors and offsets of conversions between all pairs of unit categories
+
+        Number in category with id `i` is converted to category with id `j` as
+        `factors[i, j] * number + offsets[i, j]`. Pairs which cannot be converted
+        (eg. meters to kilograms) are NaN. Currencies are converted by the actual exchange rates,
+        the table is built again when the rates change (currencies are NaN when the rates cannot be loaded).
+
+        :param rates_date: Day of exchange rates used for currencies (actual rates when not given)
+        :return: Two square matrices indexed by identifiers of categories (see `UnitCategories.ALL`)
+        """
+        try:
+            rates = tuple(sorted(exchange_rates_convertor.get_rates(rates_date).items()))
+        except CNBCommunicationException:
+            rates = None
+
+        # the table is kept with its rates in one tuple, so concurrent callers never get a table of other rates
+        cached = self.__conversion_table
+        if cached is None or rates is None or cached[0] != rates:
+            cached = (rates, UnitsWrapper.__build_conversion_table(rates_date))
+            self.__conversion_table = cached
+
+        return cached[1]
+
+    @staticmethod
+    def __build_conversion_table(rates_date: Optional[date]) -> Tuple[np.ndarray, np.ndarray]:
+        """Compute the conversion table, conversions of base categories are affine so they are
+        given by converted values of 0 and 1"""
+        categories_count = len(UnitCategories.ALL)
+        factors = np.full((categories_count, categories_count), np.nan)
+        offsets = np.full((categories_count, categories_count), np.nan)
+
+        for source in UnitCategories.ALL:
+            source_base, source_coefficient = (source.base, source.base_coefficient) if source.base else (source, 1)
+
+            for target in UnitCategories.ALL:
+                target_base, target_coefficient = (target.base, target.base_coefficient) if target.base else (target, 1)
+
+                if source_base is target_base:
+                    factor, offset = 1, 0
+                elif source_base.conversion:
+                    try:
+                        offset, offset_category = UnitsWrapper.convert_base(source_base, 0, [target_base.system], rates_date)
+                        factor, factor_category = UnitsWrapper.convert_base(source_base, 1, [target_base.system], rates_date)
+                    except (KeyError, CNBCommunicationException):
+                        continue
+
+                    if offset_category is not target_base or factor_category is not target_base:
+                        continue
+
+                    factor -= offset
+                else:
+                    continue
+
+                factors[source.id, target.id] = factor * source_coefficient / target_coefficient
+                offsets[source.id, target.id] = offset / target_coefficient
+
+        return factors, offsets
+
+    def convert_many(self, target_language: Language, target_unit_system: List[UnitsSystem], numbers: np.ndarray, categories_ids: np.ndarray, *,
+                     rates_date: Optional[date] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Convert many numbers with units into different unit system at once
+
+        It is vectorized version of `convert_number` (without keeping the unit of the translated sentence).
+        Numbers are converted by the conversion table and then the best fitting category is selected
+        in the same way as in `UnitsConvertors.get_best_unit_for_converted_number`. The unit form
+        of the result can be selected by `get_correct_unit` with the category as strict category.
+
+        :param target_language: Language of the sentence and desired unit
+        :param target_unit_system: List of UnitSystems preferred by user
+        :param numbers: Numbers to be converted
+        :param categories_ids: Identifiers of categories of the numbers (see `UnitCategories.ALL`)
+        :param rates_date: Day of exchange rates used for currencies (actual rates when not given)
+        :return: Converted numbers and identifiers of their categories, numbers which cannot be converted are NaN with category -1
+        """
+        numbers = np.asarray(numbers, dtype=np.float64)
+        categories_ids = np.asarray(categories_ids, dtype=np.intp)
+        factors, offsets = self.get_conversion_table(rates_date)
+
+        # target base category of each category (-1 when the category cannot be converted)
+        target_ids = np.full(len(UnitCategories.ALL), -1, dtype=np.intp)
+        for category in UnitCategories.ALL:
+            base = category.base if category.base else category
+            if base.conversion:
+                try:
+                    target_ids[category.id] = UnitsWrapper.convert_base(base, 1, target_unit_system, rates_date)[1].id
+                except (KeyError, CNBCommunicationException):
+                    continue
+
+        converted_ids = target_ids[categories_ids]
+        convertible = converted_ids >= 0
+        converted_numbers = np.full(numbers.shape, np.nan)
+        converted_numbers[convertible] = factors[categories_ids[convertible], converted_ids[convertible]] * numbers[convertible] + offsets[categories_ids[convertible], converted_ids[convertible]]
+        converted_ids[np.isnan(converted_numbers)] = -1
+        convertible = converted_ids >= 0
+
+        best_numbers = converted_numbers.copy()
+        best_ids = converted_ids.copy()
+
+        for base_id in np.unique(converted_ids[convertible]):
+            in_group = converted_ids == base_id
+            coefficients, categories, negative_category = self.get_categories_thresholds(UnitCategories.ALL[base_id], target_language)
+            group_numbers = converted_numbers[in_group]
+
+            # same selection as in `UnitsConvertors.get_best_unit_for_converted_number`
+            coefficients = np.array((1,) + coefficients, dtype=np.float64)
+            categories_ids = np.array([base_id] + [category.id for category in categories])
+            positions = np.searchsorted(coefficients[1:], group_numbers, side='left')
+            with np.errstate(divide='ignore', invalid='ignore'):
+                while True:
+                    candidate_numbers = group_numbers / coefficients[positions]
+                    invalid = (positions > 0) & ~((1 < candidate_numbers) & (candidate_numbers < group_numbers))
+                    if not invalid.any():
+                        break
+                    positions[invalid] -= 1
+
+            group_ids = categories_ids[positions]
+            group_coefficients = coefficients[positions]
+
+            negative = group_numbers < 0
+            group_ids[negative] = negative_category.id
+            group_coefficients[negative] = negative_category.base_coefficient if negative_category.base else 1
+
+            best_ids[in_group] = group_ids
+            best_numbers[in_group] = group_numbers / group_coefficients
+
+        return best_numbers, best_ids
+
     def get_list_units_by_category_language(self) -> Dict[Language, Dict[UnitCategory, List[Unit]]]:
         """Get list of units divided by language and unit category. Uses caching"""
         if self.__units_by_language_category:
             return self.__units_by_language_category
 
-        self.__units_by_language_category = {lang: {} for lang in Languages.get_languages_list()}
+        # built aside and assigned at once, other threads never see it half-filled
+        units_by_language_category = {lang: {} for lang in Languages.get_languages_list()}
 
         for unit in self.__units:
-            if unit.category not in self.__units_by_language_category[unit.language]:
-                self.__units_by_language_category[unit.language][unit.category] = []
+            if unit.category not in units_by_language_category[unit.language]:
+                units_by_language_category[unit.language][unit.category] = []
 
-            self.__units_by_language_category[unit.language][unit.category].append(unit)
+            units_by_language_category[unit.language][unit.category].append(unit)
 
-        return self.__units_by_language_category
+        self.__units_by_language_category = units_by_language_category
+        return units_by_language_category
 
     def get_units_by_category_language(self, category: UnitCategory, language: Language) -> List[Unit]:
         """Get list of units by given language and unit category"""
-        if not self.__units_by_language_category:
-            self.get_list_units_by_category_language()
+        return self.get_list_units_by_category_language()[language][category]
+
+    def get_unit_by_word(self, word: str, language: Language, *, case_sensitive: bool = True) -> Optional[Unit]:
+        """Get first unit with given word in given language (the word can be compared case-insensitively)"""
+        by_word, by_folded_word, _, _ = self.__get_words_indexes(language)
 
-        return self.__units_by_language_category[language][category]
+        if case_sensitive:
+            return by_word.get(word)
 
-    def get_unit_by_word(self, word: str, language: Language) -> Optional[Unit]:
-        """Get first unit with given word in given language"""
-        return next((unit for unit in self.get_all_units_for_language(language) if unit.word == word), None)
+        return by_folded_word.get(word.casefold())
 
     def get_units_words_list(self, language: Language) -> List[str]:
-        """Get first unit with given word in given language"""
+        """Get words of all units in given language"""
         return [unit.word for unit in self.get_all_units_for_language(language)]
 
+    def get_units_words_set(self, language: Language) -> FrozenSet[str]:
+        """Get set of words of all units in given language"""
+        return self.__get_words_indexes(language)[2]
+
+    def get_units_for_language_before_numbers_set(self, language: Language) -> FrozenSet[str]:
+        """Get set of words of units used before number in given language"""
+        return self.__get_words_indexes(language)[3]
+
+    def __get_words_indexes(self, language: Language) -> Tuple[Mapping[str, Unit], Mapping[str, Unit], FrozenSet[str], FrozenSet[str]]:
+        """Returns indexes of units in given language, they are built once after all units are added
+
+        :return: four indexes
+          - first unit of each word
+          - first unit of each case-folded word
+          - set of all units words
+          - set of words of units used before number
+        """
+        if language not in self.__words_indexes:
+            by_word = {}
+            by_folded_word = {}
+
+            for unit in self.get_all_units_for_language(language):
+                by_word.setdefault(unit.word, unit)
+                by_folded_word.setdefault(unit.word.casefold(), unit)
+
+            self.__words_indexes[language] = (MappingProxyType(by_word),
+                                              MappingProxyType(by_folded_word),
+                                              frozenset(by_word),
+                                              frozenset(self.get_units_for_language_before_numbers_list(language)))
+
+        return self.__words_indexes[language]
+
     def get_regex_units_for_language(self, language: Language) -> str:
         """Get list of words of units in given language separated by |"""
         if language not in self.__regex_unit_for_language:
@@ -476,403 +757,72 @@ class UnitsWrapper:
     def get_all_units_for_language(self, language: Language) -> List[Unit]:
         """Get list of units by language"""
         if language not in self.__units_by_languages:
-            self.__units_by_languages[language] = []
-            for unit in self.__units:
-                if unit.language == language:
-                    self.__units_by_languages[language].append(unit)
+            self.__units_by_languages[language] = [unit for unit in self.__units if unit.language == language]
 
         return self.__units_by_languages[language]
 
+    @staticmethod
+    def load_units(filename: str) -> List[Unit]:
+        """Load unit forms from the data file (see `data/units.tsv` for description of the format)
+
+        :raises UnitsRegistryException: when some line of the file is not valid
+        """
+        units_list = []
+        validity_rules = {}
 
-numbers_validity_ones = [-1, 1]
-numbers_validity_not_ones = [(None, -1), (1, None), float]
-numbers_validity_2_3_4 = [-4, -3, -2, 2, 3, 4]
-numbers_validity_more_than_5 = [(None, -4), (4, None)]
-numbers_validity_decimal = [float]
+        with open(filename, 'r', encoding='utf-8') as units_file:
+            for line_number, line in enumerate(units_file, 1):
+                line = line.rstrip('\n')
+                if not line or line.startswith('#'):
+                    continue
 
-units = UnitsWrapper()
+                try:
+                    word, category, language, validity, flags, dialect = line.split('\t')
+
+                    if validity not in validity_rules:
+                        validity_rules[validity] = UnitsWrapper.__parse_validity(validity)
 
-units.add_unit(Unit('km/h', UnitCategories.KMH, Languages.CS, None, True, None))
-units.add_unit(Unit('km / h', UnitCategories.KMH, Languages.CS, None, True, None))
-units.add_unit(Unit('kph', UnitCategories.KMH, Languages.CS, None, True, None))
-units.add_unit(Unit('kilometrech za hodinu', UnitCategories.KMH, Languages.CS, [], False, None))
-units.add_unit(Unit('kilometrech v hodině', UnitCategories.KMH, Languages.CS, [], False, None))
-units.add_unit(Unit('kilometry za hodinu', UnitCategories.KMH, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('kilometrů za hodinu', UnitCategories.KMH, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('kilometru za hodinu', UnitCategories.KMH, Languages.CS, numbers_validity_decimal, False, None))
-units.add_unit(Unit('kilometr za hodinu', UnitCategories.KMH, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('kilometru v hodině', UnitCategories.KMH, Languages.CS, numbers_validity_decimal, False, None))
-units.add_unit(Unit('kilometrů v hodině', UnitCategories.KMH, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('kilometry v hodině', UnitCategories.KMH, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('kilometr v hodině', UnitCategories.KMH, Languages.CS, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('km/h', UnitCategories.KMH, Languages.EN, None, True, None))
-units.add_unit(Unit('km / h', UnitCategories.KMH, Languages.EN, None, True, None))
-units.add_unit(Unit('kph', UnitCategories.KMH, Languages.EN, None, True, None))
-units.add_unit(Unit('kilometers per hour', UnitCategories.KMH, Languages.EN, numbers_validity_not_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('kilometres per hour', UnitCategories.KMH, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('kilometres an hour', UnitCategories.KMH, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('kilometers an hour', UnitCategories.KMH, Languages.EN, numbers_validity_not_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('kilometer per hour', UnitCategories.KMH, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('kilometre per hour', UnitCategories.KMH, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('kilometer an hour', UnitCategories.KMH, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('kilometre an hour', UnitCategories.KMH, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('kilometer-an-hour', UnitCategories.KMH, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('kilometre-an-hour', UnitCategories.KMH, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('m/s', UnitCategories.MS, Languages.CS, None, True, None))
-units.add_unit(Unit('m / s', UnitCategories.MS, Languages.CS, None, True, None))
-units.add_unit(Unit('mps', UnitCategories.MS, Languages.CS, None, True, None))
-units.add_unit(Unit('metrech za sekundu', UnitCategories.MS, Languages.CS, [], False, None))
-units.add_unit(Unit('metry za sekundu', UnitCategories.MS, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('metrů za sekundu', UnitCategories.MS, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('metru za sekundu', UnitCategories.MS, Languages.CS, numbers_validity_decimal, False, None))
-units.add_unit(Unit('metr za sekundu', UnitCategories.MS, Languages.CS, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('m/s', UnitCategories.MS, Languages.EN, None, True, None))
-units.add_unit(Unit('m / s', UnitCategories.MS, Languages.EN, None, True, None))
-units.add_unit(Unit('mps', UnitCategories.MS, Languages.EN, None, True, None))
-units.add_unit(Unit('meters per second', UnitCategories.MS, Languages.EN, numbers_validity_not_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('metres per second', UnitCategories.MS, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('metre per second', UnitCategories.MS, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('meter per second', UnitCategories.MS, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-
-units.add_unit(Unit('m2', UnitCategories.M2, Languages.CS, None, True, None))
-units.add_unit(Unit('metrech čtverečních', UnitCategories.M2, Languages.CS, [], False, None))
-units.add_unit(Unit('metru čtverečního', UnitCategories.M2, Languages.CS, numbers_validity_decimal, False, None))
-units.add_unit(Unit('metry čtverečními', UnitCategories.M2, Languages.CS, [], False, None))
-units.add_unit(Unit('metrů čtverečních', UnitCategories.M2, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('metrům čtverečním', UnitCategories.M2, Languages.CS, [], False, None))
-units.add_unit(Unit('metry čtvereční', UnitCategories.M2, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('metr čtvereční', UnitCategories.M2, Languages.CS, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('m2', UnitCategories.M2, Languages.EN, None, True, None))
-units.add_unit(Unit('square meters', UnitCategories.M2, Languages.EN, numbers_validity_not_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('square metres', UnitCategories.M2, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('square meter', UnitCategories.M2, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('square metre', UnitCategories.M2, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('square-metre', UnitCategories.M2, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('square-meter', UnitCategories.M2, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-
-units.add_unit(Unit('km2', UnitCategories.KM2, Languages.CS, None, True, None))
-units.add_unit(Unit('kilometrech čtverečních', UnitCategories.KM2, Languages.CS, [], False, None))
-units.add_unit(Unit('kilometru čtverečního', UnitCategories.KM2, Languages.CS, numbers_validity_decimal, False, None))
-units.add_unit(Unit('kilometrů čtverečních', UnitCategories.KM2, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('kilometrům čtverečním', UnitCategories.KM2, Languages.CS, [], False, None))
-units.add_unit(Unit('kilometry čtverečními', UnitCategories.KM2, Languages.CS, [], False, None))
-units.add_unit(Unit('kilometry čtvereční', UnitCategories.KM2, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('kilometr čtvereční', UnitCategories.KM2, Languages.CS, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('km2', UnitCategories.KM2, Languages.EN, None, True, None))
-units.add_unit(Unit('square kilometers', UnitCategories.KM2, Languages.EN, numbers_validity_not_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('square kilometres', UnitCategories.KM2, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('square kilometer', UnitCategories.KM2, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('square kilometre', UnitCategories.KM2, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('square-kilometre', UnitCategories.KM2, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('square-kilometer', UnitCategories.KM2, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-
-units.add_unit(Unit('m3', UnitCategories.M3, Languages.CS, None, True, None))
-units.add_unit(Unit('metrech krychlových', UnitCategories.M3, Languages.CS, [], False, None))
-units.add_unit(Unit('metru krychlového', UnitCategories.M3, Languages.CS, numbers_validity_decimal, False, None))
-units.add_unit(Unit('metrů krychlových', UnitCategories.M3, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('metrům krychlovým', UnitCategories.M3, Languages.CS, [], False, None))
-units.add_unit(Unit('metry krychlovými', UnitCategories.M3, Languages.CS, [], False, None))
-units.add_unit(Unit('metry krychlové', UnitCategories.M3, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('metr krychlový', UnitCategories.M3, Languages.CS, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('m3', UnitCategories.M3, Languages.EN, None, True, None))
-units.add_unit(Unit('cubic meter', UnitCategories.M3, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('cubic meters', UnitCategories.M3, Languages.EN, numbers_validity_not_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('cubic metre', UnitCategories.M3, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('cubic metres', UnitCategories.M3, Languages.EN, numbers_validity_not_ones, False, None))
-
-units.add_unit(Unit('km', UnitCategories.KM, Languages.CS, None, True, None))
-units.add_unit(Unit('kilometrech', UnitCategories.KM, Languages.CS, [], False, None))
-units.add_unit(Unit('kilometrům', UnitCategories.KM, Languages.CS, [], False, None))
-units.add_unit(Unit('kilometry', UnitCategories.KM, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('kilometrů', UnitCategories.KM, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('kilometru', UnitCategories.KM, Languages.CS, numbers_validity_decimal, False, None))
-units.add_unit(Unit('kilometr', UnitCategories.KM, Languages.CS, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('km', UnitCategories.KM, Languages.EN, None, True, None))
-units.add_unit(Unit('kilometers', UnitCategories.KM, Languages.EN, numbers_validity_not_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('kilometres', UnitCategories.KM, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('kilometer', UnitCategories.KM, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('kilometre', UnitCategories.KM, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('m', UnitCategories.M, Languages.CS, None, True, None))
-units.add_unit(Unit('metrech', UnitCategories.M, Languages.CS, [], False, None))
-units.add_unit(Unit('metrům', UnitCategories.M, Languages.CS, [], False, None))
-units.add_unit(Unit('metry', UnitCategories.M, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('metrů', UnitCategories.M, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('metru', UnitCategories.M, Languages.CS, numbers_validity_decimal, False, None))
-units.add_unit(Unit('metr', UnitCategories.M, Languages.CS, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('m', UnitCategories.M, Languages.EN, None, True, None))
-units.add_unit(Unit('meters', UnitCategories.M, Languages.EN, numbers_validity_not_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('metres', UnitCategories.M, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('meter', UnitCategories.M, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('metre', UnitCategories.M, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('dm', UnitCategories.DM, Languages.CS, None, True, None))
-units.add_unit(Unit('decimetrech', UnitCategories.DM, Languages.CS, [], False, None))
-units.add_unit(Unit('decimetrům', UnitCategories.DM, Languages.CS, [], False, None))
-units.add_unit(Unit('decimetry', UnitCategories.DM, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('decimetrů', UnitCategories.DM, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('decimetru', UnitCategories.DM, Languages.CS, numbers_validity_decimal, False, None))
-units.add_unit(Unit('decimetr', UnitCategories.DM, Languages.CS, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('dm', UnitCategories.DM, Languages.EN, None, True, None))
-units.add_unit(Unit('decimeters', UnitCategories.DM, Languages.EN, numbers_validity_not_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('decimetres', UnitCategories.DM, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('decimeter', UnitCategories.DM, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('decimetre', UnitCategories.DM, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('cm', UnitCategories.CM, Languages.CS, None, True, None))
-units.add_unit(Unit('centimetrech', UnitCategories.CM, Languages.CS, [], False, None))
-units.add_unit(Unit('centimetrům', UnitCategories.CM, Languages.CS, [], False, None))
-units.add_unit(Unit('centimetry', UnitCategories.CM, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('centimetrů', UnitCategories.CM, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('centimetru', UnitCategories.CM, Languages.CS, numbers_validity_decimal, False, None))
-units.add_unit(Unit('centimetr', UnitCategories.CM, Languages.CS, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('cm', UnitCategories.CM, Languages.EN, None, True, None))
-units.add_unit(Unit('centimeters', UnitCategories.CM, Languages.EN, numbers_validity_not_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('centimetres', UnitCategories.CM, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('centimeter', UnitCategories.CM, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('centimetre', UnitCategories.CM, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('mm', UnitCategories.MM, Languages.CS, None, True, None))
-units.add_unit(Unit('milimetrech', UnitCategories.MM, Languages.CS, [], False, None))
-units.add_unit(Unit('milimetrům', UnitCategories.MM, Languages.CS, [], False, None))
-units.add_unit(Unit('milimetry', UnitCategories.MM, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('milimetrů', UnitCategories.MM, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('milimetru', UnitCategories.MM, Languages.CS, numbers_validity_decimal, False, None))
-units.add_unit(Unit('milimetr', UnitCategories.MM, Languages.CS, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('mm', UnitCategories.MM, Languages.EN, None, True, None))
-units.add_unit(Unit('millimeters', UnitCategories.MM, Languages.EN, numbers_validity_not_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('millimetres', UnitCategories.MM, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('millimeter', UnitCategories.MM, Languages.EN, numbers_validity_ones, False, UnitDialect.AmE))
-units.add_unit(Unit('millimetre', UnitCategories.MM, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('milimetres', UnitCategories.MM, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('milimetre', UnitCategories.MM, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('kg', UnitCategories.KG, Languages.CS, None, True, None))
-units.add_unit(Unit('kilogramech', UnitCategories.KG, Languages.CS, [], False, None))
-units.add_unit(Unit('kilogramům', UnitCategories.KG, Languages.CS, [], False, None))
-units.add_unit(Unit('kilogramy', UnitCategories.KG, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('kilogramů', UnitCategories.KG, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('kilogramu', UnitCategories.KG, Languages.CS, numbers_validity_decimal, False, None))
-units.add_unit(Unit('kilogram', UnitCategories.KG, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('kila', UnitCategories.KG, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('kilo', UnitCategories.KG, Languages.CS, [(None, -4), -1, 1, (4, None)], False, None))
-units.add_unit(Unit('kil', UnitCategories.KG, Languages.CS, numbers_validity_more_than_5, False, None))
-
-units.add_unit(Unit('kg', UnitCategories.KG, Languages.EN, None, True, None))
-units.add_unit(Unit('kilograms', UnitCategories.KG, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('kilogram', UnitCategories.KG, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('kilos', UnitCategories.KG, Languages.EN, numbers_validity_not_ones, False, None))
-
-units.add_unit(Unit('g', UnitCategories.G, Languages.CS, None, True, None))
-units.add_unit(Unit('gramech', UnitCategories.G, Languages.CS, [], False, None))
-units.add_unit(Unit('gramům', UnitCategories.G, Languages.CS, [], False, None))
-units.add_unit(Unit('gramy', UnitCategories.G, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('gramů', UnitCategories.G, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('gramu', UnitCategories.G, Languages.CS, numbers_validity_decimal, False, None))
-units.add_unit(Unit('gram', UnitCategories.G, Languages.CS, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('g', UnitCategories.G, Languages.EN, None, True, None))
-units.add_unit(Unit('grams', UnitCategories.G, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('gram', UnitCategories.G, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('°C', UnitCategories.C, Languages.CS, None, True, None))
-units.add_unit(Unit('° C', UnitCategories.C, Languages.CS, None, True, None))
-units.add_unit(Unit('stupních celsia', UnitCategories.C, Languages.CS, [], False, None))
-units.add_unit(Unit('stupních Celsia', UnitCategories.C, Languages.CS, [], False, None))
-units.add_unit(Unit('stupňům Celsia', UnitCategories.C, Languages.CS, [], False, None))
-units.add_unit(Unit('stupňům celsia', UnitCategories.C, Languages.CS, [], False, None))
-units.add_unit(Unit('stupeň celsia', UnitCategories.C, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('stupeň Celsia', UnitCategories.C, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('stupně celsia', UnitCategories.C, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('stupně Celsia', UnitCategories.C, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('stupňů celsia', UnitCategories.C, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('stupňů Celsia', UnitCategories.C, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('stupni Celsia', UnitCategories.C, Languages.CS, [], False, None))
-units.add_unit(Unit('stupni celsia', UnitCategories.C, Languages.CS, [], False, None))
-
-units.add_unit(Unit('°C', UnitCategories.C, Languages.EN, None, True, None))
-units.add_unit(Unit('° C', UnitCategories.C, Languages.EN, None, True, None))
-units.add_unit(Unit('degrees Celsius', UnitCategories.C, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('degrees celsius', UnitCategories.C, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('degree Celsius', UnitCategories.C, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('degree celsius', UnitCategories.C, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('°F', UnitCategories.F, Languages.CS, None, True, None))
-units.add_unit(Unit('° F', UnitCategories.F, Languages.CS, None, True, None))
-units.add_unit(Unit('stupních fahrenheita', UnitCategories.F, Languages.CS, [], False, None))
-units.add_unit(Unit('stupních Fahrenheita', UnitCategories.F, Languages.CS, [], False, None))
-units.add_unit(Unit('stupňům Fahrenheita', UnitCategories.F, Languages.CS, [], False, None))
-units.add_unit(Unit('stupňům fahrenheita', UnitCategories.F, Languages.CS, [], False, None))
-units.add_unit(Unit('stupeň fahrenheita', UnitCategories.F, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('stupeň Fahrenheita', UnitCategories.F, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('stupně fahrenheita', UnitCategories.F, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('stupně Fahrenheita', UnitCategories.F, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('stupňů fahrenheita', UnitCategories.F, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('stupňů Fahrenheita', UnitCategories.F, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('stupni Fahrenheita', UnitCategories.F, Languages.CS, [], False, None))
-units.add_unit(Unit('stupni fahrenheita', UnitCategories.F, Languages.CS, [], False, None))
-
-units.add_unit(Unit('°F', UnitCategories.F, Languages.EN, None, True, None))
-units.add_unit(Unit('° F', UnitCategories.F, Languages.EN, None, True, None))
-units.add_unit(Unit('degrees fahrenheit', UnitCategories.F, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('degrees Fahrenheit', UnitCategories.F, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('degree Fahrenheit', UnitCategories.F, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('degree fahrenheit', UnitCategories.F, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('palcům', UnitCategories.IN, Languages.CS, [], False, None))
-units.add_unit(Unit('palcích', UnitCategories.IN, Languages.CS, [], False, None))
-units.add_unit(Unit('palec', UnitCategories.IN, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('palce', UnitCategories.IN, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('palců', UnitCategories.IN, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('palci', UnitCategories.IN, Languages.CS, [], False, None))
-
-units.add_unit(Unit('inches', UnitCategories.IN, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('inch', UnitCategories.IN, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('stopách čtverečních', UnitCategories.FT2, Languages.CS, [], False, None))
-units.add_unit(Unit('stopami čtverečními', UnitCategories.FT2, Languages.CS, [], False, None))
-units.add_unit(Unit('stopám čtverečním', UnitCategories.FT2, Languages.CS, [], False, None))
-units.add_unit(Unit('stop čtverečních', UnitCategories.FT2, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('stopa čtvereční', UnitCategories.FT2, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('stopy čtvereční', UnitCategories.FT2, Languages.CS, numbers_validity_2_3_4, False, None))
-
-units.add_unit(Unit('square foot', UnitCategories.FT2, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('square-foot', UnitCategories.FT2, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('square feet', UnitCategories.FT2, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('square-feet', UnitCategories.FT2, Languages.EN, numbers_validity_not_ones, False, None))
-
-units.add_unit(Unit('stopách krychlových', UnitCategories.FT3, Languages.CS, [], False, None))
-units.add_unit(Unit('stopami krychlovými', UnitCategories.FT3, Languages.CS, [], False, None))
-units.add_unit(Unit('stopám krychlovým', UnitCategories.FT3, Languages.CS, [], False, None))
-units.add_unit(Unit('stop krychlových', UnitCategories.FT3, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('stopa krychlová', UnitCategories.FT3, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('stopy krychlové', UnitCategories.FT3, Languages.CS, numbers_validity_2_3_4, False, None))
-
-units.add_unit(Unit('cubic foot', UnitCategories.FT3, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('cubic-foot', UnitCategories.FT3, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('cubic feet', UnitCategories.FT3, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('cubic-feet', UnitCategories.FT3, Languages.EN, numbers_validity_not_ones, False, None))
-
-units.add_unit(Unit('stopách', UnitCategories.FT, Languages.CS, [], False, None))
-units.add_unit(Unit('stopami', UnitCategories.FT, Languages.CS, [], False, None))
-units.add_unit(Unit('stopám', UnitCategories.FT, Languages.CS, [], False, None))
-units.add_unit(Unit('stopa', UnitCategories.FT, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('stopy', UnitCategories.FT, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('stop', UnitCategories.FT, Languages.CS, numbers_validity_more_than_5, False, None))
-
-units.add_unit(Unit('ft', UnitCategories.FT, Languages.EN, None, True, None))
-units.add_unit(Unit('foot', UnitCategories.FT, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('feet', UnitCategories.FT, Languages.EN, numbers_validity_not_ones, False, None))
-
-units.add_unit(Unit('yardech', UnitCategories.YD, Languages.CS, [], False, None))
-units.add_unit(Unit('yardům', UnitCategories.YD, Languages.CS, [], False, None))
-units.add_unit(Unit('yardy', UnitCategories.YD, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('yardů', UnitCategories.YD, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('yard', UnitCategories.YD, Languages.CS, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('yd', UnitCategories.YD, Languages.EN, None, True, None))
-units.add_unit(Unit('yards', UnitCategories.YD, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('yard', UnitCategories.YD, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('čtverečních mílích', UnitCategories.MI2, Languages.CS, [], False, None))
-units.add_unit(Unit('čtverečními mílemi', UnitCategories.MI2, Languages.CS, [], False, None))
-units.add_unit(Unit('čtverečním mílím', UnitCategories.MI2, Languages.CS, [], False, None))
-units.add_unit(Unit('čtverečních mil', UnitCategories.MI2, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('čtvereční míle', UnitCategories.MI2, Languages.CS, numbers_validity_ones + numbers_validity_2_3_4, False, None))
-
-units.add_unit(Unit('square miles', UnitCategories.MI2, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('square-miles', UnitCategories.MI2, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('square mile', UnitCategories.MI2, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('square-mile', UnitCategories.MI2, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('milemi', UnitCategories.MI, Languages.CS, [], False, None))
-units.add_unit(Unit('milích', UnitCategories.MI, Languages.CS, [], False, None))
-units.add_unit(Unit('milím', UnitCategories.MI, Languages.CS, [], False, None))
-units.add_unit(Unit('míle', UnitCategories.MI, Languages.CS, numbers_validity_ones + numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('milí', UnitCategories.MI, Languages.CS, [], False, None))
-units.add_unit(Unit('mil', UnitCategories.MI, Languages.CS, numbers_validity_more_than_5, False, None))
-
-units.add_unit(Unit('miles', UnitCategories.MI, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('mile', UnitCategories.MI, Languages.EN, numbers_validity_ones, False, None))
-units.add_unit(Unit('mi', UnitCategories.MI, Languages.EN, None, True, None))
-
-units.add_unit(Unit('kč', UnitCategories.CZK, Languages.CS, None, True, None))
-units.add_unit(Unit(',-kč', UnitCategories.CZK, Languages.CS, None, True, None))
-units.add_unit(Unit('Kč', UnitCategories.CZK, Languages.CS, None, True, None))
-units.add_unit(Unit(',-Kč', UnitCategories.CZK, Languages.CS, None, True, None))
-units.add_unit(Unit('korun českých', UnitCategories.CZK, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('koruna česká', UnitCategories.CZK, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('koruny české', UnitCategories.CZK, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('korunám českým', UnitCategories.CZK, Languages.CS, [], False, None))
-units.add_unit(Unit('korunách českých', UnitCategories.CZK, Languages.CS, [], False, None))
-units.add_unit(Unit('korunami českými', UnitCategories.CZK, Languages.CS, [], False, None))
-units.add_unit(Unit('korunách', UnitCategories.CZK, Languages.CS, [], False, None))
-units.add_unit(Unit('korunami', UnitCategories.CZK, Languages.CS, [], False, None))
-units.add_unit(Unit('korunám', UnitCategories.CZK, Languages.CS, [], False, None))
-units.add_unit(Unit('koruny', UnitCategories.CZK, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('korun', UnitCategories.CZK, Languages.CS, numbers_validity_more_than_5, False, None))
-
-units.add_unit(Unit('CZK', UnitCategories.CZK, Languages.EN, None, True, None, True))
-units.add_unit(Unit('crowns', UnitCategories.CZK, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('Czech crowns', UnitCategories.CZK, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('kroners', UnitCategories.CZK, Languages.EN, [], False, None))
-units.add_unit(Unit('kroner', UnitCategories.CZK, Languages.EN, [], False, None))
-
-units.add_unit(Unit('$', UnitCategories.USD, Languages.CS, None, True, None, True))
-units.add_unit(Unit('USD', UnitCategories.USD, Languages.CS, None, True, None, True))
-units.add_unit(Unit('dolarech', UnitCategories.USD, Languages.CS, [], False, None))
-units.add_unit(Unit('dolarům', UnitCategories.USD, Languages.CS, [], False, None))
-units.add_unit(Unit('dolary', UnitCategories.USD, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('dolarů', UnitCategories.USD, Languages.CS, numbers_validity_more_than_5, False, None))
-units.add_unit(Unit('dolar', UnitCategories.USD, Languages.CS, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('$', UnitCategories.USD, Languages.EN, None, True, None, True))
-units.add_unit(Unit('USD', UnitCategories.USD, Languages.EN, None, True, None, True))
-units.add_unit(Unit('dollars', UnitCategories.USD, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('dollar', UnitCategories.USD, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('€', UnitCategories.EUR, Languages.CS, None, True, None, True))
-units.add_unit(Unit('EUR', UnitCategories.EUR, Languages.CS, None, True, None, True))
-units.add_unit(Unit('eurech', UnitCategories.EUR, Languages.CS, [], False, None))
-units.add_unit(Unit('eurům', UnitCategories.EUR, Languages.CS, [], False, None))
-units.add_unit(Unit('euro', UnitCategories.EUR, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('eura', UnitCategories.EUR, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('eury', UnitCategories.EUR, Languages.CS, [], False, None))
-units.add_unit(Unit('eur', UnitCategories.EUR, Languages.CS, numbers_validity_more_than_5, False, None))
-
-units.add_unit(Unit('€', UnitCategories.EUR, Languages.EN, None, True, None, True))
-units.add_unit(Unit('EUR', UnitCategories.EUR, Languages.EN, None, True, None, True))
-units.add_unit(Unit('euros', UnitCategories.EUR, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('euro', UnitCategories.EUR, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('£', UnitCategories.GBP, Languages.CS, [], True, None, True))
-units.add_unit(Unit('GBP', UnitCategories.GBP, Languages.CS, [], True, None, True))
-units.add_unit(Unit('librám', UnitCategories.GBP, Languages.CS, [], False, None))
-units.add_unit(Unit('librách', UnitCategories.GBP, Languages.CS, [], False, None))
-units.add_unit(Unit('librami', UnitCategories.GBP, Languages.CS, [], False, None))
-units.add_unit(Unit('libra', UnitCategories.GBP, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('libry', UnitCategories.GBP, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('liber', UnitCategories.GBP, Languages.CS, numbers_validity_more_than_5, False, None))
-
-units.add_unit(Unit('£', UnitCategories.GBP, Languages.EN, None, True, None, True))
-units.add_unit(Unit('GBP', UnitCategories.GBP, Languages.EN, None, True, None, True))
-units.add_unit(Unit('pounds', UnitCategories.GBP, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('pound', UnitCategories.GBP, Languages.EN, numbers_validity_ones, False, None))
-
-units.add_unit(Unit('libra', UnitCategories.LB, Languages.CS, numbers_validity_ones, False, None))
-units.add_unit(Unit('libry', UnitCategories.LB, Languages.CS, numbers_validity_2_3_4, False, None))
-units.add_unit(Unit('liber', UnitCategories.LB, Languages.CS, numbers_validity_more_than_5, False, None))
-
-units.add_unit(Unit('pounds', UnitCategories.LB, Languages.EN, numbers_validity_not_ones, False, None))
-units.add_unit(Unit('pound', UnitCategories.LB, Languages.EN, numbers_validity_ones, False, None))
+                    flags = set(flags.split(',')) if flags != '-' else set()
+                    if not flags <= {'abbreviation', 'before_number'}:
+                        raise ValueError(f"unknown flags {flags}")
+
+                    units_list.append(Unit(sys.intern(word),
+                                           UnitCategories.get_category(category),
+                                           Languages.get_language(language),
+                                           validity_rules[validity],
+                                           'abbreviation' in flags,
+                                           UnitDialect[dialect] if dialect != '-' else None,
+                                           'before_number' in flags))
+                except (ValueError, KeyError, UnitsRegistryException) as e:
+                    raise UnitsRegistryException(f"Line {line_number} of {filename} is not valid unit definition: {e}")
+
+        return units_list
+
+    @staticmethod
+    def __parse_validity(validity: str) -> Optional[NumbersValidity]:
+        """Parse and compile numbers validity rules from the data file (eg. '..-1,1..,float')"""
+        if validity == 'any':
+            return None
+
+        if validity == 'none':
+            return NumbersValidity.compile(())
+
+        rules = []
+        for rule in validity.split(','):
+            if rule == 'float':
+                rules.append(float)
+            elif '..' in rule:
+                left, right = rule.split('..')
+                rules.append((int(left) if left else None, int(right) if right else None))
+            else:
+                rules.append(int(rule))
+
+        return NumbersValidity.compile(rules)
+
+
+#: Data file with definitions of all unit forms
+UNITS_DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'units.tsv')
+
+units = UnitsWrapper()
+units.add_units(UnitsWrapper.load_units(UNITS_DATA_FILE))
+units.freeze()
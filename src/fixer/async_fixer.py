@@ -0,0 +1,55 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import List, Tuple, Iterable, Optional
+
+from .fixer import Fixer
+from .fixer_configurator import FixerConfigurator
+from .fixer_statistics import FixerStatisticsMarks as StatisticsMarks
+
+
+class AsyncFixer:
+    """Asynchronous variant of the Fixer for usage within asyncio applications.
+
+    External tools are called by blocking HTTP requests, so the fixing runs
+    in a pool of threads and the event loop is never blocked. At most `concurrency`
+    sentences (or batches) are fixed at the same time, others are waiting.
+    All threads share one `Fixer`, which is safe for concurrent use (see `Fixer`).
+
+    :param configuration: Configuration instance
+    :param concurrency: Maximal number of sentences fixed at the same time
+    :param collect_metrics: Flag whenever the metrics should be collected (see `Fixer.get_metrics`)
+    """
+
+    def __init__(self, configuration: FixerConfigurator, concurrency: int = 10, collect_metrics: bool = False):
+        self.fixer = Fixer(configuration, collect_metrics)
+        self.concurrency = concurrency
+
+        self.__executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='fixer')
+
+    async def fix(self, original_text: str, translated_text: str, rates_date: Optional[date] = None) -> Tuple[str, bool, List[StatisticsMarks]]:
+        """Coroutine fixing translation of one sentence, output is the same as of `Fixer.fix`.
+
+        :param original_text: Text in source language for verifying the translation.
+        :param translated_text: Text translated by translator.
+        :param rates_date: Day of exchange rates used for recalculating currencies (actual rates when not given)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, self.fixer.fix, original_text, translated_text, rates_date)
+
+    async def fix_batch(self, sentences: Iterable[Tuple[str, str]], rates_date: Optional[date] = None) -> List[Tuple[str, bool, List[StatisticsMarks]]]:
+        """Coroutine fixing translations of more sentences at once, output is the same as of `Fixer.fix_batch`.
+
+        :param sentences: Pairs of text in source language and text translated by translator
+        :param rates_date: Day of exchange rates used for recalculating currencies (actual rates when not given)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, self.fixer.fix_batch, list(sentences), rates_date)
+
+    def get_metrics(self) -> dict:
+        """Returns metrics collected by the fixer (see `Fixer.get_metrics`)"""
+        return self.fixer.get_metrics()
+
+    def close(self):
+        """Wait for running fixing and release the threads"""
+        self.__executor.shutdown(wait=True)
@@ -1,12 +1,25 @@
+import copy
+import hashlib
 import logging
-from typing import List, Tuple
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import date
+from itertools import islice
+from typing import List, Tuple, Iterable, Iterator, Optional
 
 from ._decimal_separator_fixer import DecimalSeparatorFixer
+from ._exchange_rates import CNBCommunicationException
+from ._memoization import MemoizedTool
+from ._metrics import MetricsCollector, InstrumentedTool
 from ._names_fixer import NamesFixer
 from ._numbers_fixer import NumberFixer
 from ._sentence_pair import SentencePair
-from .fixer_configurator import FixerConfigurator, FixerTools
+from ._units import units
+from .fixer_configurator import FixerConfigurator, FixerTools, FixerModes
 from .fixer_statistics import FixerStatisticsMarks as StatisticsMarks
+from .sentences_splitter import SentencesSplitter
 
 
 class Fixer:
@@ -17,13 +30,44 @@ class Fixer:
       - checking and replacement of proper names of person
       - checkong and replacement of numbers (possible with units)
 
+    Sentences can be fixed one by one (`fix`), in batches (`fix_batch`), where
+    external tools are called once for the whole batch, or lazily from any
+    iterable (`fix_stream`). Whole documents can be fixed by `fix_document`.
+
     All exceptions are catched and logged into 'fixer.log' file.
 
+    When the configuration contains persistent cache of results, fixed sentences are
+    saved into it and sentences fixed before are not fixed again.
+
+    When collecting of metrics is enabled, time of each fixing tool and each call
+    of external tools is measured (see `get_metrics`).
+
+    In recalculating mode currencies are converted by actual exchange rates. Rates of another day
+    (eg. date of an archived document) can be selected by the `rates_date` argument of the fixing methods.
+
+    One instance can be used by more threads at once (`AsyncFixer` and `fix_stream` do so). Each call
+    works on its own sentence pairs, shared caches, exchange rates, the persistent cache of results
+    and the offline UDPipe pipelines are guarded by locks. Lazily built indexes of units are assigned
+    only when complete, so concurrent first calls at worst build them twice.
+
     :param configuration: Configuration instance
+    :param collect_metrics: Flag whenever the metrics should be collected
     """
 
-    def __init__(self, configuration: FixerConfigurator):
+    def __init__(self, configuration: FixerConfigurator, collect_metrics: bool = False):
         self.fixers = []
+        self.metrics = MetricsCollector() if collect_metrics else None
+
+        self.results_cache = configuration.results_cache
+        self.configuration_fingerprint = configuration.get_fingerprint() if self.results_cache else None
+        self.memoized_tools = {name: getattr(configuration, name) for name in FixerConfigurator.MEMOIZABLE_TOOLS if isinstance(getattr(configuration, name), MemoizedTool)}
+
+        if self.metrics:
+            configuration = copy.copy(configuration)
+            configuration.aligner = InstrumentedTool(configuration.aligner, 'aligner', self.metrics) if configuration.aligner else None
+            configuration.lemmatizator = InstrumentedTool(configuration.lemmatizator, 'lemmatizator', self.metrics) if configuration.lemmatizator else None
+            configuration.names_tagger = InstrumentedTool(configuration.names_tagger, 'names_tagger', self.metrics) if configuration.names_tagger else None
+
         self.configuration = configuration
 
         if FixerTools.NAMES in configuration.tools:
@@ -35,32 +79,308 @@ class Fixer:
         if FixerTools.UNITS in configuration.tools:
             self.fixers.append(NumberFixer(configuration))
 
+        # the lemmatizator runs only the parts of the analysis read by some of the tools
+        self.annotation_layers = frozenset().union(*(tool.get_annotation_layers() for tool in self.fixers))
+
         logging.basicConfig(filename='fixer.log', level=logging.ERROR)
 
-    def fix(self, original_text: str, translated_text: str) -> Tuple[str, bool, List[StatisticsMarks]]:
+    def fix(self, original_text: str, translated_text: str, rates_date: Optional[date] = None) -> Tuple[str, bool, List[StatisticsMarks]]:
         """Function to fix translation of one sentence based on Fixer attributes.
 
         It caches all exceptions with fixer and when some exception is cached,
         sentence is marked as unfixable.
 
+        Tools which cannot change the sentence (see `is_applicable` of the tools)
+        are skipped, so the external tools are not called for them.
+
         :param original_text: Text in source language for verifying the translation.
         :param translated_text: Text translated by translator.
+        :param rates_date: Day of exchange rates used for recalculating currencies (actual rates when not given)
         :return:    - sentence after fixing (possible the same as input)
                     - has changed flag
                     - list with flags labeling the sentence and the correction
 
         """
 
-        sentence_pair = SentencePair(original_text, translated_text, self.configuration)
+        if not any(tool.is_applicable(original_text, translated_text) for tool in self.fixers):
+            self.__count("fixer.skipped")
+            return translated_text, False, []
+
+        fingerprint = self.__get_fingerprint(rates_date) if self.results_cache else None
+
+        if fingerprint:
+            cached_result = self.results_cache.get(fingerprint, [(original_text, translated_text)])[0]
+            if cached_result:
+                self.__count("results_cache.hits")
+                return cached_result
+            self.__count("results_cache.misses")
+
+        result = self.__fix_sentence(original_text, translated_text, rates_date)
+
+        if fingerprint and StatisticsMarks.G_EXCEPTION_CATCH not in result[2]:
+            self.results_cache.save(fingerprint, [(original_text, translated_text)], [result])
+
+        return result
+
+    def __fix_sentence(self, original_text: str, translated_text: str, rates_date: Optional[date]) -> Tuple[str, bool, List[StatisticsMarks]]:
+        """Fix one sentence by all applicable tools"""
+        sentence_pair = SentencePair(original_text, translated_text, self.configuration, rates_date, self.annotation_layers)
 
         final_marks = []
 
         for tool in self.fixers:
+            if not tool.is_applicable(original_text, sentence_pair.target_text):
+                self.__count(f"tool.{type(tool).__name__}.skipped")
+                continue
+
             try:
-                sentence_pair.target_text, marks = tool.fix(sentence_pair)
+                with self.__measure(f"tool.{type(tool).__name__}"):
+                    sentence_pair.target_text, marks = tool.fix(sentence_pair)
                 final_marks += marks
             except Exception as error:
                 logging.error("Error when fixing sentence:\n%s\t%s\nException: %s", original_text, translated_text, error)
                 return sentence_pair.target_text, sentence_pair.target_text_has_changed, [StatisticsMarks.G_EXCEPTION_CATCH]
 
         return sentence_pair.target_text, sentence_pair.target_text_has_changed, final_marks
+
+    def fix_batch(self, sentences: Iterable[Tuple[str, str]], rates_date: Optional[date] = None) -> List[Tuple[str, bool, List[StatisticsMarks]]]:
+        """Function to fix translations of more sentences at once.
+
+        The result is the same as calling `fix` for each sentence, but the outputs of external
+        tools (aligner, lemmatizator, names tagger) are loaded for the whole batch with as few
+        calls as possible. Fixing tools are applied to all sentences one after another.
+
+        When the external tools cannot be called for the whole batch, they are called for each
+        sentence separately.
+
+        :param sentences: Pairs of text in source language and text translated by translator
+        :param rates_date: Day of exchange rates used for recalculating currencies (actual rates when not given)
+        :return: For each pair the same output as `fix` in the same order
+        """
+
+        return self.__fix_batch(list(sentences), rates_date)
+
+    def __fix_batch(self, sentences: List[Tuple[str, str]], rates_date: Optional[date],
+                    analyses: Optional[List[Tuple[List[dict], List[dict]]]] = None) -> List[Tuple[str, bool, List[StatisticsMarks]]]:
+        """Fix the batch (see `fix_batch`), analysis of the original and translated sentences can be already known"""
+        results = [None] * len(sentences)
+
+        for idx, (original_text, translated_text) in enumerate(sentences):
+            if not any(tool.is_applicable(original_text, translated_text) for tool in self.fixers):
+                results[idx] = (translated_text, False, [])
+                self.__count("fixer.skipped")
+
+        to_fix = [idx for idx, result in enumerate(results) if result is None]
+        fingerprint = self.__get_fingerprint(rates_date) if self.results_cache and to_fix else None
+
+        if fingerprint:
+            cached_results = self.results_cache.get(fingerprint, [sentences[idx] for idx in to_fix])
+            for idx, cached_result in zip(to_fix, cached_results):
+                results[idx] = cached_result
+            self.__count("results_cache.hits", sum(1 for cached_result in cached_results if cached_result))
+            to_fix = [idx for idx in to_fix if results[idx] is None]
+            self.__count("results_cache.misses", len(to_fix))
+
+        to_fix_analyses = [analyses[idx] for idx in to_fix] if analyses else None
+        for idx, result in zip(to_fix, self.__fix_sentences([sentences[idx] for idx in to_fix], rates_date, to_fix_analyses)):
+            results[idx] = result
+
+        if fingerprint:
+            to_save = [idx for idx in to_fix if StatisticsMarks.G_EXCEPTION_CATCH not in results[idx][2]]
+            self.results_cache.save(fingerprint, [sentences[idx] for idx in to_save], [results[idx] for idx in to_save])
+
+        return results
+
+    def __fix_sentences(self, sentences: List[Tuple[str, str]], rates_date: Optional[date],
+                        analyses: Optional[List[Tuple[List[dict], List[dict]]]] = None) -> List[Tuple[str, bool, List[StatisticsMarks]]]:
+        """Fix more sentences by all applicable tools, external tools are called for whole batch"""
+
+        analyses = analyses or [(None, None)] * len(sentences)
+        sentence_pairs = [SentencePair(original_text, translated_text, self.configuration, rates_date, self.annotation_layers, source_lemmas, target_lemmas)
+                          for (original_text, translated_text), (source_lemmas, target_lemmas) in zip(sentences, analyses)]
+        final_marks = [[] for _ in sentence_pairs]
+        failed = set()
+
+        for tool in self.fixers:
+            active_pairs = [(idx, pair) for idx, pair in enumerate(sentence_pairs)
+                            if idx not in failed and tool.is_applicable(pair.source_text, pair.target_text)]
+            self.__count(f"tool.{type(tool).__name__}.skipped", len(sentence_pairs) - len(failed) - len(active_pairs))
+
+            try:
+                with self.__measure(f"tool.{type(tool).__name__}.prefetch"):
+                    tool.prefetch([pair for _, pair in active_pairs])
+            except Exception as error:
+                logging.error("Error when loading data for batch of %d sentences\nException: %s", len(active_pairs), error)
+
+            for idx, sentence_pair in active_pairs:
+                try:
+                    with self.__measure(f"tool.{type(tool).__name__}"):
+                        sentence_pair.target_text, marks = tool.fix(sentence_pair)
+                    final_marks[idx] += marks
+                except Exception as error:
+                    logging.error("Error when fixing sentence:\n%s\t%s\nException: %s", sentence_pair.source_text, sentence_pair.target_text, error)
+                    final_marks[idx] = [StatisticsMarks.G_EXCEPTION_CATCH]
+                    failed.add(idx)
+
+        return [(pair.target_text, pair.target_text_has_changed, marks) for pair, marks in zip(sentence_pairs, final_marks)]
+
+    def fix_stream(self, sentences: Iterable[Tuple[str, str]], window_size: int = 100, read_ahead: int = 1, rates_date: Optional[date] = None) -> Iterator[Tuple[str, bool, List[StatisticsMarks]]]:
+        """Generator fixing translations from any iterable (eg. generator over a large file).
+
+        Sentences are read lazily in windows of `window_size` pairs and each window
+        is fixed as a batch (see `fix_batch`). While results of one window are yielded,
+        next `read_ahead` windows are already processed in background threads, so at most
+        `read_ahead + 1` windows are held in memory. Windows processed at the same time
+        share this fixer (see thread-safety notes of the class).
+
+        :param sentences: Pairs of text in source language and text translated by translator
+        :param window_size: Number of pairs fixed together as one batch
+        :param read_ahead: Number of windows processed ahead of the consumer
+        :param rates_date: Day of exchange rates used for recalculating currencies (actual rates when not given)
+        :return: For each pair the same output as `fix` in the same order
+        """
+
+        sentences = iter(sentences)
+        windows = iter(lambda: list(islice(sentences, window_size)), [])
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=max(read_ahead, 1))
+
+        try:
+            for window in windows:
+                pending.append(executor.submit(self.fix_batch, window, rates_date))
+
+                if len(pending) > read_ahead:
+                    yield from pending.popleft().result()
+
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def fix_document(self, original_document: str, translated_document: str, rates_date: Optional[date] = None) -> Tuple[str, bool, List[List[StatisticsMarks]]]:
+        """Function to fix translation of whole document (more paragraphs and sentences).
+
+        Both documents are split into sentences, sentences are paired by their order
+        and fixed as one batch (see `fix_batch`). The analysis of the sentences is requested
+        together with the splitting, so the lemmatizator is called only once per document.
+        Fixed sentences are put back into the translated document, so the rest of it
+        (eg. line breaks) remains the same.
+
+        When the documents have different count of sentences, they are fixed as one sentence pair.
+
+        :param original_document: Document in source language for verifying the translation.
+        :param translated_document: Document translated by translator.
+        :param rates_date: Day of exchange rates used for recalculating currencies (actual rates when not given)
+        :return:    - document after fixing (possible the same as input)
+                    - has changed flag
+                    - for each sentence pair list with flags labeling the sentence and the correction
+        """
+
+        try:
+            original_sentences = SentencesSplitter.split_text_to_analysed_sentences(original_document, self.configuration.source_lang, self.configuration, self.annotation_layers)
+            translated_sentences = SentencesSplitter.split_text_to_analysed_sentences(translated_document, self.configuration.target_lang, self.configuration, self.annotation_layers)
+        except Exception as error:
+            logging.error("Error when splitting document:\n%s\nException: %s", original_document, error)
+            return translated_document, False, [[StatisticsMarks.G_EXCEPTION_CATCH]]
+
+        if len(original_sentences) != len(translated_sentences):
+            fixed_document, has_changed, marks = self.fix(original_document, translated_document, rates_date)
+            return fixed_document, has_changed, [marks]
+
+        results = self.__fix_batch([(original, translated) for (original, _), (translated, _) in zip(original_sentences, translated_sentences)], rates_date,
+                                   [(original_lemmas, translated_lemmas) for (_, original_lemmas), (_, translated_lemmas) in zip(original_sentences, translated_sentences)])
+        fixed_document = Fixer.__replace_sentences(translated_document, [translated for translated, _ in translated_sentences], [text for text, _, _ in results])
+
+        return fixed_document, fixed_document != translated_document, [marks for _, _, marks in results]
+
+    def __get_fingerprint(self, rates_date: Optional[date]) -> Optional[str]:
+        """Returns fingerprint of the configuration for the results cache (None when the results cannot be cached)
+
+        Results of recalculating depend also on the exchange rates (of the day), so the rates valid
+        at the moment of the lookup are added. Without the rates the results are not cached.
+        """
+        if self.configuration.mode != FixerModes.RECALCULATING or not self.configuration.exchange_rates:
+            return self.configuration_fingerprint
+
+        try:
+            rates = sorted(self.configuration.exchange_rates.get_rates(rates_date).items())
+        except CNBCommunicationException:
+            return None
+
+        return hashlib.sha256(f"{self.configuration_fingerprint}|{rates}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def __replace_sentences(document: str, sentences: List[str], fixed_sentences: List[str]) -> str:
+        """Replace sentences in the document (in given order) by fixed sentences
+
+        Sentences are searched with any whitespaces between words, because the splitter can change them.
+        """
+        parts = []
+        position = 0
+
+        for sentence, fixed_sentence in zip(sentences, fixed_sentences):
+            found = re.compile(r"\s+".join(re.escape(word) for word in sentence.split())).search(document, position)
+            if not found:
+                continue
+
+            parts.append(document[position:found.start()])
+            parts.append(fixed_sentence)
+            position = found.end()
+
+        parts.append(document[position:])
+
+        return "".join(parts)
+
+    def preload(self) -> 'Fixer':
+        """Load all resources used by the configuration in advance instead of on their first use
+
+        Models of the offline lemmatizator (for the source and target language) and exchange rates
+        (in recalculating mode, together with the conversion table of units) are loaded. It is meant
+        to be called before forking worker processes - the workers then share the loaded resources
+        (with the unit registry and compiled patterns loaded with the package) copy-on-write.
+
+        :return: The same instance
+        """
+        lemmatizator = self.configuration.lemmatizator
+        if lemmatizator and hasattr(lemmatizator, 'load_models'):
+            lemmatizator.load_models([self.configuration.source_lang, self.configuration.target_lang])
+
+        if self.configuration.mode == FixerModes.RECALCULATING:
+            units.get_conversion_table()
+
+        return self
+
+    def get_metrics(self) -> dict:
+        """Returns metrics collected by the fixer (empty when collecting is not enabled).
+
+        Stages are named `tool.<FixerTool>` for fixing tools (`tool.<FixerTool>.prefetch`
+        for loading data for batches) and `<aligner|lemmatizator|names_tagger>.<method>`
+        for calls of external tools.
+
+        :return: Dictionary with keys
+            - `timings` - for each stage count of calls, total and mean time and percentiles (p50, p95, p99) in seconds
+            - `counters` - counters (eg. sentences skipped by the tools, hits of the results cache,
+              hits and misses of remembered results of external tools `memoization.<tool>.<hits|misses>`)
+        """
+        if not self.metrics:
+            return {}
+
+        metrics = self.metrics.get_metrics()
+
+        for name, tool in self.memoized_tools.items():
+            statistics = tool.get_statistics()
+            metrics['counters'][f'memoization.{name}.hits'] = statistics['hits']
+            metrics['counters'][f'memoization.{name}.misses'] = statistics['misses']
+
+        return metrics
+
+    def __measure(self, name: str):
+        """Returns context manager measuring given stage (does nothing when metrics are not collected)"""
+        return self.metrics.measure(name) if self.metrics else nullcontext()
+
+    def __count(self, name: str, value: int = 1):
+        """Increase the counter when metrics are collected"""
+        if self.metrics:
+            self.metrics.count(name, value)
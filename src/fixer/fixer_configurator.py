@@ -1,12 +1,17 @@
+import hashlib
 from enum import Enum, auto
+from typing import Optional
 
 import yaml
 
-from ._aligner import get_aligners_list
-from ._exchange_rates import get_exchange_rates_convertors_list, get_default_exchange_rates_convertor, ExchangeRatesInterface
+from ._aligner import get_aligners_list, IBMAligner
+from ._exchange_rates import get_exchange_rates_convertors_list, get_default_exchange_rates_convertor, ExchangeRatesInterface, CNBExchangeRates
+from ._http import http_session
 from ._languages import Languages, Language
 from ._lemmatization import get_lemmatizators_list
+from ._memoization import MemoizedTool
 from ._name_recognition import get_names_tagger_list
+from ._results_cache import ResultsCache
 from ._units import UnitsSystem
 
 
@@ -34,6 +39,7 @@ class FixerConfigurator:
     :ivar source_lang: Language of the source sentences
     :ivar target_lang: Language of the target (translated) sentences
     :ivar aligner: Instance of the tool used for word-alignment
+    :ivar aligner_model: Path to the model of the offline aligner (default model when not given)
     :ivar lemmatizator: Instance of the tool used for sentence analysis
     :ivar names_tagger: Instance of the tool used for extracting names from sentence
     :ivar mode: Mode to be fixer working in (valid for units tool)
@@ -42,12 +48,26 @@ class FixerConfigurator:
     :ivar exchange_rates: Instance of CNBExchangeRates holding the rates
     :ivar tools: list of tools to be used
     :ivar target_units: Units to be recalculated to when mode is recalculating
+    :ivar results_cache: Persistent cache of fixed sentences (optional)
     """
 
+    #: Default maximal count of sentences in the results cache
+    DEFAULT_RESULTS_CACHE_SIZE = 1000000
+
+    #: Default maximal count of remembered results of one external tool
+    DEFAULT_MEMOIZATION_SIZE = 10000
+
+    #: Default maximal approximate memory (in MB) used by remembered results of one external tool
+    DEFAULT_MEMOIZATION_MEMORY = 64
+
+    #: External tools whose results can be remembered
+    MEMOIZABLE_TOOLS = ('aligner', 'lemmatizator', 'names_tagger')
+
     def __init__(self):
         self.source_lang = None
         self.target_lang = None
         self.aligner = None
+        self.aligner_model = None
         self.lemmatizator = None
         self.names_tagger = None
         self.mode = None
@@ -56,6 +76,7 @@ class FixerConfigurator:
         self.exchange_rates = None
         self.tools = []
         self.target_units = []
+        self.results_cache = None
 
     def load_from_file(self, filename: str):
         """Loads configuration from given file"""
@@ -68,9 +89,12 @@ class FixerConfigurator:
         self.source_lang = self.__get_language(config, 'source_lang')
         self.target_lang = self.__get_language(config, 'target_lang')
 
-        self.aligner = self.__verify_and_get_instance(get_aligners_list(), config, 'aligner')()
+        self.__configure_http_session(config, 'http_connect_timeout', 'http_read_timeout', 'http_pool_size')
+
+        self.aligner = self.__get_aligner(config, 'aligner', 'aligner_model')
         self.lemmatizator = self.__verify_and_get_instance(get_lemmatizators_list(), config, 'lemmatizator')()
         self.names_tagger = self.__verify_and_get_instance(get_names_tagger_list(), config, 'names_tagger')()
+        self.__memoize_tools(config, 'memoize', 'memoization_size', 'memoization_memory')
         self.mode = self.__verify_and_get_instance({'fixing': FixerModes.FIXING, 'recalculating': FixerModes.RECALCULATING}, config, 'mode')
         self.base_tolerance = self.__verify_number_interval(0, 1, config, 'base_tolerance')
         self.approximately_tolerance = self.__verify_number_interval(0, 1, config, 'approximately_tolerance')
@@ -78,6 +102,65 @@ class FixerConfigurator:
         self.target_units = self.__get_enum_items_by_names({e.name: e for e in UnitsSystem}, config, 'target_units')
         self.tools = self.__get_enum_items_by_names({e.name: e for e in FixerTools}, config, 'tools')
         self.exchange_rates = self.__get_exchange_rates(config, 'exchange_rates')
+        self.__configure_exchange_rates(config, 'exchange_rates_snapshot', 'exchange_rates_ttl', 'exchange_rates_offline', 'exchange_rates_history')
+        self.results_cache = self.__get_results_cache(config, 'results_cache', 'results_cache_size')
+
+    def get_fingerprint(self) -> str:
+        """Returns hash of all configuration options influencing the result of fixing
+
+        Exchange rates are not included (they are loaded on the first use), results of
+        recalculating are cached together with the rates by the `Fixer`.
+        """
+        options = [
+            self.source_lang.acronym if self.source_lang else None,
+            self.target_lang.acronym if self.target_lang else None,
+            self.__get_tool_name(self.aligner),
+            self.aligner_model,
+            self.__get_tool_name(self.lemmatizator),
+            self.__get_tool_name(self.names_tagger),
+            self.mode.name if self.mode else None,
+            self.base_tolerance,
+            self.approximately_tolerance,
+            sorted(tool.name for tool in self.tools),
+            sorted(units_system.name for units_system in self.target_units),
+        ]
+
+        return hashlib.sha256(repr(options).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def __get_tool_name(tool) -> str:
+        """Returns name of the class of the external tool (regardless the results are remembered)"""
+        return type(tool.tool if isinstance(tool, MemoizedTool) else tool).__name__
+
+    def __memoize_tools(self, config: dict, tools_option: str, size_option: str, memory_option: str):
+        """Wrap external tools listed in the configuration so their results are remembered"""
+        size = config.get(size_option, FixerConfigurator.DEFAULT_MEMOIZATION_SIZE)
+        memory = config.get(memory_option, FixerConfigurator.DEFAULT_MEMOIZATION_MEMORY)
+
+        if not isinstance(size, int) or size <= 0:
+            raise FixerConfiguratorException(f"{size} is not valid configuration option. It should be positive integer.")
+
+        if not isinstance(memory, (int, float)) or memory <= 0:
+            raise FixerConfiguratorException(f"{memory} is not valid configuration option. It should be positive number.")
+
+        for tool_name in config.get(tools_option) or []:
+            if tool_name not in FixerConfigurator.MEMOIZABLE_TOOLS:
+                raise FixerConfiguratorException(f"Wrong definition of {tools_option} - {tool_name}.")
+
+            setattr(self, tool_name, MemoizedTool(getattr(self, tool_name), size, int(memory * 1024 * 1024)))
+
+    def __get_aligner(self, config: dict, aligner_option: str, model_option: str):
+        """Create the aligner, path to the model can be given only for the offline aligner"""
+        aligner_class = self.__verify_and_get_instance(get_aligners_list(), config, aligner_option)
+
+        if not config.get(model_option):
+            return aligner_class()
+
+        if aligner_class is not IBMAligner:
+            raise FixerConfiguratorException(f"{model_option} option is valid only for the local_ibm aligner.")
+
+        self.aligner_model = config[model_option]
+        return aligner_class(self.aligner_model)
 
     @staticmethod
     def __verify_and_get_instance(instances: dict, config: dict, config_option: str):
@@ -149,6 +232,48 @@ class FixerConfigurator:
 
         return convertor
 
+    def __configure_exchange_rates(self, config: dict, snapshot_option: str, ttl_option: str, offline_option: str, history_option: str):
+        """Set optional snapshot files of exchange rates (actual and historical), TTL and offline mode (rates are loaded on first use)"""
+
+        if ttl_option in config and (not isinstance(config[ttl_option], (int, float)) or config[ttl_option] <= 0):
+            raise FixerConfiguratorException(f"{config[ttl_option]} is not valid configuration option. It should be positive number.")
+
+        if offline_option in config and not isinstance(config[offline_option], bool):
+            raise FixerConfiguratorException(f"{config[offline_option]} is not valid configuration option. It should be true or false.")
+
+        if offline_option in config and config[offline_option] and not (config.get(snapshot_option) or config.get(history_option)):
+            raise FixerConfiguratorException(f"Offline exchange rates need the {snapshot_option} or {history_option} option.")
+
+        if isinstance(self.exchange_rates, CNBExchangeRates):
+            self.exchange_rates.configure(config.get(snapshot_option), config.get(ttl_option), config.get(offline_option), config.get(history_option))
+
+    @staticmethod
+    def __configure_http_session(config: dict, connect_timeout_option: str, read_timeout_option: str, pool_size_option: str):
+        """Set optional timeouts and size of connection pools of the session shared by the external tools"""
+
+        for option in (connect_timeout_option, read_timeout_option):
+            if option in config and (not isinstance(config[option], (int, float)) or config[option] <= 0):
+                raise FixerConfiguratorException(f"{config[option]} is not valid configuration option. It should be positive number.")
+
+        if pool_size_option in config and (not isinstance(config[pool_size_option], int) or config[pool_size_option] <= 0):
+            raise FixerConfiguratorException(f"{config[pool_size_option]} is not valid configuration option. It should be positive integer.")
+
+        http_session.configure(config.get(connect_timeout_option), config.get(read_timeout_option), config.get(pool_size_option))
+
+    @staticmethod
+    def __get_results_cache(config: dict, path_option: str, size_option: str) -> Optional[ResultsCache]:
+        """Load optional persistent cache of results, size of the cache has to be positive integer"""
+
+        if not config.get(path_option):
+            return None
+
+        size = config.get(size_option, FixerConfigurator.DEFAULT_RESULTS_CACHE_SIZE)
+
+        if not isinstance(size, int) or size <= 0:
+            raise FixerConfiguratorException(f"{size} is not valid configuration option. It should be positive integer.")
+
+        return ResultsCache(config[path_option], size)
+
     def __validate_configuration(self) -> bool:
         """Check if there are all necessary items filled."""
         if not self.source_lang or not self.target_lang:
@@ -1,6 +1,7 @@
-from typing import List
+from typing import List, Tuple, FrozenSet
 
 from ._languages import Language
+from ._lemmatization import AnnotationLayers
 from .fixer_configurator import FixerConfigurator
 
 
@@ -11,3 +12,9 @@ class SentencesSplitter:
     def split_text_to_sentences(text: str, language: Language, configuration: FixerConfigurator) -> List[List[str]]:
         """Returns list of paragraphs (list of sentences)"""
         return configuration.lemmatizator.get_sentences_split(text, language)
+
+    @staticmethod
+    def split_text_to_analysed_sentences(text: str, language: Language, configuration: FixerConfigurator,
+                                         layers: FrozenSet[AnnotationLayers]) -> List[Tuple[str, List[dict]]]:
+        """Returns sentences (regardless the paragraphs) with their analysis of given layers, the text is analysed only once"""
+        return configuration.lemmatizator.get_sentences_analysis(text, language, layers)
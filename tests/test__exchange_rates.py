@@ -1,4 +1,9 @@
-from fixer._exchange_rates import CNBExchangeRates
+import os
+from datetime import date
+
+import pytest
+
+from fixer._exchange_rates import CNBExchangeRates, CNBExchangeRatesHistory, CNBCommunicationException
 
 
 def test_get_rate_from_CZK():
@@ -51,3 +56,106 @@ def test_get_rate_not_CZK():
     assert convertor.get_rate("GBP", "USD", 1) == (1 * 35) / 25
     assert convertor.get_rate("EUR", "GBP", 1) == (1 * 45) / 35
     assert convertor.get_rate("EUR", "USD", 1) == (1 * 45) / 25
+
+
+def test_rates_loaded_lazily(monkeypatch, tmp_path):
+    loaded = []
+    monkeypatch.setattr(CNBExchangeRates, "load_rates", staticmethod(lambda: loaded.append(True) or {"USD": 20, "GBP": 30, "EUR": 25}))
+
+    convertor = CNBExchangeRates(snapshot_path=str(tmp_path / "rates.json"))
+    assert not loaded
+
+    assert convertor.get_rate("USD", "CZK", 2) == 40
+    assert convertor.get_rate("EUR", "CZK", 2) == 50
+    assert len(loaded) == 1
+
+
+def test_rates_not_loaded_when_predefined(monkeypatch):
+    monkeypatch.setattr(CNBExchangeRates, "load_rates", staticmethod(lambda: pytest.fail("rates should not be loaded")))
+
+    convertor = CNBExchangeRates({"USD": 25, "GBP": 35, "EUR": 45})
+
+    assert convertor.get_rate("USD", "CZK", 1) == 25
+
+
+def test_rates_snapshot(monkeypatch, tmp_path):
+    snapshot_path = str(tmp_path / "rates.json")
+    monkeypatch.setattr(CNBExchangeRates, "load_rates", staticmethod(lambda: {"USD": 20, "GBP": 30, "EUR": 25}))
+    CNBExchangeRates(snapshot_path=snapshot_path).get_rate("USD", "CZK", 1)
+
+    monkeypatch.setattr(CNBExchangeRates, "load_rates", staticmethod(lambda: {"USD": 21, "GBP": 31, "EUR": 26}))
+
+    assert CNBExchangeRates(snapshot_path=snapshot_path).get_rate("USD", "CZK", 1) == 20
+    assert CNBExchangeRates(snapshot_path=snapshot_path, ttl=0).get_rate("USD", "CZK", 1) == 21
+
+
+def test_rates_offline(monkeypatch, tmp_path):
+    snapshot_path = str(tmp_path / "rates.json")
+    monkeypatch.setattr(CNBExchangeRates, "load_rates", staticmethod(lambda: pytest.fail("rates should not be loaded")))
+
+    with pytest.raises(CNBCommunicationException):
+        CNBExchangeRates(snapshot_path=snapshot_path, offline=True).get_rate("USD", "CZK", 1)
+
+    CNBExchangeRates.save_snapshot(snapshot_path, {"USD": 20, "GBP": 30, "EUR": 25})
+    os.utime(snapshot_path, (0, 0))
+
+    assert CNBExchangeRates(snapshot_path=snapshot_path, offline=True).get_rate("USD", "CZK", 1) == 20
+
+
+HISTORY_2019 = """Datum|1 AUD|1 EUR|1 GBP|100 JPY|1 USD
+27.12.2019|15,812|25,430|29,836|20,780|22,855
+30.12.2019|15,844|25,410|29,717|20,783|22,621
+31.12.2019|15,905|25,410|29,866|20,843|22,621
+"""
+
+HISTORY_2020 = """Datum|1 AUD|1 EUR|1 GBP|100 JPY|1 USD
+02.01.2020|15,812|25,225|29,808|20,885|22,559
+03.01.2020|15,661|25,250|29,658|20,997|22,660
+"""
+
+
+def test_parse_history():
+    published = CNBExchangeRatesHistory.parse_history(HISTORY_2020)
+
+    assert sorted(published) == [date(2020, 1, 2), date(2020, 1, 3)]
+    assert published[date(2020, 1, 2)] == {"EUR": 25.225, "GBP": 29.808, "USD": 22.559}
+
+
+def test_history_days_without_rates(tmp_path):
+    history = CNBExchangeRatesHistory(str(tmp_path / "history.json"), offline=True)
+    history.load_history(HISTORY_2019, 2019)
+    history.load_history(HISTORY_2020, 2020)
+
+    assert history.get_rate("USD", date(2019, 12, 28)) == 22.855
+    assert history.get_rate("USD", date(2019, 12, 30)) == 22.621
+    assert history.get_rate("USD", date(2020, 1, 1)) == 22.621
+    assert history.get_rate("USD", date(2020, 1, 3)) == 22.66
+    assert history.get_rate("USD", date(2020, 1, 4)) == 22.66
+
+    with pytest.raises(CNBCommunicationException):
+        history.get_rate("USD", date(2019, 12, 26))
+
+
+def test_history_downloaded_once(monkeypatch, tmp_path):
+    snapshot_path = str(tmp_path / "history.json")
+    downloaded = []
+    monkeypatch.setattr(CNBExchangeRatesHistory, "download_year", staticmethod(
+        lambda year: downloaded.append(year) or CNBExchangeRatesHistory.parse_history({2019: HISTORY_2019, 2020: HISTORY_2020}[year])))
+
+    history = CNBExchangeRatesHistory(snapshot_path)
+    assert history.get_rate("EUR", date(2019, 12, 30)) == 25.41
+    assert history.get_rate("EUR", date(2019, 12, 31)) == 25.41
+    assert downloaded == [2019]
+
+    assert CNBExchangeRatesHistory(snapshot_path, offline=True).get_rate("EUR", date(2019, 12, 31)) == 25.41
+
+
+def test_get_rate_with_date(monkeypatch, tmp_path):
+    monkeypatch.setattr(CNBExchangeRates, "load_rates", staticmethod(lambda: pytest.fail("actual rates should not be loaded")))
+
+    convertor = CNBExchangeRates({"GBP": 30}, history_path=str(tmp_path / "history.json"), offline=True)
+    convertor.history.load_history(HISTORY_2019, 2019)
+
+    assert convertor.get_rate("USD", "CZK", 2, date(2019, 12, 31)) == 2 * 22.621
+    assert convertor.get_rate("GBP", "CZK", 2, date(2019, 12, 31)) == 2 * 30
+    assert convertor.get_rates(date(2019, 12, 31)) == {"EUR": 25.41, "GBP": 30, "USD": 22.621}
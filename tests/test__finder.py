@@ -15,6 +15,10 @@ def test_find_number_unit_pairs_cs():
     compare_number_unit_finder_result(r2, pairs[1])
 
 
+def test_find_number_unit_pairs_without_digits():
+    assert Finder.find_number_unit_pairs("Koupil jsem si pět domů za sto korun.", Languages.CS) == []
+
+
 def test_find_number_unit_pairs_approximately():
     pairs = Finder.find_number_unit_pairs("Koupil jsem asi 3 metry provazu", Languages.CS)
 
@@ -0,0 +1,64 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from fixer._http import HttpSession
+
+
+class LocalHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(1)
+
+        body = str(self.client_address[1]).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), LocalHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_connection_kept_alive(server_url):
+    session = HttpSession()
+
+    client_ports = {session.get(server_url + '/').text for _ in range(5)}
+
+    assert len(client_ports) == 1
+
+
+def test_read_timeout(server_url):
+    session = HttpSession(read_timeout=0.1)
+
+    with pytest.raises(requests.Timeout):
+        session.get(server_url + '/slow')
+
+
+def test_configure(server_url):
+    session = HttpSession()
+    first_port = session.get(server_url + '/').text
+
+    session.configure(read_timeout=0.1, pool_size=2)
+
+    assert session.read_timeout == 0.1
+    assert session.pool_size == 2
+    assert session.connect_timeout == HttpSession().connect_timeout
+    assert session.get(server_url + '/').text != first_port
@@ -4,3 +4,11 @@ from fixer._languages import Languages
 def test_get_language():
     assert Languages.get_language("cs") == Languages.CS
     assert Languages.get_language("en") == Languages.EN
+
+
+def test_get_scaling_words():
+    words = dict(Languages.CS.get_scaling_words(1000))
+
+    assert list(words) == ['tisíce', 'tisíc']
+    assert words['tisíce'].matches(3) and not words['tisíce'].matches(5)
+    assert Languages.EN.get_scaling_words(1000) == [('thousand', None)]
@@ -1,5 +1,12 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fixer._lemmatization
+from fixer._http import http_session
 from fixer._languages import Languages
-from fixer._lemmatization import UDPipeOffline, UDPipeOnline
+from fixer._lemmatization import UDPipeOffline, UDPipeOnline, UDPipeProcessor, AnnotationLayers
 
 
 def test_get_sentences_split():
@@ -17,3 +24,164 @@ def test_get_lemmatization():
     input_sentences = "Když si za sebe sedne 185 centimetrů vysoký řidič, stále mu zbývá dobrých deset centimetrů před koleny."
 
     assert UDPipeOnline.get_sentences_split(input_sentences, Languages.CS) == UDPipeOffline().get_sentences_split(input_sentences, Languages.CS)
+
+
+UDPIPE_OUTPUT = """# newdoc
+# newpar
+# sent_id = 1
+# text = Koupil si dům.
+1\tKoupil\tkoupit\tVERB\tVpYS---XR-AA---\tAspect=Perf|Gender=Masc\t0\troot\t_\tTokenRange=0:6
+2-3\tsi\t_\t_\t_\t_\t_\t_\t_\tTokenRange=7:9
+2\ts\tse\tPRON\tP7-X3----------\tCase=Dat\t1\texpl:pv\t_\t_
+3\ti\ti\tCCONJ\tJ^-------------\t_\t1\tcc\t_\t_
+4\tdům\tdům\tNOUN\tNNIS4-----A----\tCase=Acc\t1\tobj\t_\tSpaceAfter=No|TokenRange=10:13
+5\t.\t.\tPUNCT\tZ:-------------\t_\t1\tpunct\t_\tTokenRange=13:14
+
+# sent_id = 2
+# text = Ujel 5 km.
+1\tUjel\tujet\tVERB\tVpYS---XR-AA---\t_\t0\troot\t_\tTokenRange=15:19
+2\t5\t5\tNUM\tC=-------------\t_\t3\tnummod\t_\tTokenRange=20:21
+
+# newpar
+# sent_id = 3
+# text = Až do smrti.
+1\tAž\taž\tPART\tTT-------------\t_\t0\troot\t_\tTokenRange=23:25
+"""
+
+
+def test_process_udpipe_output():
+    lemmas = UDPipeProcessor.process_udpipe_output(UDPIPE_OUTPUT)
+
+    assert [(lemma['word'], lemma['lemma'], lemma['upostag']) for lemma in lemmas] == [
+        ('Koupil', 'koupit', 'VERB'), ('si', '_', '_'), ('dům', 'dům', 'NOUN'), ('.', '.', 'PUNCT'),
+        ('Ujel', 'ujet', 'VERB'), ('5', '5', 'NUM'), ('Až', 'až', 'PART'),
+    ]
+    assert (lemmas[2]['rangeStart'], lemmas[2]['rangeEnd']) == (10, 13)
+
+
+def test_process_udpipe_output_dependencies():
+    lemmas = UDPipeProcessor.process_udpipe_output(UDPIPE_OUTPUT, dependencies=True)
+
+    assert (lemmas[2]['head'], lemmas[2]['deprel']) == ('1', 'obj')
+    assert 'head' not in UDPipeProcessor.process_udpipe_output(UDPIPE_OUTPUT)[2]
+
+
+def test_online_runs_only_requested_layers(monkeypatch):
+    payloads = []
+
+    class Response:
+        status_code = 200
+        content = json.dumps({'result': UDPIPE_OUTPUT})
+
+    monkeypatch.setattr(http_session, "post", lambda url, data: payloads.append(data) or Response())
+
+    UDPipeOnline.get_lemmatization("Koupil si dům.", Languages.CS, frozenset({AnnotationLayers.TOKENS, AnnotationLayers.LEMMA}))
+    UDPipeOnline.get_lemmatizations(["Koupil si dům."], Languages.CS, frozenset({AnnotationLayers.TOKENS}))
+    UDPipeOnline.get_lemmatization("Koupil si dům.", Languages.CS)
+
+    assert [sorted(key for key in payload if key != 'data') for payload in payloads] == [
+        ['tagger', 'tokenizer'], ['tokenizer'], ['parser', 'tagger', 'tokenizer']
+    ]
+
+
+def test_split_by_paragraphs_sentences():
+    assert UDPipeProcessor.split_by_paragraphs_sentences(UDPIPE_OUTPUT) == [["Koupil si dům.", "Ujel 5 km."], ["Až do smrti."]]
+    assert UDPipeProcessor.split_by_paragraphs_sentences(UDPIPE_OUTPUT.rstrip()) == [["Koupil si dům.", "Ujel 5 km."], ["Až do smrti."]]
+
+
+def test_split_by_sentences():
+    sentences = UDPipeProcessor.split_by_sentences(UDPIPE_OUTPUT, dependencies=True)
+
+    assert [text for text, _ in sentences] == ["Koupil si dům.", "Ujel 5 km.", "Až do smrti."]
+    assert [lemma['word'] for lemma in sentences[1][1]] == ['Ujel', '5']
+    assert [(lemma['rangeStart'], lemma['rangeEnd']) for lemma in sentences[1][1]] == [(0, 4), (5, 6)]
+    assert (sentences[0][1][2]['head'], sentences[0][1][2]['deprel']) == ('1', 'obj')
+    assert UDPipeProcessor.split_by_sentences(UDPIPE_OUTPUT.rstrip()) == UDPipeProcessor.split_by_sentences(UDPIPE_OUTPUT)
+
+
+def test_split_by_texts():
+    texts = ["Ujel 5 km.", "Stál 20 korun."]
+    joined_text, offsets = UDPipeProcessor.join_texts(texts)
+    lemmas = [
+        {'word': 'Ujel', 'rangeStart': 0, 'rangeEnd': 4},
+        {'word': 'km', 'rangeStart': 7, 'rangeEnd': 9},
+        {'word': 'Stál', 'rangeStart': 12, 'rangeEnd': 16},
+        {'word': 'korun', 'rangeStart': 20, 'rangeEnd': 25},
+    ]
+
+    texts_lemmas = UDPipeProcessor.split_by_texts(lemmas, offsets)
+
+    assert joined_text == "Ujel 5 km.\n\nStál 20 korun."
+    assert [[lemma['word'] for lemma in text_lemmas] for text_lemmas in texts_lemmas] == [['Ujel', 'km'], ['Stál', 'korun']]
+    assert texts[1][texts_lemmas[1][1]['rangeStart']:texts_lemmas[1][1]['rangeEnd']] == 'korun'
+
+
+def test_get_lemmatizations():
+    texts = ["Koupil si dům.", "Ujel dvacet kilometrů."]
+
+    assert UDPipeOnline.get_lemmatizations(texts, Languages.CS) == [UDPipeOnline.get_lemmatization(text, Languages.CS) for text in texts]
+
+
+def test_offline_models_loaded_lazily_in_parallel(monkeypatch):
+    loading = []
+    both_loading = threading.Barrier(2, timeout=5)
+
+    class FakeModel:
+        @staticmethod
+        def load(path):
+            loading.append(path)
+            both_loading.wait()
+            return FakeModel()
+
+    class FakePipeline:
+        DEFAULT = NONE = ''
+
+        def __init__(self, model, *args):
+            self.model = model
+
+    monkeypatch.setattr(fixer._lemmatization, "Model", FakeModel)
+    monkeypatch.setattr(fixer._lemmatization, "Pipeline", FakePipeline)
+    monkeypatch.setattr(UDPipeOffline, "_UDPipeOffline__verify_download_file", staticmethod(lambda model_name: None))
+
+    lemmatizator = UDPipeOffline()
+    assert not loading
+    assert not lemmatizator.is_loaded(Languages.CS)
+
+    lemmatizator.load_models([Languages.CS, Languages.EN, Languages.EN])
+
+    assert len(loading) == 2
+    assert lemmatizator.is_loaded(Languages.CS) and lemmatizator.is_loaded(Languages.EN)
+
+
+def test_offline_pipeline_used_by_one_thread_at_time(monkeypatch):
+    running = []
+    overlapping = []
+
+    class FakeModel:
+        @staticmethod
+        def load(path):
+            return FakeModel()
+
+    class FakePipeline:
+        DEFAULT = NONE = ''
+
+        def __init__(self, model, *args):
+            self.model = model
+
+        def process(self, text, error):
+            running.append(text)
+            overlapping.append(len(running) > 1)
+            time.sleep(0.01)
+            running.remove(text)
+            return ""
+
+    monkeypatch.setattr(fixer._lemmatization, "Model", FakeModel)
+    monkeypatch.setattr(fixer._lemmatization, "Pipeline", FakePipeline)
+    monkeypatch.setattr(UDPipeOffline, "_UDPipeOffline__verify_download_file", staticmethod(lambda model_name: None))
+
+    lemmatizator = UDPipeOffline()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda text: lemmatizator.get_sentences_split(text, Languages.CS), ["a", "b", "c", "d"]))
+
+    assert len(overlapping) == 4
+    assert not any(overlapping)
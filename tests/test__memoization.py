@@ -0,0 +1,101 @@
+import pytest
+
+from fixer._languages import Languages
+from fixer._memoization import LRUCache, MemoizedTool
+
+
+class CountingLemmatizator:
+    def __init__(self):
+        self.calls = []
+
+    def get_lemmatization(self, text, language, layers=frozenset({'lemma'})):
+        self.calls.append(text)
+        return [{'form': word, 'lemma': word.lower()} for word in text.split()]
+
+    def get_lemmatizations(self, texts, language, layers=frozenset({'lemma'})):
+        self.calls.extend(texts)
+        return [[{'form': word, 'lemma': word.lower()} for word in text.split()] for text in texts]
+
+    def get_name(self):
+        return "counting"
+
+
+def test_lru_cache_entries_limit():
+    cache = LRUCache(max_entries=2, max_bytes=10000)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("a") == (True, 1)
+    assert cache.get("b") == (False, None)
+    assert cache.get("c") == (True, 3)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_lru_cache_bytes_limit():
+    cache = LRUCache(max_entries=100, max_bytes=500)
+    for idx in range(10):
+        cache.put(idx, "x" * 100)
+
+    assert cache.size <= 500
+    assert len(cache) == 500 // (LRUCache.estimate_size(0) + LRUCache.estimate_size("x" * 100))
+    assert cache.get(9) == (True, "x" * 100)
+
+    cache.put("big", "x" * 1000)
+    assert cache.get("big") == (False, None)
+
+
+def test_memoized_tool():
+    lemmatizator = CountingLemmatizator()
+    tool = MemoizedTool(lemmatizator, 100, 100000)
+
+    first = tool.get_lemmatization("Ujel 5 km", Languages.CS)
+    second = tool.get_lemmatization("Ujel 5 km", Languages.CS)
+    tool.get_lemmatization("Ujel 5 km", Languages.EN)
+
+    assert first == second
+    assert lemmatizator.calls == ["Ujel 5 km", "Ujel 5 km"]
+    assert tool.get_statistics()['hits'] == 1
+    assert tool.get_statistics()['misses'] == 2
+    assert tool.get_name() == "counting"
+
+
+def test_memoized_tool_batch():
+    lemmatizator = CountingLemmatizator()
+    tool = MemoizedTool(lemmatizator, 100, 100000)
+
+    tool.get_lemmatization("Ujel 5 km", Languages.CS)
+    results = tool.get_lemmatizations(["Ujel 5 km", "Koupil 3 metry", "Koupil 3 metry"], Languages.CS)
+
+    assert [list(map(dict, result)) for result in results] == lemmatizator.get_lemmatizations(["Ujel 5 km", "Koupil 3 metry", "Koupil 3 metry"], Languages.CS)
+    assert lemmatizator.calls[:3] == ["Ujel 5 km", "Koupil 3 metry", "Koupil 3 metry"]
+
+    tool.get_lemmatizations(["Koupil 3 metry"], Languages.CS)
+    assert tool.get_statistics()['hits'] == 2
+
+
+def test_memoized_tool_arguments():
+    lemmatizator = CountingLemmatizator()
+    tool = MemoizedTool(lemmatizator, 100, 100000)
+
+    tool.get_lemmatization("Ujel 5 km", Languages.CS)
+    tool.get_lemmatization("Ujel 5 km", Languages.CS, frozenset({'lemma'}))
+    tool.get_lemmatization(text="Ujel 5 km", language=Languages.CS)
+    tool.get_lemmatizations(["Ujel 5 km"], language=Languages.CS, layers=frozenset({'lemma'}))
+    tool.get_lemmatization("Ujel 5 km", Languages.CS, layers=frozenset({'form'}))
+
+    assert lemmatizator.calls == ["Ujel 5 km", "Ujel 5 km"]
+    assert tool.get_statistics()['hits'] == 3
+
+
+def test_memoized_tool_immutable_results():
+    tool = MemoizedTool(CountingLemmatizator(), 100, 100000)
+
+    result = tool.get_lemmatization("Ujel 5 km", Languages.CS)
+
+    with pytest.raises(AttributeError):
+        result.append({'form': 'x', 'lemma': 'x'})
+    with pytest.raises(TypeError):
+        result[0]['lemma'] = 'x'
+    assert tool.get_lemmatization("Ujel 5 km", Languages.CS)[0]['lemma'] == 'ujel'
@@ -0,0 +1,47 @@
+from fixer._metrics import MetricsCollector, InstrumentedTool
+
+
+def test_get_metrics_percentiles():
+    metrics = MetricsCollector()
+    for duration in range(1, 101):
+        metrics.record("stage", duration / 100)
+
+    timings = metrics.get_metrics()['timings']['stage']
+
+    assert timings['calls'] == 100
+    assert round(timings['total'], 2) == 50.5
+    assert timings['p50'] == 0.51
+    assert timings['p95'] == 0.96
+    assert timings['p99'] == 1.0
+
+
+def test_get_metrics_samples_limit():
+    metrics = MetricsCollector(samples_limit=10)
+    for duration in range(1, 101):
+        metrics.record("stage", duration)
+
+    timings = metrics.get_metrics()['timings']['stage']
+
+    assert timings['calls'] == 100
+    assert timings['p50'] == 96
+
+
+def test_count():
+    metrics = MetricsCollector()
+    metrics.count("hits")
+    metrics.count("hits", 2)
+
+    assert metrics.get_metrics()['counters'] == {"hits": 3}
+
+
+def test_instrumented_tool():
+    class Tool:
+        def get_value(self, value):
+            return value
+
+    metrics = MetricsCollector()
+    tool = InstrumentedTool(Tool(), "tool", metrics)
+
+    assert tool.get_value(5) == 5
+    assert tool.get_value(6) == 6
+    assert metrics.get_metrics()['timings']['tool.get_value']['calls'] == 2
@@ -30,3 +30,10 @@ def test_get_names_only_person_en():
     ]
 
     assert NameTagApi.get_names(sentence, Languages.EN) == correct_output
+
+
+def test_get_names_for_sentences():
+    sentences = ["Pan Petr Novotný a Jana si koupili dům", "Koupili si dům.", "Petr Hudeček ze společnosti Metrostav si zakoupil s manželkou Emou Novotnou linku metra."]
+
+    assert NameTagApi.get_names_for_sentences(sentences, Languages.CS) == [NameTagApi.get_names(sentence, Languages.CS) for sentence in sentences]
+    assert CapitalLettersBasedNameRecognition().get_names_for_sentences(sentences, Languages.CS) == [CapitalLettersBasedNameRecognition.get_names(sentence, Languages.CS) for sentence in sentences]
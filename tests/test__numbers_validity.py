@@ -0,0 +1,33 @@
+from fixer._numbers_validity import NumbersValidity
+
+
+def test_matches():
+    validity = NumbersValidity.compile([(None, -4), -1, 1, (4, None)])
+
+    assert [number for number in range(-7, 8) if validity.matches(number)] == [-7, -6, -5, -1, 1, 5, 6, 7]
+    assert not validity.matches(2.5)
+
+
+def test_matches_floats_and_intervals():
+    validity = NumbersValidity.compile([(2, 5), float])
+
+    assert validity.matches(2.5)
+    assert [number for number in range(0, 7) if validity.matches(number)] == [3, 4]
+
+
+def test_matches_no_rules():
+    validity = NumbersValidity.compile([])
+
+    assert not validity.matches(1)
+    assert not validity.matches(1.5)
+
+
+def test_compile_shares_instances():
+    validity = NumbersValidity.compile([-1, 1])
+
+    assert NumbersValidity.compile((-1, 1)) is validity
+    assert NumbersValidity.compile(validity) is validity
+
+
+def test_get_boundaries():
+    assert NumbersValidity.compile([(None, -4), -1, 1, (4, None), (10, 20), float]).get_boundaries() == {-4, -1, 1, 4, 10, 20}
@@ -0,0 +1,61 @@
+import sqlite3
+
+from fixer._results_cache import ResultsCache
+from fixer.fixer_statistics import FixerStatisticsMarks
+
+
+def test_save_get(tmp_path):
+    cache = ResultsCache(str(tmp_path / "cache.sqlite"))
+    result = ("He drove 5 km.", True, [FixerStatisticsMarks.U_SINGLE_NUMBER_SENTENCE, FixerStatisticsMarks.U_FIXED])
+
+    cache.save("config", [("Ujel 5 km.", "He drove 5 miles.")], [result])
+
+    assert cache.get("config", [("Ujel 5 km.", "He drove 5 miles."), ("Ujel 6 km.", "He drove 6 miles.")]) == [result, None]
+    assert cache.get("another config", [("Ujel 5 km.", "He drove 5 miles.")]) == [None]
+
+
+def test_shared_database(tmp_path):
+    result = ("It was a day.", False, [])
+
+    ResultsCache(str(tmp_path / "cache.sqlite")).save("config", [("Byl to den.", "It was a day.")], [result])
+
+    assert ResultsCache(str(tmp_path / "cache.sqlite")).get("config", [("Byl to den.", "It was a day.")]) == [result]
+
+
+def test_eviction(tmp_path):
+    cache = ResultsCache(str(tmp_path / "cache.sqlite"), max_entries=10)
+    sentences = [(f"Ujel {i} km.", f"He drove {i} miles.") for i in range(1000)]
+
+    cache.save("config", sentences, [(f"He drove {i} km.", True, []) for i in range(1000)])
+
+    assert sum(1 for result in cache.get("config", sentences) if result) == 10
+    assert cache.get("config", sentences[-1:]) == [("He drove 999 km.", True, [])]
+
+
+def test_eviction_small_cache(tmp_path):
+    cache = ResultsCache(str(tmp_path / "cache.sqlite"), max_entries=10)
+
+    for i in range(50):
+        cache.save("config", [(f"Ujel {i} km.", f"He drove {i} miles.")], [(f"He drove {i} km.", True, [])])
+
+    with sqlite3.connect(str(tmp_path / "cache.sqlite")) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 10
+
+
+def test_get_does_not_write(tmp_path):
+    cache = ResultsCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.save("config", [("Byl to den.", "It was a day.")], [("It was a day.", False, [])])
+    cache.save("config", [("Byla to noc.", "It was a night.")], [("It was a night.", False, [])])
+
+    with sqlite3.connect(str(tmp_path / "cache.sqlite")) as connection:
+        saved_last_used = connection.execute("SELECT key, last_used FROM results ORDER BY key").fetchall()
+
+    assert cache.get("config", [("Byl to den.", "It was a day.")]) == [("It was a day.", False, [])]
+
+    with sqlite3.connect(str(tmp_path / "cache.sqlite")) as connection:
+        assert connection.execute("SELECT key, last_used FROM results ORDER BY key").fetchall() == saved_last_used
+
+    # time of use is written with the next save, so the found result is not evicted
+    cache.save("config", [("Byl to rok.", "It was a year.")], [("It was a year.", False, [])])
+
+    assert cache.get("config", [("Byl to den.", "It was a day."), ("Byla to noc.", "It was a night.")]) == [("It was a day.", False, []), None]
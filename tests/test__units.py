@@ -1,3 +1,9 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from fixer._exchange_rates import CNBExchangeRatesHistory, exchange_rates_convertor
 from fixer._units import *
 
 
@@ -107,6 +113,18 @@ def test_convert_number_with_changing_unit_category():
     assert unit == units.get_unit_by_word("miles", Languages.EN)
 
 
+def test_convert_number_with_rates_date(monkeypatch, tmp_path):
+    history = CNBExchangeRatesHistory(str(tmp_path / "history.json"), offline=True)
+    history.load_history("Datum|1 EUR|1 GBP|1 USD\n02.01.2020|25,000|30,000|20,000\n", 2020)
+    monkeypatch.setattr(exchange_rates_convertor, "history", history)
+
+    num, unit = units.convert_number(Languages.EN, [UnitsSystem.USD], 100, units.get_unit_by_word("euro", Languages.CS), units.get_unit_by_word("euros", Languages.EN),
+                                     rates_date=date(2020, 1, 4))
+
+    assert num == pytest.approx(125)
+    assert unit.category == UnitCategories.USD
+
+
 def test_convert_to_base_in_category():
     assert units.convert_to_base_in_category(units.get_unit_by_word("kilogramů", Languages.CS), 12) == 12000
 
@@ -114,3 +132,109 @@ def test_convert_to_base_in_category():
 def test_convert_to_base_in_another_system():
     num = units.convert_to_base_in_another_system(units.get_unit_by_word("centimetrů", Languages.CS), 1201, UnitCategories.FT)
     assert round(num) == 39
+
+
+def test_get_unit_by_word():
+    assert units.get_unit_by_word("km", Languages.CS).category == UnitCategories.KM
+    assert units.get_unit_by_word("KM", Languages.CS) is None
+    assert units.get_unit_by_word("KM", Languages.CS, case_sensitive=False) == units.get_unit_by_word("km", Languages.CS)
+    assert units.get_unit_by_word("pound", Languages.EN) == next(unit for unit in units.get_all_units_for_language(Languages.EN) if unit.word == "pound")
+    assert units.get_unit_by_word("metrů", Languages.EN) is None
+
+
+def test_get_units_words_set():
+    assert units.get_units_words_set(Languages.EN) == set(units.get_units_words_list(Languages.EN))
+    assert units.get_units_for_language_before_numbers_set(Languages.EN) == set(units.get_units_for_language_before_numbers_list(Languages.EN))
+
+
+def test_get_correct_unit_number_classes():
+    original_unit = units.get_unit_by_word("kilometers", Languages.EN)
+    expected_words = [(1, "kilometr"), (-1, "kilometr"), (2, "kilometry"), (4, "kilometry"), (-3, "kilometry"), (5, "kilometrů"), (125, "kilometrů"), (-7, "kilometrů"), (0, "kilometrech"), (2.5, "kilometru"), (1.0, "kilometru")]
+
+    for number, word in expected_words + list(reversed(expected_words)):
+        assert units.get_correct_unit(Languages.CS, number, original_unit).word == word
+
+
+def test_load_units(tmp_path):
+    units_file = tmp_path / "units.tsv"
+    units_file.write_text("# comment\n\nkilo\tKG\tcs\t..-4,-1,1,4..\t-\t-\n$\tUSD\ten\tany\tabbreviation,before_number\t-\nmeters\tM\ten\tnone\t-\tAmE\n", encoding="utf-8")
+
+    kilo, dollar, meters = UnitsWrapper.load_units(str(units_file))
+
+    assert (kilo.word, kilo.category, kilo.language, kilo.numbers_validity.rules) == ("kilo", UnitCategories.KG, Languages.CS, ((None, -4), -1, 1, (4, None)))
+    assert dollar.numbers_validity is None and dollar.abbreviation and dollar.before_number
+    assert meters.numbers_validity.rules == () and meters.dialect == UnitDialect.AmE
+
+
+def test_load_units_invalid_line(tmp_path):
+    units_file = tmp_path / "units.tsv"
+    units_file.write_text("kilo\tKILO\tcs\tany\t-\t-\n", encoding="utf-8")
+
+    with pytest.raises(UnitsRegistryException):
+        UnitsWrapper.load_units(str(units_file))
+
+
+def test_frozen_registry():
+    unit = units.get_unit_by_word("km", Languages.CS)
+
+    assert units.is_frozen()
+
+    with pytest.raises(UnitsRegistryException):
+        units.add_unit(unit)
+
+    with pytest.raises(AttributeError):
+        unit.word = "m"
+
+
+def test_get_categories_by_groups():
+    groups = UnitCategories.get_categories_by_groups()
+
+    assert groups[UnitCategories.M] == [UnitCategories.CM, UnitCategories.DM, UnitCategories.KM, UnitCategories.MM]
+    assert all(category.base is None for category in groups)
+    assert [category.id for category in UnitCategories.ALL] == list(range(len(UnitCategories.ALL)))
+    assert UnitCategories.get_category("KMH") == UnitCategories.KMH and UnitCategories.KMH.name == "KMH"
+
+
+def test_get_conversion_table():
+    factors, offsets = units.get_conversion_table()
+
+    assert factors[UnitCategories.KM.id, UnitCategories.M.id] == 1000
+    assert round(factors[UnitCategories.MI.id, UnitCategories.KM.id], 5) == 1.60934
+    assert (factors[UnitCategories.C.id, UnitCategories.F.id], offsets[UnitCategories.C.id, UnitCategories.F.id]) == pytest.approx((1.8, 32))
+    assert np.isnan(factors[UnitCategories.M.id, UnitCategories.KG.id])
+
+
+def test_convert_many():
+    feet = units.get_unit_by_word("feet", Languages.EN)
+    meters = units.get_unit_by_word("metrů", Languages.CS)
+    kmh = units.get_unit_by_word("km/h", Languages.CS)
+    numbers = [123, 456786, 12.5, 50]
+    original_units = [feet, meters, meters, kmh]
+
+    converted_numbers, converted_ids = units.convert_many(Languages.EN, [UnitsSystem.IMPERIAL], numbers, [unit.category.id for unit in original_units])
+
+    for number, unit, converted_number, converted_id in zip(numbers, original_units, converted_numbers, converted_ids):
+        expected_number, expected_unit = units.convert_number(Languages.EN, [UnitsSystem.IMPERIAL], number, unit, kmh)
+
+        if expected_number is None:
+            assert np.isnan(converted_number) and converted_id == -1
+        else:
+            assert converted_number == pytest.approx(expected_number)
+            assert UnitCategories.ALL[converted_id] == expected_unit.category
+
+
+def test_get_categories_thresholds():
+    coefficients, categories, negative_category = units.get_categories_thresholds(UnitCategories.FT, Languages.EN)
+
+    assert coefficients == (3, 5280)
+    assert categories == (UnitCategories.YD, UnitCategories.MI)
+    assert negative_category == UnitCategories.YD
+
+
+def test_get_best_unit_for_converted_number_thresholds():
+    original_unit = units.get_unit_by_word("metrů", Languages.CS)
+    translated_unit = units.get_unit_by_word("inches", Languages.EN)
+
+    assert UnitsConvertors.get_best_unit_for_converted_number(0.5, UnitCategories.M, Languages.EN, original_unit, translated_unit) == (0.5, units.get_unit_by_word("meters", Languages.EN))
+    assert UnitsConvertors.get_best_unit_for_converted_number(1000, UnitCategories.M, Languages.EN, original_unit, translated_unit) == (1000, units.get_unit_by_word("meters", Languages.EN))
+    assert UnitsConvertors.get_best_unit_for_converted_number(1500, UnitCategories.M, Languages.EN, original_unit, translated_unit) == (1.5, units.get_unit_by_word("kilometers", Languages.EN))
@@ -1,7 +1,70 @@
-from fixer._aligner import FastAlignAligner, OrderAligner
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from fixer._aligner import FastAlignAligner, IBMAligner, OrderAligner, AlignerException
 from fixer._languages import Languages
 
 
+class LocalAlignerHandler(BaseHTTPRequestHandler):
+    """Stand-in of the alignment server aligning words by their order"""
+    protocol_version = 'HTTP/1.1'
+    requests_count = 0
+    batch_status = 200
+    batch_body = None
+
+    def do_POST(self):
+        LocalAlignerHandler.requests_count += 1
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+
+        if isinstance(payload, list) and LocalAlignerHandler.batch_status != 200:
+            self.send_response(LocalAlignerHandler.batch_status)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if isinstance(payload, list) and LocalAlignerHandler.batch_body is not None:
+            body = LocalAlignerHandler.batch_body.encode()
+        elif isinstance(payload, list):
+            body = json.dumps([self.__align(pair) for pair in payload]).encode()
+        else:
+            body = json.dumps(self.__align(payload)).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    @staticmethod
+    def __align(pair):
+        src_tokens = pair['src_text'].split()
+        trg_tokens = pair['trg_text'].split()
+        alignment = " ".join(f"{idx}-{idx}" for idx in range(min(len(src_tokens), len(trg_tokens))))
+        return {'alignment': alignment, 'src_tokens': src_tokens, 'trg_tokens': trg_tokens}
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_aligner(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), LocalAlignerHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    LocalAlignerHandler.requests_count = 0
+    LocalAlignerHandler.batch_status = 200
+    LocalAlignerHandler.batch_body = None
+    monkeypatch.setattr(FastAlignAligner, '_ALIGNER_URL', f"http://127.0.0.1:{server.server_address[1]}/align/en-cs")
+
+    yield LocalAlignerHandler
+
+    server.shutdown()
+    server.server_close()
+
+
 def test_get_external_alignment():
     src_text = "In 2016, 665 km of regional roads were in a state of emergency, with a further 313 kilometres identified as unsatisfactory."
     trg_text = "V roce 2016 bylo 665 km krajských silnic v havarijním stavu, dalších 313 kilometrů bylo označeno jako nevyhovující."
@@ -20,6 +83,76 @@ def test_get_external_alignment_empty_sentences():
     assert alignment == []
 
 
+def test_get_external_alignments(local_aligner):
+    sentence_pairs = [
+        ("Jan a Petr jeli 5 km.", "Jan and Petr drove 5 km."),
+        ("Marie koupila 3 metry.", "Marie bought 3 meters."),
+        ("", ""),
+    ]
+
+    alignments = FastAlignAligner().get_alignments(sentence_pairs, Languages.CS, Languages.EN)
+
+    assert local_aligner.requests_count == 1
+    assert alignments == [FastAlignAligner.get_alignment(src, trg, Languages.CS, Languages.EN) for src, trg in sentence_pairs]
+    assert alignments[0][0] == ('Jan', 'Jan')
+
+
+def test_get_external_alignments_without_batch_support(local_aligner):
+    local_aligner.batch_status = 400
+    sentence_pairs = [
+        ("Jan jel 5 km.", "Jan drove 5 km."),
+        ("Marie koupila 3 metry.", "Marie bought 3 meters."),
+    ]
+    aligner = FastAlignAligner()
+
+    alignments = aligner.get_alignments(sentence_pairs, Languages.CS, Languages.EN)
+    aligner.get_alignments(sentence_pairs, Languages.CS, Languages.EN)
+
+    assert local_aligner.requests_count == 1 + 2 * len(sentence_pairs)
+    assert alignments == [FastAlignAligner.get_alignment(src, trg, Languages.CS, Languages.EN) for src, trg in sentence_pairs]
+
+
+def test_get_external_alignments_batch_failure(local_aligner):
+    local_aligner.batch_status = 503
+    sentence_pairs = [
+        ("Jan jel 5 km.", "Jan drove 5 km."),
+        ("Marie koupila 3 metry.", "Marie bought 3 meters."),
+    ]
+    aligner = FastAlignAligner()
+
+    alignments = aligner.get_alignments(sentence_pairs, Languages.CS, Languages.EN)
+    assert local_aligner.requests_count == 1 + len(sentence_pairs)
+
+    local_aligner.batch_status = 200
+    assert aligner.get_alignments(sentence_pairs, Languages.CS, Languages.EN) == alignments
+    assert local_aligner.requests_count == 2 + len(sentence_pairs)
+
+
+@pytest.mark.parametrize("batch_status, batch_body, failing_batches", [
+    (200, json.dumps({'alignment': ''}), 1),
+    (200, "[]", 1),
+    (500, None, 2),
+])
+def test_get_external_alignments_batch_not_understood(local_aligner, batch_status, batch_body, failing_batches):
+    local_aligner.batch_status = batch_status
+    local_aligner.batch_body = batch_body
+    sentence_pairs = [
+        ("Jan jel 5 km.", "Jan drove 5 km."),
+        ("Marie koupila 3 metry.", "Marie bought 3 meters."),
+    ]
+    aligner = FastAlignAligner()
+
+    for _ in range(failing_batches):
+        aligner.get_alignments(sentence_pairs, Languages.CS, Languages.EN)
+    assert local_aligner.requests_count == failing_batches * (1 + len(sentence_pairs))
+
+    alignments = aligner.get_alignments(sentence_pairs, Languages.CS, Languages.EN)
+
+    # the next batch is aligned pair by pair without the batch request
+    assert local_aligner.requests_count == (failing_batches + 1) * len(sentence_pairs) + failing_batches
+    assert alignments == [FastAlignAligner.get_alignment(src, trg, Languages.CS, Languages.EN) for src, trg in sentence_pairs]
+
+
 def test_get_order_alignment():
     src_text = "In 2016, 665 km of regional roads were in a state of emergency, with a further 313 kilometres identified as unsatisfactory."
     trg_text = "V roce 2016 bylo 665 km krajských silnic v havarijním stavu, dalších 313 kilometrů bylo označeno jako nevyhovující."
@@ -46,3 +179,42 @@ def test_get_order_alignment_empty_sentences():
     alignment = OrderAligner.get_alignment("", "", Languages.EN, Languages.CS)
 
     assert alignment == []
+
+
+def test_get_ibm_alignment(tmp_path):
+    corpus = [
+        ("Jan koupil dům.", "Jan bought a house."),
+        ("Petr koupil auto.", "Petr bought a car."),
+        ("Dům je velký.", "The house is big."),
+        ("Auto je malé.", "The car is small."),
+        ("Marie je doma.", "Marie is at home."),
+    ]
+    IBMAligner.train(corpus, Languages.CS, iterations=10, model_path=str(tmp_path / "ibm.npz"))
+    aligner = IBMAligner(str(tmp_path / "ibm.npz"))
+
+    expected_result = [('Petr', 'Petr'), ('bought', 'koupil'), ('big', 'velký'), ('house', 'dům'), ('.', '.')]
+
+    assert aligner.get_alignment("Petr koupil velký dům.", "Petr bought a big house.", Languages.CS, Languages.EN) == expected_result
+    assert aligner.get_alignment("Petr bought a big house.", "Petr koupil velký dům.", Languages.EN, Languages.CS) == expected_result
+    assert aligner.get_alignment("", "", Languages.CS, Languages.EN) == []
+
+
+def test_get_ibm_alignment_from_alignments(tmp_path):
+    IBMAligner.train_from_alignments([[('house', 'dům'), ('bought', 'koupil')]], str(tmp_path / "ibm.npz"))
+    aligner = IBMAligner(str(tmp_path / "ibm.npz"))
+
+    alignment = aligner.get_alignment("Jan koupil dům.", "Jan bought a house.", Languages.CS, Languages.EN)
+
+    assert alignment == [('Jan', 'Jan'), ('bought', 'koupil'), ('house', 'dům'), ('.', '.')]
+
+
+def test_get_ibm_alignment_empty_table(tmp_path):
+    IBMAligner.train_from_alignments([], str(tmp_path / "ibm.npz"))
+    aligner = IBMAligner(str(tmp_path / "ibm.npz"))
+
+    assert aligner.get_alignment("Jan koupil dům.", "Jan bought a house.", Languages.CS, Languages.EN) == []
+
+
+def test_ibm_aligner_without_model(tmp_path):
+    with pytest.raises(AlignerException):
+        IBMAligner(str(tmp_path / "missing.npz"))
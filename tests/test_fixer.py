@@ -0,0 +1,274 @@
+import asyncio
+import re
+
+import pytest
+
+from fixer import AsyncFixer, Fixer, FixerConfigurator, FixerStatisticsMarks as StatisticsMarks
+from fixer.fixer_configurator import FixerConfiguratorException
+from fixer._aligner import IBMAligner
+from fixer._decimal_separator_fixer import DecimalSeparatorFixer
+from fixer._exchange_rates import CNBExchangeRates
+from fixer._languages import Languages
+from fixer._lemmatization import UDPipeOffline, AnnotationLayers
+from fixer._names_fixer import NamesFixer
+from fixer._numbers_fixer import NumberFixer
+from fixer._sentence_pair import SentencePair
+
+
+def test_fix_batch_same_as_fix():
+    sentences = [
+        ("Koupil jsem si 25 domů za 100 tisíc korun českých.", "I bought 25 houses for 100 thousand dollars."),
+        ("Stál 1 234,5 dolarů.", "It cost 1.234,5 dollars."),
+        ("Byl to krásný den.", "It was a beautiful day."),
+        ("Ujel 5 km.", "He drove 5 miles."),
+    ]
+
+    fixer = Fixer(get_configuration())
+
+    assert fixer.fix_batch(sentences) == [fixer.fix(source, target) for source, target in sentences]
+
+
+def test_fix_batch_empty():
+    assert Fixer(get_configuration()).fix_batch([]) == []
+
+
+def test_fix_stream_same_as_fix():
+    sentences = [
+        ("Ujel 5 km.", "He drove 5 miles."),
+        ("Byl to krásný den.", "It was a beautiful day."),
+        ("Koupil 3 metry.", "He bought 3 feet."),
+    ] * 3
+
+    fixer = Fixer(get_configuration())
+    results = fixer.fix_stream((sentence for sentence in sentences), window_size=2, read_ahead=2)
+
+    assert list(results) == [fixer.fix(source, target) for source, target in sentences]
+
+
+def test_fix_document():
+    source_document = "Ujel 5 km. Byl to krásný den.\n\nKoupil 3 metry."
+    translated_document = "He drove 5 miles. It was a beautiful day.\n\nHe bought 3 feet."
+
+    fixer = Fixer(get_configuration())
+    fixed_document, has_changed, marks = fixer.fix_document(source_document, translated_document)
+
+    assert has_changed
+    assert fixed_document == "He drove 5 km. It was a beautiful day.\n\nHe bought 3 meters."
+    assert len(marks) == 3
+
+
+def test_fix_document_analysed_once():
+    class AnalysingLemmatizator:
+        def __init__(self):
+            self.calls = []
+
+        def get_sentences_analysis(self, text, language, layers):
+            self.calls.append('get_sentences_analysis')
+            return [(sentence, []) for sentence in re.split(r"(?<=\.)\s+", text)]
+
+        def get_lemmatizations(self, texts, language, layers):
+            self.calls.append('get_lemmatizations')
+            return [[] for _ in texts]
+
+    configuration = get_configuration()
+    configuration.lemmatizator = AnalysingLemmatizator()
+
+    fixed_document, has_changed, marks = Fixer(configuration).fix_document("Ujel pět km. Koupil 3 metry.", "He drove five miles. He bought 3 feet.")
+
+    assert configuration.lemmatizator.calls == ['get_sentences_analysis', 'get_sentences_analysis']
+    assert fixed_document == "He drove five miles. He bought 3 meters."
+    assert len(marks) == 2
+
+
+def test_async_fix_same_as_fix():
+    sentences = [
+        ("Ujel 5 km.", "He drove 5 miles."),
+        ("Stál 1 234,5 dolarů.", "It cost 1.234,5 dollars."),
+    ]
+
+    async def fix_all(async_fixer):
+        return await asyncio.gather(*[async_fixer.fix(source, target) for source, target in sentences])
+
+    async_fixer = AsyncFixer(get_configuration(), concurrency=2)
+    results = asyncio.run(fix_all(async_fixer))
+    async_fixer.close()
+
+    assert results == [async_fixer.fixer.fix(source, target) for source, target in sentences]
+
+
+def test_fix_different_numbers():
+    fixer = Fixer(get_configuration())
+
+    assert fixer.fix("Ujel 5 km.", "He drove 3 km.")[:2] == ("He drove 5 km.", True)
+
+    sentence, has_changed, marks = fixer.fix("Ujel 5 km.", "He drove 3 miles.")
+    assert (sentence, has_changed) == ("He drove 3 miles.", False)
+    assert StatisticsMarks.G_EXCEPTION_CATCH not in marks
+
+
+def test_fix_not_applicable_tools():
+    configuration = get_configuration()
+    configuration.lemmatizator = None  # no external tool can be used
+
+    assert Fixer(configuration).fix("Byl to krásný den.", "It was a beautiful day.") == ("It was a beautiful day.", False, [])
+
+
+def test_is_applicable():
+    numbers_fixer, separators_fixer = [NumberFixer(get_configuration()), DecimalSeparatorFixer(get_configuration())]
+
+    assert numbers_fixer.is_applicable("Ujel 5 km.", "He drove five miles.")
+    assert numbers_fixer.is_applicable("Ujel pět kilometrů.", "He drove miles.")
+    assert not numbers_fixer.is_applicable("Ujel daleko.", "He drove far.")
+    assert separators_fixer.is_applicable("Stál 1 234,5 dolarů.", "It cost 1.234,5 dollars.")
+    assert not separators_fixer.is_applicable("Ujel 5 km.", "He drove 5 km.")
+
+
+def test_names_is_applicable():
+    names_fixer = NamesFixer(get_configuration())
+
+    assert names_fixer.is_applicable("Včera Jiří koupil dům.", "Yesterday George bought a house.")
+    assert names_fixer.is_applicable("Jan koupil dům.", "Jan bought a house.")
+    assert not names_fixer.is_applicable("Koupil dům.", "He bought a house.")
+    assert not names_fixer.is_applicable("Koupil dům od Jana.", "He bought a house.")
+    assert not names_fixer.is_applicable("koupil dům.", "bought a house.")
+
+
+def test_get_metrics():
+    fixer = Fixer(get_configuration(), collect_metrics=True)
+    fixer.fix("Ujel 5 km.", "He drove 5 miles.")
+    fixer.fix("Byl to krásný den.", "It was a beautiful day.")
+
+    metrics = fixer.get_metrics()
+
+    assert metrics['timings']['tool.NumberFixer']['calls'] == 1
+    assert metrics['counters']['fixer.skipped'] == 1
+    assert Fixer(get_configuration()).get_metrics() == {}
+
+
+def test_fix_results_cache(tmp_path):
+    configuration = FixerConfigurator()
+    configuration.load_from_dict(dict(get_configuration_dict(), results_cache=str(tmp_path / "cache.sqlite")))
+
+    fixer = Fixer(configuration, collect_metrics=True)
+    result = fixer.fix("Ujel 5 km.", "He drove 5 miles.")
+
+    assert fixer.fix("Ujel 5 km.", "He drove 5 miles.") == result
+    assert fixer.fix_batch([("Ujel 5 km.", "He drove 5 miles."), ("Ujel 6 km.", "He drove 6 miles.")])[0] == result
+    assert fixer.get_metrics()['counters']['results_cache.hits'] == 2
+    assert fixer.get_metrics()['counters']['results_cache.misses'] == 2
+
+
+def test_rates_not_loaded_by_fixer_construction(monkeypatch, tmp_path):
+    monkeypatch.setattr(CNBExchangeRates, "load_rates", staticmethod(lambda: pytest.fail("rates should not be loaded")))
+
+    configuration = FixerConfigurator()
+    configuration.load_from_dict(dict(get_configuration_dict(), mode='recalculating'))
+    configuration.exchange_rates = CNBExchangeRates(snapshot_path=str(tmp_path / "rates.json"))
+
+    Fixer(configuration)
+
+
+def test_fix_results_cache_by_rates(monkeypatch, tmp_path):
+    configuration = FixerConfigurator()
+    configuration.load_from_dict(dict(get_configuration_dict(), mode='recalculating', results_cache=str(tmp_path / "cache.sqlite")))
+    configuration.exchange_rates = CNBExchangeRates({"USD": 20, "GBP": 30, "EUR": 25})
+
+    fixer = Fixer(configuration, collect_metrics=True)
+    fixer.fix("Ujel 5 km.", "He drove 5 miles.")
+    fixer.fix("Ujel 5 km.", "He drove 5 miles.")
+    configuration.exchange_rates.load_static_rates({"USD": 21})
+    fixer.fix("Ujel 5 km.", "He drove 5 miles.")
+
+    assert fixer.get_metrics()['counters']['results_cache.hits'] == 1
+    assert fixer.get_metrics()['counters']['results_cache.misses'] == 2
+
+
+def test_fix_memoized_tools():
+    configuration = FixerConfigurator()
+    configuration.load_from_dict(dict(get_configuration_dict(), tools=['names'], memoize=['names_tagger'], memoization_size=10))
+
+    fixer = Fixer(configuration, collect_metrics=True)
+    fixer.fix("Potkal jsem Petra.", "I met Peter.")
+    fixer.fix("Potkal jsem Petra.", "I met Pete.")
+
+    assert fixer.get_metrics()['counters']['memoization.names_tagger.hits'] == 1
+    assert fixer.get_metrics()['counters']['memoization.names_tagger.misses'] == 3
+
+    not_memoized_configuration = FixerConfigurator()
+    not_memoized_configuration.load_from_dict(dict(get_configuration_dict(), tools=['names']))
+    assert configuration.get_fingerprint() == not_memoized_configuration.get_fingerprint()
+
+
+def test_aligner_model(tmp_path):
+    IBMAligner.train_from_alignments([[('house', 'dům')]], str(tmp_path / "ibm.npz"))
+
+    configuration = FixerConfigurator()
+    configuration.load_from_dict(dict(get_configuration_dict(), aligner='local_ibm', aligner_model=str(tmp_path / "ibm.npz")))
+    assert ('house', 'dům') in configuration.aligner.get_alignment("Koupil dům.", "He bought a house.", Languages.CS, Languages.EN)
+
+    with pytest.raises(FixerConfiguratorException):
+        FixerConfigurator().load_from_dict(dict(get_configuration_dict(), aligner_model=str(tmp_path / "ibm.npz")))
+
+
+def test_annotation_layers():
+    assert Fixer(get_configuration()).annotation_layers == {AnnotationLayers.TOKENS, AnnotationLayers.UPOS, AnnotationLayers.LEMMA}
+
+    configuration = FixerConfigurator()
+    configuration.load_from_dict(dict(get_configuration_dict(), tools=['separators']))
+    assert Fixer(configuration).annotation_layers == frozenset()
+
+
+def test_prefetch_lemmas_layers_union():
+    class LayersLemmatizator:
+        def __init__(self):
+            self.layers = []
+
+        def get_lemmatizations(self, texts, language, layers):
+            self.layers.append(layers)
+            return [[] for _ in texts]
+
+    configuration = get_configuration()
+    configuration.lemmatizator = LayersLemmatizator()
+    pairs = [
+        SentencePair("Ujel pět km.", "He drove five miles.", configuration, annotation_layers=frozenset({AnnotationLayers.TOKENS})),
+        SentencePair("Koupil dům.", "He bought a house.", configuration, annotation_layers=frozenset({AnnotationLayers.LEMMA})),
+    ]
+
+    SentencePair.prefetch_lemmas(pairs, pairs[1:])
+
+    assert configuration.lemmatizator.layers == [frozenset({AnnotationLayers.TOKENS, AnnotationLayers.LEMMA}), frozenset({AnnotationLayers.LEMMA})]
+
+
+def test_preload(monkeypatch):
+    loaded = []
+    monkeypatch.setattr(UDPipeOffline, "load_models", lambda self, languages: loaded.extend(languages) or self)
+
+    configuration = FixerConfigurator()
+    configuration.load_from_dict(dict(get_configuration_dict(), lemmatizator='udpipe_offline'))
+    fixer = Fixer(configuration, collect_metrics=True)
+
+    assert fixer.preload() is fixer
+    assert loaded == [Languages.CS, Languages.EN]
+
+
+def get_configuration():
+    configuration = FixerConfigurator()
+    configuration.load_from_dict(get_configuration_dict())
+
+    return configuration
+
+
+def get_configuration_dict():
+    return {
+        'source_lang': 'cs',
+        'target_lang': 'en',
+        'aligner': 'order_based',
+        'lemmatizator': 'udpipe_online',
+        'names_tagger': 'capitalize_letters',
+        'mode': 'fixing',
+        'base_tolerance': 0.1,
+        'approximately_tolerance': 0.2,
+        'target_units': ['imperial', 'USD', 'F'],
+        'exchange_rates': 'cnb',
+        'tools': ['separators', 'units']
+    }